@@ -108,6 +108,23 @@ def test_unsorted_time():
     ts = ArrayTimeSeries(time, data)
     assert repr(ts) == 'ArrayTimeSeries([(1, 4), (2, 5), (3, 6)])'
 
+#test presorted time argument
+def test_presorted_time():
+    time = np.array([1,2,3])
+    data = np.array([4,5,6])
+    ts = ArrayTimeSeries(time, data, presorted=True)
+    assert ts._key is time and ts._value is data
+    assert ts == ArrayTimeSeries(time, data)
+
+#test sorted time argument keeps the order of repeated time points
+def test_sorted_time_not_resorted():
+    ts = ArrayTimeSeries([1,1,1,2], [4,5,6,7])
+    assert all(ts.values() == np.array([4,5,6,7]))
+
+def test_slice_negative_step():
+    ts = ArrayTimeSeries([5,6,7,8,9], [0,1,2,3,4])
+    assert ts[::-2] == ArrayTimeSeries([5,7,9], [0,2,4])
+
 #--------str test cases-----------
 # length less or equal than five 
 def test_str_less_than_five():
@@ -203,6 +220,32 @@ def test_interpolate2():
     ts = ArrayTimeSeries([0,5,10], [1,2,3])
     # Simple cases
     assert ts.interpolate([-100,100]) == ArrayTimeSeries([-100,100], [1,3])
+def test_interpolate_exact_time():
+    ts = ArrayTimeSeries([0,5,10], [1,2,3])
+    assert ts.interpolate([0,5,10]) == ArrayTimeSeries([0,5,10], [1,2,3])
+    assert repr(ts.interpolate([5])) == 'ArrayTimeSeries([(5, 2)])'
+
+def test_interpolate_matches_binary_search():
+    rs = np.random.RandomState(0)
+    time = np.sort(rs.uniform(0, 100, 50))
+    data = rs.normal(0, 1, 50)
+    ts = ArrayTimeSeries(time, data)
+    inter_time = np.concatenate([[-1, 101], time[::7], rs.uniform(-10, 110, 200)])
+    expected = []
+    for ti in inter_time:
+        if ti < time[0]:
+            expected.append(data[0])
+        elif ti > time[-1]:
+            expected.append(data[-1])
+        else:
+            left, right = ts._binary_search(time, ti)
+            if left == right:
+                expected.append(data[left])
+            else:
+                slope = (data[right] - data[left]) / (time[right] - time[left])
+                expected.append((ti - time[left])*slope + data[left])
+    assert ts.interpolate(inter_time) == ArrayTimeSeries(inter_time, expected)
+
 #def test_interpolate3():???
 #    ts1 = TimeSeries([0,5,10], [1,2,3])
 #    ts2 = TimeSeries([100, -100], [2.5,7.5])
@@ -304,3 +347,434 @@ def test_bool_false():
 def test_bool_zero():
     ts = ArrayTimeSeries([1,2,3], [0,0,0])
     assert bool(ts)
+
+#-------scalar broadcasting test cases----------
+def test_add_scalar():
+    ts = ArrayTimeSeries([1, 2, 3], [4, 5, 6])
+    assert ts + 1 == ArrayTimeSeries([1, 2, 3], [5, 6, 7])
+    assert 1 + ts == ArrayTimeSeries([1, 2, 3], [5, 6, 7])
+
+def test_sub_scalar():
+    ts = ArrayTimeSeries([1, 2, 3], [4, 5, 6])
+    assert ts - 1 == ArrayTimeSeries([1, 2, 3], [3, 4, 5])
+    assert 10 - ts == ArrayTimeSeries([1, 2, 3], [6, 5, 4])
+
+def test_mul_scalar():
+    ts = ArrayTimeSeries([1, 2, 3], [4, 5, 6])
+    assert ts * 2 == ArrayTimeSeries([1, 2, 3], [8, 10, 12])
+    assert 2 * ts == ArrayTimeSeries([1, 2, 3], [8, 10, 12])
+
+def test_numpy_scalar_left():
+    ts = ArrayTimeSeries([1, 2, 3], [4, 5, 6])
+    assert np.float64(2) * ts == ArrayTimeSeries([1, 2, 3], [8.0, 10.0, 12.0])
+    assert np.float64(1) + ts == ArrayTimeSeries([1, 2, 3], [5.0, 6.0, 7.0])
+    assert np.int64(10) - ts == ArrayTimeSeries([1, 2, 3], [6, 5, 4])
+    assert np.float64(60) / ts == ArrayTimeSeries([1, 2, 3], [15.0, 12.0, 10.0])
+    scaled = ts.std() * ts
+    assert isinstance(scaled, ArrayTimeSeries)
+    assert list(scaled.times()) == [1, 2, 3]
+
+def test_add_unsupported_type():
+    ts = ArrayTimeSeries([1, 2, 3], [4, 5, 6])
+    with raises(TypeError):
+        ts + 'a'
+
+#-------truediv test cases----------
+def test_truediv_correct():
+    ts1 = ArrayTimeSeries([1, 2, 3], [4, 5, 6])
+    ts2 = ArrayTimeSeries([1, 2, 3], [2, 5, 4])
+    assert ts1 / ts2 == ArrayTimeSeries([1, 2, 3], [2, 1, 1.5])
+    assert ts1 / 2 == ArrayTimeSeries([1, 2, 3], [2, 2.5, 3])
+    assert 60 / ts1 == ArrayTimeSeries([1, 2, 3], [15, 12, 10])
+
+def test_truediv_diff_time():
+    ts1 = ArrayTimeSeries([1, 2, 3], [4, 5, 6])
+    ts2 = ArrayTimeSeries([1, 2, 4], [4, 5, 6])
+    with raises(ValueError):
+        ts1 / ts2
+
+#-------pow test cases----------
+def test_pow_correct():
+    ts1 = ArrayTimeSeries([1, 2, 3], [4, 5, 6])
+    ts2 = ArrayTimeSeries([1, 2, 3], [2, 1, 0])
+    assert ts1 ** ts2 == ArrayTimeSeries([1, 2, 3], [16, 5, 1])
+    assert ts1 ** 2 == ArrayTimeSeries([1, 2, 3], [16, 25, 36])
+    assert 2 ** ts2 == ArrayTimeSeries([1, 2, 3], [4, 2, 1])
+
+#-------shared time domain test cases----------
+def test_arithmetic_shares_time():
+    ts = ArrayTimeSeries([1, 2, 3], [4, 5, 6])
+    result = -(ts + ts) * 2
+    assert result._key is ts._key
+    result[0] = 0
+    assert ts == ArrayTimeSeries([1, 2, 3], [4, 5, 6])
+
+def test_pos_copies_value():
+    ts = ArrayTimeSeries([1, 2, 3], [4, 5, 6])
+    pos = +ts
+    pos[0] = 0
+    assert ts == ArrayTimeSeries([1, 2, 3], [4, 5, 6])
+
+#-------slice view test cases----------
+def test_slice_shares_buffer():
+    ts = ArrayTimeSeries(np.arange(10), np.arange(10)*2)
+    view = ts[2:8:2]
+    assert np.shares_memory(view._key, ts._key)
+    assert np.shares_memory(view._value, ts._value)
+    assert view == ArrayTimeSeries([2,4,6], [4,8,12])
+
+def test_slice_setitem_copy_on_write():
+    ts = ArrayTimeSeries([1,2,3,4], [5,6,7,8])
+    view = ts[1:3]
+    view[0] = 0
+    assert view == ArrayTimeSeries([2,3], [0,7])
+    assert ts == ArrayTimeSeries([1,2,3,4], [5,6,7,8])
+
+def test_parent_setitem_copy_on_write():
+    ts = ArrayTimeSeries([1,2,3,4], [5,6,7,8])
+    view = ts[1:3]
+    ts[1] = 0
+    assert ts == ArrayTimeSeries([1,2,3,4], [5,0,7,8])
+    assert view == ArrayTimeSeries([2,3], [6,7])
+
+#-------value_at test cases----------
+def test_value_at():
+    ts = ArrayTimeSeries([5,6,7,8,9], [0,1,2,3,4])
+    assert ts.value_at(5) == 0
+    assert ts.value_at(9) == 4
+
+def test_value_at_missing():
+    ts = ArrayTimeSeries([5,6,7,8,9], [0,1,2,3,4])
+    with raises(KeyError):
+        ts.value_at(6.5)
+    with raises(KeyError):
+        ts.value_at(10)
+
+#-------between test cases----------
+def test_between():
+    ts = ArrayTimeSeries([5,6,7,8,9], [0,1,2,3,4])
+    assert ts.between(6, 8) == ArrayTimeSeries([6,7],[1,2])
+    assert ts.between(5.5, 7.5) == ArrayTimeSeries([6,7],[1,2])
+    assert ts.between(8) == ArrayTimeSeries([8,9],[3,4])
+    assert ts.between(stop=7) == ArrayTimeSeries([5,6],[0,1])
+
+def test_between_empty():
+    ts = ArrayTimeSeries([5,6,7,8,9], [0,1,2,3,4])
+    assert len(ts.between(8, 6)) == 0
+    assert len(ts.between(100, 200)) == 0
+
+#-------save and open test cases----------
+def test_save_open(tmpdir):
+    path = str(tmpdir.join('ts.bin'))
+    ts = ArrayTimeSeries([0,5,10], [1.0,2.0,3.0])
+    ts.save(path)
+    mapped = ArrayTimeSeries.open(path)
+    assert isinstance(mapped._value.base, np.memmap)
+    assert mapped == ts
+    assert mapped.interpolate([1]) == ts.interpolate([1])
+    assert mapped[1:] == ArrayTimeSeries([5,10], [2.0,3.0])
+    assert mapped.mean() == ts.mean()
+    assert mapped.std() == ts.std()
+
+def test_open_copy_on_write(tmpdir):
+    path = str(tmpdir.join('ts.bin'))
+    ArrayTimeSeries([1,2,3], [4,5,6]).save(path)
+    mapped = ArrayTimeSeries.open(path)
+    mapped[0] = 0
+    assert mapped == ArrayTimeSeries([1,2,3], [0,5,6])
+    assert ArrayTimeSeries.open(path) == ArrayTimeSeries([1,2,3], [4,5,6])
+
+def test_open_write_through(tmpdir):
+    path = str(tmpdir.join('ts.bin'))
+    ArrayTimeSeries([1,2,3], [4,5,6]).save(path)
+    mapped = ArrayTimeSeries.open(path, mode='r+')
+    mapped[0] = 0
+    mapped._value.base.flush()
+    assert ArrayTimeSeries.open(path) == ArrayTimeSeries([1,2,3], [0,5,6])
+
+def test_open_write_after_slice(tmpdir):
+    path = str(tmpdir.join('ts.bin'))
+    ArrayTimeSeries([1,2,3], [4,5,6]).save(path)
+    # r+: the parent and its views write through to the file
+    mapped = ArrayTimeSeries.open(path, mode='r+')
+    view = mapped.between(1, 3)
+    mapped[0] = 42
+    view[1] = 43
+    assert mapped == ArrayTimeSeries([1,2,3], [42,43,6])
+    mapped[2] = 44
+    mapped._value.base.flush()
+    assert ArrayTimeSeries.open(path) == ArrayTimeSeries([1,2,3], [42,43,44])
+    # c: the writes stay in memory, shared by the parent and its views
+    mapped = ArrayTimeSeries.open(path, mode='c')
+    view = mapped[1:]
+    mapped[1] = 0
+    view[1] = 1
+    assert mapped == ArrayTimeSeries([1,2,3], [42,0,1])
+    assert view == ArrayTimeSeries([2,3], [0,1])
+    assert ArrayTimeSeries.open(path) == ArrayTimeSeries([1,2,3], [42,43,44])
+    # r: the parent and its views stay read-only
+    mapped = ArrayTimeSeries.open(path, mode='r')
+    view = mapped[:2]
+    with raises(ValueError):
+        mapped[0] = 0
+    with raises(ValueError):
+        view[0] = 0
+    assert ArrayTimeSeries.open(path) == ArrayTimeSeries([1,2,3], [42,43,44])
+
+def test_open_contains_after_view_write(tmpdir):
+    path = str(tmpdir.join('ts.bin'))
+    ArrayTimeSeries([1,2,3], [4,5,6]).save(path)
+    mapped = ArrayTimeSeries.open(path, mode='r+')
+    assert 4 in mapped
+    view = mapped[0:2]
+    assert 5 in view
+    view[0] = 99
+    assert 99 in mapped and 4 not in mapped
+    mapped[1] = 98
+    assert 98 in view and 5 not in view
+
+def test_save_object_dtype(tmpdir):
+    path = str(tmpdir.join('ts.bin'))
+    with raises(ValueError):
+        ArrayTimeSeries([1,2], [None, 'a']).save(path)
+
+#-------value index test cases----------
+def test_contains_setitem():
+    ts = ArrayTimeSeries([1,2,3,4], [4,5,6,5])
+    assert 5 in ts
+    ts[1] = 7
+    assert 5 in ts and 7 in ts
+    ts[3] = 8
+    assert not 5 in ts
+    assert 8 in ts and 4 in ts
+
+def test_contains_failed_setitem():
+    ts = ArrayTimeSeries([1,2,3], [4.0,5.0,6.0])
+    assert 4.0 in ts
+    with raises(ValueError):
+        ts[0] = 'abc'
+    assert 4.0 in ts
+    ts[0] = 7.0
+    assert 7.0 in ts and not 4.0 in ts
+
+def test_contains_setitem_slice():
+    ts = ArrayTimeSeries([1,2,3,4], [4,5,6,5])
+    assert 4 in ts
+    ts[0:2] = [9, 9]
+    assert 9 in ts
+    assert not 4 in ts
+
+#-------rolling test cases----------
+def brute_rolling(ts, function, size=None, duration=None):
+    time, data = ts.times(), ts.values()
+    result = []
+    for i in range(len(time)):
+        if size is not None:
+            window = data[max(0, i-size+1):i+1]
+        else:
+            window = data[(time > time[i] - duration) & (time <= time[i])]
+        result.append(function(window))
+    return np.array(result)
+
+def make_rolling_ts():
+    rng = np.random.RandomState(3)
+    return ArrayTimeSeries(np.cumsum(rng.uniform(0.1, 2, 300)), rng.normal(100, 5, 300))
+
+def test_rolling_size():
+    ts = make_rolling_ts()
+    for size in [1, 2, 7, 64, 500]:
+        assert np.allclose(ts.rolling_mean(size=size).values(), brute_rolling(ts, np.mean, size=size))
+        assert np.allclose(ts.rolling_std(size=size).values(), brute_rolling(ts, np.std, size=size))
+        assert all(ts.rolling_min(size=size).values() == brute_rolling(ts, np.min, size=size))
+        assert all(ts.rolling_max(size=size).values() == brute_rolling(ts, np.max, size=size))
+
+def test_rolling_duration():
+    ts = make_rolling_ts()
+    for duration in [0.5, 3, 40]:
+        assert np.allclose(ts.rolling_mean(duration=duration).values(), brute_rolling(ts, np.mean, duration=duration))
+        assert np.allclose(ts.rolling_std(duration=duration).values(), brute_rolling(ts, np.std, duration=duration))
+        assert all(ts.rolling_min(duration=duration).values() == brute_rolling(ts, np.min, duration=duration))
+        assert all(ts.rolling_max(duration=duration).values() == brute_rolling(ts, np.max, duration=duration))
+
+def test_rolling_std_ddof():
+    ts = ArrayTimeSeries([1, 2, 3, 4], [4, 6, 5, 9])
+    assert np.allclose(ts.rolling_std(size=2, ddof=1).values(), [0, np.std([4, 6], ddof=1), np.std([6, 5], ddof=1), np.std([5, 9], ddof=1)])
+
+def test_rolling_time():
+    ts = ArrayTimeSeries([1, 2, 3], [4, 6, 5])
+    assert ts.rolling_max(size=2) == ArrayTimeSeries([1, 2, 3], [4, 6, 6])
+
+def test_rolling_arguments():
+    ts = ArrayTimeSeries([1, 2, 3], [4, 6, 5])
+    with raises(ValueError):
+        ts.rolling_mean()
+    with raises(ValueError):
+        ts.rolling_mean(size=2, duration=2)
+    with raises(ValueError):
+        ts.rolling_mean(size=0)
+    with raises(ValueError):
+        ts.rolling_min(duration=-1)
+
+#-------resample test cases----------
+def test_resample():
+    ts = ArrayTimeSeries([0, 10, 59, 60, 130, 179], [1, 2, 3, 4, 5, 6])
+    assert ts.resample(60) == ArrayTimeSeries([0, 60, 120], [2.0, 4.0, 5.5])
+    assert ts.resample(60, 'sum') == ArrayTimeSeries([0, 60, 120], [6, 4, 11])
+    assert ts.resample(60, 'min') == ArrayTimeSeries([0, 60, 120], [1, 4, 5])
+    assert ts.resample(60, 'max') == ArrayTimeSeries([0, 60, 120], [3, 4, 6])
+    assert ts.resample(60, 'count') == ArrayTimeSeries([0, 60, 120], [3, 1, 2])
+    assert ts.resample(60, 'first') == ArrayTimeSeries([0, 60, 120], [1, 4, 5])
+    assert ts.resample(60, 'last') == ArrayTimeSeries([0, 60, 120], [3, 4, 6])
+    assert ts.resample(60, origin=30) == ArrayTimeSeries([-30, 30, 90, 150], [1.5, 3.5, 5.0, 6.0])
+
+def test_resample_fill():
+    ts = ArrayTimeSeries([0.5, 130.2], [1.0, 2.0])
+    result = ts.resample(60, fill=np.nan)
+    assert list(result.times()) == [0, 60, 120]
+    values = result.values()
+    assert values[0] == 1.0 and np.isnan(values[1]) and values[2] == 2.0
+    assert ts.resample(60, 'count', fill=-1) == ArrayTimeSeries([0, 60, 120], [1, 0, 1])
+
+def test_resample_matches_loop():
+    rs = np.random.RandomState(7)
+    ts = ArrayTimeSeries(rs.uniform(0, 1000, 5000), rs.normal(0, 1, 5000))
+    result = ts.resample(7.5, 'mean')
+    for t, v in result.iteritems():
+        inside = (ts.times() >= t) & (ts.times() < t + 7.5)
+        assert np.isclose(v, np.mean(ts.values()[inside]))
+
+def test_resample_float_boundary():
+    ts = ArrayTimeSeries([0.1 * 3, 0.5, 0.1 * 7, 0.1 * 29], [1, 2, 3, 4])
+    assert ts.resample(0.1, 'first') == ArrayTimeSeries([0.1 * 3, 0.1 * 5, 0.1 * 7, 0.1 * 29], [1, 2, 3, 4])
+    assert ArrayTimeSeries([0.5], [1]).resample(0.1).times()[0] == 0.5
+    rs = np.random.RandomState(8)
+    times = np.sort(np.round(rs.uniform(0, 100, 1000), 1))
+    ts = ArrayTimeSeries(times, np.arange(1000))
+    result = ts.resample(0.1, 'count', origin=0.05)
+    for t, c in result.iteritems():
+        assert c == np.sum((times >= t) & (times < 0.05 + (round((t - 0.05) / 0.1) + 1) * 0.1))
+
+def test_resample_errors():
+    ts = ArrayTimeSeries([1, 2], [3, 4])
+    with raises(ValueError):
+        ts.resample(0)
+    with raises(ValueError):
+        ts.resample(1, 'median')
+    assert len(ArrayTimeSeries([], []).resample(5)) == 0
+
+#-------align test cases----------
+def test_align_inner():
+    a = ArrayTimeSeries([1, 2, 3, 5], [10, 20, 30, 50])
+    b = ArrayTimeSeries([2, 3, 4, 6], [1, 2, 3, 4])
+    left, right = a.align(b)
+    assert left == ArrayTimeSeries([2, 3], [20, 30])
+    assert right == ArrayTimeSeries([2, 3], [1, 2])
+    assert left + right == ArrayTimeSeries([2, 3], [21, 32])
+
+def test_align_outer():
+    a = ArrayTimeSeries([1, 2, 3, 5], [10, 20, 30, 50])
+    b = ArrayTimeSeries([2, 3, 4, 6], [1, 2, 3, 4])
+    left, right = a.align(b, 'outer', fill=0)
+    assert left == ArrayTimeSeries([1, 2, 3, 4, 5, 6], [10, 20, 30, 0, 50, 0])
+    assert right == ArrayTimeSeries([1, 2, 3, 4, 5, 6], [0, 1, 2, 3, 0, 4])
+    left, right = a.align(b, 'outer', method='interpolate')
+    assert list(left.values()[:5]) == [10, 20, 30, 40, 50] and np.isnan(left.values()[5])
+    assert list(right.values()[1:]) == [1, 2, 3, 3.5, 4] and np.isnan(right.values()[0])
+    left, right = a.align(b, 'outer', method='ffill', fill=-1)
+    assert list(left.values()) == [10, 20, 30, 30, 50, 50]
+    assert list(right.values()) == [-1, 1, 2, 3, 3, 4]
+
+def test_align_left_and_asof():
+    a = ArrayTimeSeries([1, 2, 3, 5], [10, 20, 30, 50])
+    b = ArrayTimeSeries([2, 3, 4, 6], [1, 2, 3, 4])
+    left, right = a.align(b, 'left', fill=0)
+    assert left == a
+    assert right == ArrayTimeSeries([1, 2, 3, 5], [0, 1, 2, 0])
+    left, right = a.align(b, 'asof', fill=0)
+    assert right == ArrayTimeSeries([1, 2, 3, 5], [0, 1, 2, 3])
+    left, right = a.align(b, 'asof', fill=0, tolerance=0)
+    assert right == ArrayTimeSeries([1, 2, 3, 5], [0, 1, 2, 0])
+
+def test_align_write():
+    a = ArrayTimeSeries([1, 2, 3], [1, 2, 3])
+    b = ArrayTimeSeries([2, 3], [20, 30])
+    for how in ('inner', 'outer', 'left', 'asof'):
+        left, right = a.align(b, how, fill=0)
+        left[0] = 100
+        right[0] = 200
+        assert a == ArrayTimeSeries([1, 2, 3], [1, 2, 3])
+        assert b == ArrayTimeSeries([2, 3], [20, 30])
+
+def test_align_repeated_times():
+    with raises(ValueError):
+        ArrayTimeSeries([1, 1, 2], [1, 2, 3]).align(ArrayTimeSeries([1, 2], [5, 6]))
+    with raises(ValueError):
+        ArrayTimeSeries([1, 2], [5, 6]).align(ArrayTimeSeries([1, 1, 2], [1, 2, 3]), 'asof')
+
+def test_align_matches_interpolate():
+    rs = np.random.RandomState(8)
+    a = ArrayTimeSeries(np.sort(rs.uniform(0, 100, 500)), rs.normal(0, 1, 500))
+    b = ArrayTimeSeries(np.sort(rs.uniform(10, 90, 300)), rs.normal(0, 1, 300))
+    left, right = b.align(a, 'left', method='interpolate')
+    assert np.allclose(right.values(), a.interpolate(b.times()).values())
+
+def test_apply_aligned():
+    import operator
+    a = ArrayTimeSeries([1, 2, 3], [1, 2, 3])
+    b = ArrayTimeSeries([2, 3, 4], [10, 20, 30])
+    assert a.apply_aligned(b, operator.add, 'outer', fill=0) == ArrayTimeSeries([1, 2, 3, 4], [1, 12, 23, 30])
+    assert a.apply_aligned(b, operator.mul) == ArrayTimeSeries([2, 3], [20, 60])
+    with raises(ValueError):
+        a + b
+    with raises(ValueError):
+        a.align(b, 'right')
+    with raises(ValueError):
+        a.align(b, method='nearest')
+
+#-------correlation test cases----------
+def test_xcorr_matches_direct_sum():
+    rs = np.random.RandomState(13)
+    x, y = rs.normal(0, 1, 40), rs.normal(0, 1, 25)
+    result = ArrayTimeSeries(np.arange(40), x).xcorr(ArrayTimeSeries(np.arange(25), y), normalize=False)
+    assert list(result.times()) == list(range(-24, 40))
+    direct = [sum(x[t+lag] * y[t] for t in range(25) if 0 <= t + lag < 40) for lag in range(-24, 40)]
+    assert np.allclose(result.values(), direct)
+
+def test_best_lag():
+    rs = np.random.RandomState(14)
+    x = rs.normal(0, 1, 500)
+    a = ArrayTimeSeries(np.arange(500), x)
+    b = ArrayTimeSeries(np.arange(500), np.concatenate([np.zeros(7), x[:-7]]))
+    lag, correlation = b.best_lag(a)
+    assert lag == 7
+    assert 0.95 < correlation <= 1
+    assert a.best_lag(b)[0] == -7
+    assert a.best_lag(b, max_lag=5)[0] != -7
+
+def test_autocorr():
+    a = ArrayTimeSeries(np.arange(100), np.sin(np.arange(100) * 2 * np.pi / 10))
+    result = a.autocorr(max_lag=10)
+    assert list(result.times()) == list(range(11))
+    assert np.isclose(result.values()[0], 1)
+    assert np.argmax(result.values()[1:]) + 1 == 10
+    assert np.argmin(result.values()) == 5
+    with raises(ValueError):
+        a.xcorr(a, max_lag=-1)
+    with raises(ValueError):
+        a.xcorr(ArrayTimeSeries([], []))
+
+#-------paa and sax test cases----------
+def test_paa():
+    ts = ArrayTimeSeries(np.arange(8), [1, 2, 3, 4, 5, 6, 7, 8])
+    assert ts.paa(4).tolist() == [1.5, 3.5, 5.5, 7.5]
+    assert ts.paa(3).tolist() == [1.5, 4.0, 7.0]
+    with raises(ValueError):
+        ts.paa(9)
+
+def test_sax():
+    ts = ArrayTimeSeries(np.arange(8), [1, 2, 3, 4, 5, 6, 7, 8])
+    assert ts.sax(4, 4).tolist() == [0, 1, 2, 3]
+    assert ts.sax(2, 2).tolist() == [0, 1]
+    assert (ts * 10 + 3).sax(4, 4).tolist() == [0, 1, 2, 3]
+    with raises(ValueError):
+        ts.sax(4, 1)
@@ -0,0 +1,73 @@
+import numpy as np
+import math
+from pytest import raises
+from timeseries.ArrayTimeSeries import ArrayTimeSeries
+from timeseries.ChunkedTimeSeries import ChunkedTimeSeries
+
+def make_ts():
+    time = np.arange(0, 1000, 2)
+    data = np.sin(time / 10.0) * 100 + 1e6
+    return ArrayTimeSeries(time, data)
+
+#-------save and constructor test cases----------
+def test_save_open(tmpdir):
+    path = str(tmpdir.join('ts.chunks'))
+    ts = make_ts()
+    ChunkedTimeSeries.save(ts, path, chunk_size=64)
+    cts = ChunkedTimeSeries(path)
+    assert len(cts) == 500
+    assert len(cts._index['chunks']) == 8
+    assert cts.between() == ts
+
+def test_open_not_chunked(tmpdir):
+    path = str(tmpdir.join('ts.bin'))
+    make_ts().save(path)
+    with raises(ValueError):
+        ChunkedTimeSeries(path)
+
+def test_save_chunk_size(tmpdir):
+    path = str(tmpdir.join('ts.chunks'))
+    with raises(ValueError):
+        ChunkedTimeSeries.save(make_ts(), path, chunk_size=0)
+
+def test_save_empty(tmpdir):
+    path = str(tmpdir.join('ts.chunks'))
+    ChunkedTimeSeries.save(ArrayTimeSeries([], []), path)
+    cts = ChunkedTimeSeries(path)
+    assert len(cts) == 0
+    assert len(cts.between(0, 10)) == 0
+
+#-------between test cases----------
+def test_between(tmpdir):
+    path = str(tmpdir.join('ts.chunks'))
+    ts = make_ts()
+    ChunkedTimeSeries.save(ts, path, chunk_size=64)
+    cts = ChunkedTimeSeries(path)
+    assert cts.between(100, 300) == ts.between(100, 300)
+    assert cts.between(127, 129) == ts.between(127, 129)
+    assert cts.between(stop=10) == ts.between(stop=10)
+    assert cts.between(990) == ts.between(990)
+    assert len(cts.between(2000, 3000)) == 0
+
+def test_between_reads_overlapping_chunks(tmpdir):
+    path = str(tmpdir.join('ts.chunks'))
+    ChunkedTimeSeries.save(make_ts(), path, chunk_size=64)
+    cts = ChunkedTimeSeries(path)
+    read = []
+    read_chunk = cts._read_chunk
+    def counting_read_chunk(f, chunk):
+        read.append(chunk['offset'])
+        return read_chunk(f, chunk)
+    cts._read_chunk = counting_read_chunk
+    cts.between(100, 250)
+    assert len(read) == 2
+
+#-------mean and std test cases----------
+def test_mean_std(tmpdir):
+    path = str(tmpdir.join('ts.chunks'))
+    ts = make_ts()
+    ChunkedTimeSeries.save(ts, path, chunk_size=64)
+    cts = ChunkedTimeSeries(path)
+    cts._read_chunk = None
+    assert math.isclose(cts.mean(), ts.mean(), rel_tol=1e-12)
+    assert math.isclose(cts.std(), ts.std(), rel_tol=1e-9)
@@ -0,0 +1,74 @@
+import numpy as np
+from pytest import raises
+from timeseries import dtw
+from timeseries.ArrayTimeSeries import ArrayTimeSeries
+
+def full_table(a, b, window=None):
+    n, m = len(a), len(b)
+    window = max(n, m) if window is None else max(window, abs(n - m))
+    table = np.full((n + 1, m + 1), np.inf)
+    table[0, 0] = 0
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            if abs(i - j) <= window:
+                table[i, j] = (a[i-1] - b[j-1])**2 + min(table[i-1, j-1], table[i-1, j], table[i, j-1])
+    return np.sqrt(table[n, m])
+
+#-------distance test cases----------
+def test_distance_matches_full_table():
+    rs = np.random.RandomState(16)
+    for window in [None, 0, 1, 3]:
+        for _ in range(20):
+            a, b = rs.normal(0, 1, rs.randint(1, 15)), rs.normal(0, 1, rs.randint(1, 15))
+            assert np.isclose(dtw.distance(a, b, window), full_table(a, b, window))
+
+def test_distance_warps():
+    a = ArrayTimeSeries(np.arange(6), [0, 1, 2, 3, 2, 0])
+    b = ArrayTimeSeries(np.arange(8), [0, 0, 1, 1, 2, 3, 2, 0])
+    assert a.dtw(b) == 0
+    assert a.dtw(b, window=0) == 0
+    assert dtw.distance([0, 0, 1, 0], [0, 1, 0, 0], window=0) == np.sqrt(2)
+    assert dtw.distance([0, 0, 1, 0], [0, 1, 0, 0], window=1) == 0
+
+def test_cutoff():
+    rs = np.random.RandomState(17)
+    a, b = rs.normal(0, 1, 50), rs.normal(0, 1, 50)
+    d = dtw.distance(a, b, 5)
+    assert dtw.distance(a, b, 5, cutoff=d / 2) == np.inf
+    assert np.isclose(dtw.distance(a, b, 5, cutoff=d * 1.01), d)
+
+#-------lower bound test cases----------
+def test_lower_bounds():
+    rs = np.random.RandomState(18)
+    for window in [0, 2, 5]:
+        for _ in range(20):
+            a, b = rs.normal(0, 1, (2, 20))
+            d = dtw.distance(a, b, window)
+            assert dtw.lb_kim(a, b) <= d + 1e-12
+            assert dtw.lb_keogh(a, b, window) <= d + 1e-12
+    lower, upper = dtw.envelope(np.array([3, 1, 4, 1, 5]), 1)
+    assert lower.tolist() == [1, 1, 1, 1, 1]
+    assert upper.tolist() == [3, 4, 4, 5, 5]
+
+#-------search test cases----------
+def test_search_matches_brute_force():
+    rs = np.random.RandomState(19)
+    data = np.cumsum(rs.normal(0, 1, (500, 64)), axis=1)
+    query = data[42] + rs.normal(0, 0.3, 64)
+    result, computed = dtw.search(query, data, k=3, window=8)
+    expected = sorted((dtw.distance(query, row, 8), i) for i, row in enumerate(data))[:3]
+    assert [p for d, p in result] == [p for d, p in expected]
+    assert np.allclose([d for d, p in result], [d for d, p in expected])
+    assert result[0][1] == 42
+    assert computed < 100
+
+def test_search_time_series():
+    corpus = [ArrayTimeSeries(np.arange(5), v) for v in ([0, 1, 2, 1, 0], [5, 5, 5, 5, 5], [0, 0, 1, 2, 1])]
+    result, computed = dtw.search(ArrayTimeSeries(np.arange(5), [0, 1, 2, 1, 0]), corpus, k=2)
+    assert [p for d, p in result] == [0, 2]
+    with raises(ValueError):
+        dtw.search([1, 2, 3], corpus)
+    with raises(ValueError):
+        dtw.distance([], [1])
+    with raises(ValueError):
+        dtw.distance([1], [1], window=-1)
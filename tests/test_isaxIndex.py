@@ -0,0 +1,69 @@
+import os
+import tempfile
+import numpy as np
+from pytest import raises
+from timeseries import stats
+from timeseries.ArrayTimeSeries import ArrayTimeSeries
+from timeseries.ISAXIndex import ISAXIndex
+
+def brute_force(data, query, k):
+    distances = np.sqrt(np.sum((stats.znormalize(data) - stats.znormalize(query))**2, axis=1))
+    return np.sort(distances)[:k]
+
+#-------insert test cases----------
+def test_insert_splits_leaves():
+    rs = np.random.RandomState(20)
+    data = np.cumsum(rs.normal(0, 1, (2000, 32)), axis=1)
+    index = ISAXIndex(32, segments=4, leaf_size=20)
+    index.insert_many(data[:1000])
+    for row in data[1000:]:
+        index.insert(ArrayTimeSeries(np.arange(32), row))
+    assert len(index) == 2000
+    leaves = [n for n in index._nodes if n['children'] is None]
+    assert sorted(m for n in leaves for m in n['members']) == list(range(2000))
+    assert all(len(n['members']) <= 20 for n in leaves if min(n['bits']) < 8)
+
+#-------query test cases----------
+def test_query_exact_and_approximate():
+    rs = np.random.RandomState(21)
+    data = np.cumsum(rs.normal(0, 1, (3000, 32)), axis=1)
+    index = ISAXIndex(32, segments=4, leaf_size=50)
+    index.insert_many(data)
+    for _ in range(10):
+        position = rs.randint(3000)
+        query = data[position] + rs.normal(0, 0.1, 32)
+        result = index.query(query, k=3, leaves=None)
+        assert np.allclose([d for d, p in result], brute_force(data, query, 3))
+        approximate = index.query(query, k=1, leaves=1)
+        assert index._leaves_visited == 1
+        assert approximate[0][0] >= result[0][0]
+    assert index.query(data[7], leaves=1)[0][1] == 7
+
+def test_query_errors():
+    index = ISAXIndex(4, segments=2)
+    index.insert([1, 2, 3, 4])
+    with raises(ValueError):
+        index.query([1, 2, 3])
+    with raises(ValueError):
+        index.query([1, 2, 3, 4], k=0)
+    with raises(ValueError):
+        index.insert([1, 2, 3])
+    with raises(ValueError):
+        ISAXIndex(4, segments=5)
+    with raises(ValueError):
+        ISAXIndex(4, bits=9)
+
+#-------save and open test cases----------
+def test_save_open():
+    rs = np.random.RandomState(22)
+    data = np.cumsum(rs.normal(0, 1, (500, 16)), axis=1)
+    index = ISAXIndex(16, segments=4, leaf_size=10)
+    index.insert_many(data[:400])
+    path = os.path.join(tempfile.mkdtemp(), 'index.isax')
+    index.save(path)
+    opened = ISAXIndex.open(path)
+    assert len(opened) == 400
+    assert opened.query(data[3], k=2) == index.query(data[3], k=2)
+    opened.insert_many(data[400:])
+    index.insert_many(data[400:])
+    assert opened.query(data[450], k=3, leaves=None) == index.query(data[450], k=3, leaves=None)
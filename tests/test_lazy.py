@@ -0,0 +1,186 @@
+import threading
+import concurrent.futures
+import numpy as np
+from pytest import raises
+from timeseries.lazy import LazyOperation, identity
+from timeseries.ArrayTimeSeries import ArrayTimeSeries
+from timeseries.TimeSeries import TimeSeries
+
+def counting(function, calls):
+    def counted(*args, **kwargs):
+        calls.append(function.__name__)
+        return function(*args, **kwargs)
+    counted.__name__ = function.__name__
+    return counted
+
+def add(a, b):
+    return a + b
+
+def mul(a, b):
+    return a * b
+
+#-------eval test cases----------
+def test_eval():
+    assert LazyOperation(add, 1, LazyOperation(mul, 2, 3)).eval() == 7
+
+def test_eval_kwargs():
+    assert LazyOperation(add, a=1, b=LazyOperation(mul, 2, b=3)).eval() == 7
+
+def test_eval_deep():
+    node = LazyOperation(identity, 0)
+    for i in range(5000):
+        node = LazyOperation(add, node, 1)
+    assert node.eval() == 5000
+
+#-------common subexpression test cases----------
+def test_shared_node_evaluated_once():
+    calls = []
+    shared = LazyOperation(counting(mul, calls), 2, 3)
+    expr = LazyOperation(counting(add, calls), shared, LazyOperation(counting(add, calls), shared, shared))
+    assert expr.eval() == 18
+    assert calls.count('mul') == 1
+
+def test_equal_subexpressions_evaluated_once():
+    calls = []
+    cmul = counting(mul, calls)
+    ts = ArrayTimeSeries([1, 2, 3], [4, 5, 6])
+    left = LazyOperation(cmul, ts.lazy, 2)
+    right = LazyOperation(cmul, ts.lazy, 2)
+    assert LazyOperation(add, left, right).eval() == ArrayTimeSeries([1, 2, 3], [16, 20, 24])
+    assert calls == ['mul']
+
+def test_different_arguments_not_shared():
+    calls = []
+    cmul = counting(mul, calls)
+    expr = LazyOperation(add, LazyOperation(cmul, 2, 3), LazyOperation(cmul, 2, 4))
+    assert expr.eval() == 14
+    assert len(calls) == 2
+
+def test_signed_zero_not_shared():
+    pair = LazyOperation(lambda a, b: (a, b), LazyOperation(mul, 0.0, 1), LazyOperation(mul, -0.0, 1))
+    assert [repr(x) for x in pair.eval()] == ['0.0', '-0.0']
+    identity = lambda a: a
+    pair = LazyOperation(lambda a, b: (a, b), LazyOperation(identity, (1,)), LazyOperation(identity, (1.0,)))
+    assert [repr(x) for x in pair.eval()] == ['(1,)', '(1.0,)']
+    pair = LazyOperation(lambda a, b: (a, b), LazyOperation(identity, (0.0,)), LazyOperation(identity, (-0.0,)))
+    assert [repr(x) for x in pair.eval()] == ['(0.0,)', '(-0.0,)']
+    pair = LazyOperation(lambda a, b: (a, b), LazyOperation(identity, frozenset({1})),
+                         LazyOperation(identity, frozenset({1.0})))
+    assert [repr(x) for x in pair.eval()] == ['frozenset({1})', 'frozenset({1.0})']
+    calls = []
+    shared = counting(identity, calls)
+    pair = LazyOperation(lambda a, b: (a, b), LazyOperation(shared, (1, 'a')), LazyOperation(shared, (1, 'a')))
+    assert pair.eval() == ((1, 'a'), (1, 'a'))
+    assert len(calls) == 1
+
+def test_eval_recomputes_without_cache():
+    calls = []
+    node = LazyOperation(counting(mul, calls), 2, 3)
+    node.eval()
+    node.eval()
+    assert len(calls) == 2
+
+#-------cache test cases----------
+def test_cache():
+    calls = []
+    cached = LazyOperation(counting(mul, calls), LazyOperation(counting(add, calls), 1, 2), 3).cache()
+    assert LazyOperation(add, cached, 1).eval() == 10
+    assert LazyOperation(add, cached, 2).eval() == 11
+    assert calls == ['add', 'mul']
+
+def test_clear_cache():
+    calls = []
+    cached = LazyOperation(counting(mul, calls), 2, 3).cache()
+    cached.eval()
+    cached.clear_cache()
+    cached.eval()
+    assert len(calls) == 2
+
+#-------fused arithmetic test cases----------
+def make_series():
+    time = [1, 2, 3, 4]
+    return [ArrayTimeSeries(time, [4, 5, 6, 7]), ArrayTimeSeries(time, [1, 2, 3, 4]),
+            ArrayTimeSeries(time, [2.5, 0.5, 1, 2]), ArrayTimeSeries(time, [7, 1, 3, 2])]
+
+def test_fused_matches_eager():
+    a, b, c, d = make_series()
+    assert ((a.lazy + b.lazy) * c.lazy - d.lazy).eval() == (a + b) * c - d
+    assert (-(a.lazy / b.lazy) ** 2 + (+c.lazy)).eval() == -(a / b) ** 2 + (+c)
+
+def test_fused_scalars():
+    a, b, c, d = make_series()
+    assert (2 * a.lazy + 1).eval() == 2 * a + 1
+    assert (1 / a.lazy - b.lazy / 2).eval() == 1 / a - b / 2
+    assert (10 - a.lazy ** 2).eval() == 10 - a ** 2
+
+def test_fused_no_intermediate_series(monkeypatch):
+    a, b, c, d = make_series()
+    built = []
+    with_value = ArrayTimeSeries._with_value
+    def counting_with_value(self, value):
+        built.append(value)
+        return with_value(self, value)
+    monkeypatch.setattr(ArrayTimeSeries, '_with_value', counting_with_value)
+    monkeypatch.setattr(ArrayTimeSeries, '__add__', None)
+    monkeypatch.setattr(ArrayTimeSeries, '__mul__', None)
+    result = ((a.lazy + b.lazy) * c.lazy - d.lazy).eval()
+    assert len(built) == 1
+    assert all(result.values() == np.array([5.5, 2.5, 6, 20]))
+
+def test_fused_diff_time():
+    a = ArrayTimeSeries([1, 2, 3], [4, 5, 6])
+    b = ArrayTimeSeries([1, 2, 4], [4, 5, 6])
+    with raises(ValueError):
+        (a.lazy + a.lazy * b.lazy).eval()
+
+def test_fused_shared_subexpression():
+    a, b, c, d = make_series()
+    s = a.lazy + b.lazy
+    assert (s * s - s).eval() == (a + b) * (a + b) - (a + b)
+
+def test_fused_does_not_modify_operands():
+    a, b, c, d = make_series()
+    ((a.lazy + b.lazy) * c.lazy).eval()
+    assert a == make_series()[0] and b == make_series()[1]
+
+def test_fused_inside_function():
+    a, b, c, d = make_series()
+    assert LazyOperation(ArrayTimeSeries.mean, a.lazy + b.lazy).eval() == (a + b).mean()
+
+def test_unfused_time_series():
+    ts = TimeSeries([4, 5, 6], [1, 2, 3])
+    assert (ts.lazy + ts.lazy * ts.lazy).eval() == ts + ts * ts
+
+#-------parallel eval test cases----------
+def test_parallel_matches_serial():
+    series = make_series()
+    means = [LazyOperation(ArrayTimeSeries.mean, ts.lazy * 2 + i) for i, ts in enumerate(series)]
+    total = LazyOperation(add, LazyOperation(add, means[0], means[1]), LazyOperation(add, means[2], means[3]))
+    assert total.eval(workers=4) == total.eval()
+
+def test_parallel_independent_subtrees():
+    barrier = threading.Barrier(2, timeout=5)
+    def wait(x):
+        barrier.wait()
+        return x
+    expr = LazyOperation(add, LazyOperation(wait, 1), LazyOperation(wait, 2))
+    assert expr.eval(workers=2) == 3
+
+def test_parallel_shared_node_evaluated_once():
+    calls = []
+    shared = LazyOperation(counting(mul, calls), 2, 3)
+    expr = LazyOperation(add, LazyOperation(add, shared, 1), LazyOperation(mul, shared, 2))
+    assert expr.eval(workers=3) == 19
+    assert calls == ['mul']
+
+def test_parallel_error():
+    expr = LazyOperation(add, LazyOperation(mul, 2, 3), LazyOperation(add, 'a', 1))
+    with raises(TypeError):
+        expr.eval(workers=2)
+
+def test_process_pool():
+    a, b, c, d = make_series()
+    expr = LazyOperation(add, LazyOperation(ArrayTimeSeries.mean, a.lazy * b.lazy),
+                         LazyOperation(ArrayTimeSeries.std, c.lazy - d.lazy))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=2) as pool:
+        assert expr.eval(executor=pool) == expr.eval()
@@ -0,0 +1,82 @@
+import numpy as np
+from pytest import raises
+from timeseries.QuantileSketch import QuantileSketch
+
+def rank_error(values, result, q):
+    values = np.sort(values)
+    low = np.searchsorted(values, result, side='left') / len(values)
+    high = np.searchsorted(values, result, side='right') / len(values)
+    return max(low - q, q - high, 0)
+
+#-------update test cases----------
+def test_small_exact():
+    sketch = QuantileSketch(k=200, seed=0)
+    for v in [5, 1, 4, 2, 3]:
+        sketch.update(v)
+    assert len(sketch) == 5
+    assert sketch.quantile(0) == 1
+    assert sketch.quantile(0.5) == 3
+    assert sketch.quantile(1) == 5
+    assert sketch.quantile([0.2, 0.8]) == [1, 4]
+    assert sketch.rank(3) == 0.6
+    assert sketch.rank(0) == 0.0
+
+def test_bounded_memory():
+    sketch = QuantileSketch(k=100, seed=1)
+    sketch.update_many(np.random.RandomState(1).normal(0, 1, 200000))
+    assert len(sketch) == 200000
+    assert sketch._size() < 4 * 100
+
+def test_error_bound():
+    values = np.random.RandomState(2).exponential(1, 100000)
+    sketch = QuantileSketch(k=200, seed=2)
+    sketch.update_many(values)
+    for q in [0.01, 0.5, 0.95, 0.99]:
+        assert rank_error(values, sketch.quantile(q), q) < 2.5 / 200
+
+def test_update_many_matches_update():
+    values = np.random.RandomState(3).uniform(0, 1, 5000)
+    a = QuantileSketch(k=50, seed=3)
+    a.update_many(values)
+    b = QuantileSketch(k=50, seed=3)
+    for v in values:
+        b.update(v)
+    assert len(a) == len(b) == 5000
+    assert abs(a.quantile(0.5) - b.quantile(0.5)) < 0.05
+
+def test_queries_between_updates():
+    values = np.random.RandomState(4).normal(0, 1, 5000)
+    a = QuantileSketch(k=50, seed=4)
+    b = QuantileSketch(k=50, seed=4)
+    for v in values:
+        a.update(v)
+        a.quantile(0.5)
+        b.update(v)
+        b._sorted = None
+        assert a.quantile([0.1, 0.5, 0.9]) == b.quantile([0.1, 0.5, 0.9])
+        assert a.rank(0) == b.rank(0)
+
+#-------merge test cases----------
+def test_merge():
+    rs = np.random.RandomState(4)
+    parts = [rs.normal(i, 1, 20000) for i in range(5)]
+    merged = QuantileSketch(k=200, seed=4)
+    for i, part in enumerate(parts):
+        sketch = QuantileSketch(k=200, seed=i)
+        sketch.update_many(part)
+        merged.merge(sketch)
+    values = np.concatenate(parts)
+    assert len(merged) == 100000
+    assert merged._size() < 4 * 200
+    for q in [0.5, 0.95, 0.99]:
+        assert rank_error(values, merged.quantile(q), q) < 2.5 / 200
+
+def test_errors():
+    with raises(ValueError):
+        QuantileSketch(k=1)
+    sketch = QuantileSketch()
+    with raises(ValueError):
+        sketch.quantile(0.5)
+    sketch.update(1)
+    with raises(ValueError):
+        sketch.quantile(1.5)
@@ -0,0 +1,50 @@
+import numpy as np
+from pytest import raises
+from timeseries import stats
+from timeseries.ArrayTimeSeries import ArrayTimeSeries
+from timeseries.TimeSeriesCollection import TimeSeriesCollection
+from timeseries.SimilaritySearch import SimilaritySearch
+
+def brute_force(data, query, k):
+    distances = np.sqrt(np.sum((stats.znormalize(data) - stats.znormalize(query))**2, axis=1))
+    order = np.argsort(distances, kind='stable')[:k]
+    return distances[order]
+
+#-------query test cases----------
+def test_query_matches_brute_force():
+    rs = np.random.RandomState(11)
+    data = np.cumsum(rs.normal(0, 1, (3000, 32)), axis=1)
+    index = SimilaritySearch(data, seed=1)
+    assert len(index) == 3000
+    for _ in range(10):
+        query = data[rs.randint(3000)] + rs.normal(0, 0.5, 32)
+        result = index.query(query, k=5)
+        assert np.allclose([d for d, i in result], brute_force(data, query, 5))
+        assert index._distance_count < 3000
+
+def test_query_time_series():
+    time = np.arange(20)
+    corpus = [ArrayTimeSeries(time, np.sin(time / (i + 1.0))) for i in range(30)]
+    index = SimilaritySearch(corpus, leaf_size=4)
+    distance, position = index.query(ArrayTimeSeries(time, 5 + 3 * np.sin(time / 7.0)))[0]
+    assert position == 6
+    assert np.isclose(distance, 0)
+    collection = TimeSeriesCollection.from_series(corpus)
+    assert SimilaritySearch(collection).query(corpus[2], k=3)[0][1] == 2
+
+def test_query_constant_and_k():
+    data = np.array([[1, 1, 1, 1], [1, 2, 3, 4], [2, 2, 2, 2]])
+    index = SimilaritySearch(data)
+    assert len(index.query([5, 5, 5, 5], k=10)) == 3
+    assert sorted(i for d, i in index.query([5, 5, 5, 5], k=2)) == [0, 2]
+
+def test_errors():
+    with raises(ValueError):
+        SimilaritySearch([ArrayTimeSeries([1, 2], [1, 2]), ArrayTimeSeries([1, 2, 3], [1, 2, 3])])
+    with raises(ValueError):
+        SimilaritySearch(np.zeros((0, 4)))
+    index = SimilaritySearch(np.ones((3, 4)))
+    with raises(ValueError):
+        index.query([1, 2, 3])
+    with raises(ValueError):
+        index.query([1, 2, 3, 4], k=0)
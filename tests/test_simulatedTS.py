@@ -136,3 +136,280 @@ def test_online_std():
     #print (mean.produce(5))
     assert std.produce(5) == [0, 0.3535533905932738, 3.6631680278141765, 3.0131531103922797, 2.9712993790596056]
     assert std.produce(5) == [2.9545338041728337, 2.697590635751695, 3.110504954413121, 3.0150612671129, 2.985171500749813]
+
+#-------produce_arrays test cases----------
+def test_produce_arrays_number():
+    sts = SimulatedTimeSeries(default_generator(list_value))
+    times, values = sts.produce_arrays(4)
+    assert list(times) == [0, 1, 2, 3]
+    assert list(values) == list_value[:4]
+    times, values = sts.produce_arrays(4)
+    assert list(times) == [4, 5, 6, 7]
+    assert list(values) == list_value[4:8]
+
+def test_produce_arrays_tuple():
+    sts = SimulatedTimeSeries(default_generator(list_tuple))
+    times, values = sts.produce_arrays(5)
+    assert times.flags['C_CONTIGUOUS'] and values.flags['C_CONTIGUOUS']
+    assert list(times) == [1, 2, 3, 4, 5]
+    assert list(values) == list_value[:5]
+
+def test_produce_mixed_times():
+    sts = SimulatedTimeSeries(iter(range(10)))
+    assert sts.produce(3) == [0, 1, 2]
+    times, values = sts.produce_arrays(3)
+    assert times.tolist() == [3, 4, 5] and values.tolist() == [3, 4, 5]
+    assert next(sts.iteritems()) == (6, 6)
+    assert next(sts.itertimes()) == 7
+    times, values = sts.produce_arrays(5)
+    assert times.tolist() == [8, 9] and values.tolist() == [8, 9]
+    sts = SimulatedTimeSeries(iter(range(10)))
+    sts.produce(4)
+    assert list(sts.rolling_max(size=2).itertimes()) == [4, 5, 6, 7, 8, 9]
+    sts = SimulatedTimeSeries(iter(range(10)))
+    sts.produce(2)
+    a, b = sts.tee()
+    assert a.produce_arrays(2)[0].tolist() == [2, 3]
+    assert b.produce_arrays(2)[0].tolist() == [2, 3]
+    sts = SimulatedTimeSeries(iter(range(4)))
+    sts.produce(2)
+    assert SimulatedTimeSeries.merge([sts, iter([7])]).produce(3) == [(0, 7), (2, 2), (3, 3)]
+
+def test_produce_arrays_large_int_time():
+    sts = SimulatedTimeSeries(iter([(10**17+1, 1.5), (10**17+3, 2.5)]))
+    times, values = sts.produce_arrays(2)
+    assert times.tolist() == [10**17+1, 10**17+3]
+    assert times.dtype.kind == 'i'
+    assert values.tolist() == [1.5, 2.5]
+
+def test_produce_arrays_exhausted():
+    sts = SimulatedTimeSeries(default_generator(list_value))
+    times, values = sts.produce_arrays(100)
+    assert len(times) == len(values) == 10
+    times, values = sts.produce_arrays(100)
+    assert len(times) == len(values) == 0
+
+def test_produce_arrays_online_mean():
+    sts = SimulatedTimeSeries(default_generator(list_value))
+    times, values = sts.online_mean().produce_arrays(10)
+    assert np.allclose(values, de_mean)
+
+#-------online arrays test cases----------
+def random_generator(n, seed=0):
+    rng = np.random.RandomState(seed)
+    for v in rng.normal(1e4, 3, n):
+        yield float(v)
+
+def test_online_mean_arrays():
+    expected = list(SimulatedTimeSeries(random_generator(1000)).online_mean().produce(1000))
+    chunks = list(SimulatedTimeSeries(random_generator(1000)).online_mean_arrays(128))
+    assert [len(c) for c in chunks] == [128]*7 + [104]
+    assert np.allclose(np.concatenate(chunks), expected, rtol=1e-12)
+
+def test_online_std_arrays():
+    expected = list(SimulatedTimeSeries(random_generator(1000)).online_std().produce(1000))
+    result = np.concatenate(list(SimulatedTimeSeries(random_generator(1000)).online_std_arrays(100)))
+    assert np.allclose(result, expected, rtol=1e-9)
+
+def test_online_std_arrays_small():
+    values = [10.68, 10.18, 4.10, 9.05, 11.68, 12.30, 9.80, 4.44, 11.40, 6.41, 9.15]
+    sts = SimulatedTimeSeries(default_generator(values))
+    result = np.concatenate(list(sts.online_std_arrays(3)))
+    assert result[0] == 0
+    assert np.allclose(result[1:5], [0.3535533905932738, 3.6631680278141765, 3.0131531103922797, 2.9712993790596056])
+
+def test_online_mean_arrays_tuple():
+    sts = SimulatedTimeSeries(default_generator(list_tuple))
+    assert np.allclose(np.concatenate(list(sts.online_mean_arrays(4))), de_mean)
+
+#-------rolling test cases----------
+def test_rolling_mean_size():
+    sts = SimulatedTimeSeries(default_generator(list_value))
+    result = sts.rolling_mean(size=3).produce(10)
+    expected = [np.mean(list_value[max(0, i-2):i+1]) for i in range(10)]
+    assert [t for t, v in result] == list(range(10))
+    assert np.allclose([v for t, v in result], expected)
+
+def test_rolling_std_size():
+    sts = SimulatedTimeSeries(default_generator(list_value))
+    result = sts.rolling_std(size=4, ddof=1).produce(10)
+    expected = [np.std(list_value[max(0, i-3):i+1], ddof=1) if i else 0 for i in range(10)]
+    assert np.allclose([v for t, v in result], expected)
+
+def test_rolling_min_max_duration():
+    sts = SimulatedTimeSeries(default_generator(list_tuple))
+    low = sts.rolling_min(duration=3).produce(10)
+    sts = SimulatedTimeSeries(default_generator(list_tuple))
+    high = sts.rolling_max(duration=3).produce(10)
+    for i in range(10):
+        window = list_value[max(0, i-2):i+1]
+        assert low[i] == (list_tuple[i][0], min(window))
+        assert high[i] == (list_tuple[i][0], max(window))
+
+def test_rolling_matches_array():
+    from timeseries.ArrayTimeSeries import ArrayTimeSeries
+    rng = np.random.RandomState(4)
+    time = np.cumsum(rng.uniform(0.1, 2, 200))
+    data = rng.normal(0, 1, 200)
+    ts = ArrayTimeSeries(time, data)
+    pairs = list(zip(time.tolist(), data.tolist()))
+    for name in ['rolling_mean', 'rolling_std', 'rolling_min', 'rolling_max']:
+        sts = SimulatedTimeSeries(default_generator(pairs))
+        times, values = getattr(sts, name)(duration=5).produce_arrays(200)
+        assert np.allclose(values, getattr(ts, name)(duration=5).values())
+
+def test_rolling_arguments():
+    sts = SimulatedTimeSeries(default_generator(list_value))
+    with raises(ValueError):
+        sts.rolling_mean()
+
+#-------ewm test cases----------
+def ewm_loop(values, alpha):
+    mean, var = values[0], 0.0
+    means, variances = [], []
+    for x in values:
+        d = x - mean
+        mean += alpha * d
+        var = (1 - alpha) * (var + alpha * d * d)
+        means.append(mean)
+        variances.append(var)
+    return means, variances
+
+def test_ewm_mean():
+    means, variances = ewm_loop(list_value, 0.3)
+    sts = SimulatedTimeSeries(default_generator(list_value))
+    assert np.allclose(sts.ewm_mean(alpha=0.3).produce(10), means)
+
+def test_ewm_var_tuple():
+    means, variances = ewm_loop(list_value, 0.3)
+    sts = SimulatedTimeSeries(default_generator(list_tuple))
+    assert np.allclose(sts.ewm_var(alpha=0.3).produce(10), variances)
+
+def test_ewm_halflife():
+    sts = SimulatedTimeSeries(default_generator([0.0] + [1.0]*4))
+    assert np.isclose(sts.ewm_mean(halflife=4).produce(5)[-1], 0.5)
+
+def test_ewm_arrays():
+    values = list(np.random.RandomState(7).normal(50, 10, 1000))
+    for alpha in [1, 0.5, 0.01]:
+        means, variances = ewm_loop(values, alpha)
+        sts = SimulatedTimeSeries(default_generator(values))
+        assert np.allclose(np.concatenate(list(sts.ewm_mean_arrays(alpha=alpha, chunk=300))), means)
+        sts = SimulatedTimeSeries(default_generator(values))
+        assert np.allclose(np.concatenate(list(sts.ewm_var_arrays(alpha=alpha, chunk=300))), variances)
+
+def test_ewm_arguments():
+    sts = SimulatedTimeSeries(default_generator(list_value))
+    with raises(ValueError):
+        sts.ewm_mean()
+    with raises(ValueError):
+        sts.ewm_var(alpha=0)
+    with raises(ValueError):
+        sts.ewm_mean_arrays(alpha=0.5, halflife=2)
+    with raises(ValueError):
+        sts.ewm_var_arrays(halflife=-1)
+
+#-------online_quantile test cases----------
+def test_online_quantile():
+    sts = SimulatedTimeSeries(iter(list_tuple))
+    result = sts.online_quantile(0.5).produce(10)
+    assert len(result) == 10
+    assert result[0] == 10.50
+    assert result[-1] == 8.06
+    sts = SimulatedTimeSeries(iter(list_value))
+    assert sts.online_quantile([0, 1]).produce(10)[-1] == [1.01, 10.50]
+
+def test_online_quantile_merge():
+    from timeseries.QuantileSketch import QuantileSketch
+    rs = np.random.RandomState(5)
+    first, second = rs.normal(0, 1, 20000), rs.normal(10, 1, 20000)
+    sketch_a, sketch_b = QuantileSketch(seed=1), QuantileSketch(seed=2)
+    SimulatedTimeSeries(iter(first.tolist())).online_quantile((0.5, 0.95, 0.99), sketch=sketch_a).produce(20000)
+    SimulatedTimeSeries(iter(second.tolist())).online_quantile(0.5, sketch=sketch_b).produce(20000)
+    sketch_a.merge(sketch_b)
+    assert len(sketch_a) == 40000
+    assert abs(sketch_a.rank(5) - 0.5) < 0.02
+    assert abs(sketch_a.quantile(0.75) - 10) < 0.3
+
+def test_online_quantile_arrays():
+    sts = SimulatedTimeSeries(iter(list_tuple))
+    result = list(sts.online_quantile_arrays(0.5, chunk=4))
+    expected = SimulatedTimeSeries(iter(list_tuple)).online_quantile(0.5).produce(10)
+    assert [r.tolist() for r in result] == [[expected[3]], [expected[7]], [expected[9]]]
+    sts = SimulatedTimeSeries(iter(list_value))
+    assert list(sts.online_quantile_arrays([0, 1]))[-1].tolist() == [1.01, 10.50]
+
+#-------tee test cases----------
+def counting_generator(values, pulled):
+    for v in values:
+        pulled.append(v)
+        yield v
+
+def test_tee_one_pass():
+    pulled = []
+    sts = SimulatedTimeSeries(counting_generator(list_value, pulled))
+    a, b = sts.tee()
+    pairs = list(zip(a.online_mean().produce(10), b.online_std().produce(10)))
+    assert pulled == list_value
+    mean_expected = SimulatedTimeSeries(iter(list_value)).online_mean().produce(10)
+    std_expected = SimulatedTimeSeries(iter(list_value)).online_std().produce(10)
+    assert [p[0] for p in pairs] == mean_expected
+    assert [p[1] for p in pairs] == std_expected
+
+def test_tee_bounded():
+    a, b, c = SimulatedTimeSeries(iter(range(100))).tee(3, maxlen=5)
+    assert a.produce(5) == [0, 1, 2, 3, 4]
+    assert b.produce(3) == [0, 1, 2]
+    with raises(BufferError):
+        a.produce(1)
+    assert c.produce(3) == [0, 1, 2]
+    assert b.produce(5) == [3, 4, 5, 6, 7]
+    with raises(BufferError):
+        b.produce(1)
+
+def test_tee_retry_after_limit():
+    a, b = SimulatedTimeSeries(iter(range(20))).tee(maxlen=5)
+    assert a.produce(5) == [0, 1, 2, 3, 4]
+    with raises(BufferError):
+        a.produce(1)
+    with raises(BufferError):
+        a.produce(1)
+    assert b.produce(3) == [0, 1, 2]
+    assert a.produce(3) == [5, 6, 7]
+    assert b.produce(5) == [3, 4, 5, 6, 7]
+    assert a.produce(2) == [8, 9]
+
+def test_tee_closed_branch():
+    a, b = SimulatedTimeSeries(iter(range(100))).tee(maxlen=5)
+    b.produce(1)
+    b._gen.close()
+    assert a.produce(50) == list(range(50))
+    assert list(a.itervalues()) == list(range(50, 100))
+
+def test_tee_errors():
+    with raises(ValueError):
+        SimulatedTimeSeries(iter(list_value)).tee(0)
+    with raises(ValueError):
+        SimulatedTimeSeries(iter(list_value)).tee(2, maxlen=0)
+
+#-------merge test cases----------
+def test_merge():
+    rs = np.random.RandomState(6)
+    lists = [sorted(zip(rs.randint(0, 1000, 200).tolist(), rs.normal(0, 1, 200).tolist())) for _ in range(20)]
+    merged = SimulatedTimeSeries.merge([SimulatedTimeSeries(iter(l)) for l in lists], tagged=True).produce(4000)
+    assert [m[0] for m in merged] == sorted(t for l in lists for t, v in l)
+    for source, l in enumerate(lists):
+        assert [(t, v) for t, v, s in merged if s == source] == l
+
+def test_merge_values_and_chunk():
+    merged = SimulatedTimeSeries.merge([iter([5, 6, 7]), SimulatedTimeSeries(iter(list_tuple[:3])), iter([])], chunk=2)
+    assert list(merged.iteritems()) == [(0, 5), (1, 6), (1, 10.50), (2, 7), (2, 5.33), (3, 10.15)]
+
+def test_merge_batched_pull():
+    a = SimulatedTimeSeries(iter([(1, 1), (3, 3), (5, 5)]))
+    b = SimulatedTimeSeries(iter([(2, 2), (4, 4)]))
+    times, values = SimulatedTimeSeries.merge([a, b]).produce_arrays(4)
+    assert times.tolist() == [1, 2, 3, 4]
+    assert values.tolist() == [1, 2, 3, 4]
+    with raises(ValueError):
+        SimulatedTimeSeries.merge([a, b], chunk=0)
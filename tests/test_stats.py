@@ -0,0 +1,131 @@
+import numpy as np
+from pytest import raises
+from timeseries import stats
+
+#-------combine test cases----------
+def test_combine():
+    values = np.random.RandomState(1).normal(1e6, 2, 1000)
+    a, b = values[:300], values[300:]
+    n, mean, m2 = stats.combine(*(stats.summary(a) + stats.summary(b)))
+    assert n == 1000
+    assert np.isclose(mean, np.mean(values), rtol=1e-14)
+    assert np.isclose(m2 / n, np.var(values), rtol=1e-9)
+
+def test_combine_empty():
+    assert stats.combine(0, 0.0, 0.0, *stats.summary(np.array([1.0, 3.0]))) == (2, 2.0, 2.0)
+    assert stats.combine(0, 0.0, 0.0, 0, 0.0, 0.0) == (0, 0.0, 0.0)
+
+#-------running test cases----------
+def test_running():
+    values = np.random.RandomState(2).normal(5, 1, 50)
+    means, m2s, n, mean, m2 = stats.running(values[20:], *stats.summary(values[:20]))
+    assert n == 50
+    for i in range(30):
+        head = values[:21+i]
+        assert np.isclose(means[i], np.mean(head))
+        assert np.isclose(m2s[i], np.sum((head - np.mean(head))**2))
+
+#-------window test cases----------
+def test_window_extreme_all_lengths():
+    values = np.random.RandomState(5).normal(0, 1, 100)
+    starts = np.random.RandomState(6).randint(0, 100, 100)
+    starts = np.minimum(starts, np.arange(100))
+    low = stats.window_extreme(values, starts, np.minimum)
+    for i in range(100):
+        assert low[i] == values[starts[i]:i+1].min()
+
+def test_rolling_window():
+    window = stats.RollingWindow(size=3)
+    for time, value in enumerate([5, 1, 4, 2, 8, 3]):
+        window.update(time, value)
+    assert window.mean() == np.mean([2, 8, 3])
+    assert np.isclose(window.std(), np.std([2, 8, 3]))
+    assert window.min() == 2 and window.max() == 8
+
+def test_rolling_window_duration():
+    window = stats.RollingWindow(duration=10)
+    window.update(0, 1)
+    window.update(5, 2)
+    window.update(20, 3)
+    assert window.mean() == 3 and window.std() == 0 and window.std(ddof=1) == 0
+
+#-------bucket test cases----------
+def test_bucket_reduce():
+    values = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+    starts = np.array([0, 3, 4])
+    assert stats.bucket_reduce(values, starts, 'mean').tolist() == [2.0, 4.0, 5.5]
+    assert stats.bucket_reduce(values, starts, 'count').tolist() == [3, 1, 2]
+    assert stats.bucket_reduce(values, starts, 'last').tolist() == [3.0, 4.0, 6.0]
+    assert len(stats.bucket_reduce(values[:0], starts[:0], 'sum')) == 0
+
+#-------znormalize and paa test cases----------
+def test_znormalize():
+    z = stats.znormalize(np.array([[1.0, 2.0, 3.0], [5.0, 5.0, 5.0]]))
+    assert np.allclose(z[0].mean(), 0) and np.isclose(z[0].std(), 1)
+    assert z[1].tolist() == [0, 0, 0]
+
+def test_paa_lower_bound():
+    rs = np.random.RandomState(12)
+    a, b = rs.normal(0, 1, (2, 50))
+    lengths = np.diff(np.append(stats.paa_bounds(50, 7), 50))
+    assert lengths.sum() == 50
+    bound = np.sqrt(np.sum(lengths * (stats.paa(a, 7) - stats.paa(b, 7))**2))
+    assert bound <= np.sqrt(np.sum((a - b)**2))
+    assert stats.paa(np.array([[1.0, 3.0, 5.0, 7.0]]), 2).tolist() == [[2.0, 6.0]]
+
+#-------sax test cases----------
+def test_sax_breakpoints_nested():
+    assert np.allclose(stats.sax_breakpoints(4), [-0.6744897501960817, 0, 0.6744897501960817])
+    assert np.array_equal(stats.sax_breakpoints(8)[1::2], stats.sax_breakpoints(4))
+    values = np.random.RandomState(23).normal(0, 1, (100, 40))
+    assert np.array_equal(stats.sax(values, 5, 8) >> 1, stats.sax(values, 5, 4))
+
+def test_sax_breakpoints_normal():
+    assert stats.sax_breakpoints(2).tolist() == [0.0]
+    assert np.allclose(stats.sax_breakpoints(3), [-0.4307272992954576, 0.4307272992954576])
+    assert np.allclose(stats.sax_breakpoints(10)[[0, -1]], [-1.2815515655446004, 1.2815515655446004])
+    breakpoints = stats.sax_breakpoints(256)
+    assert np.all(np.diff(breakpoints) > 0)
+    assert np.array_equal(breakpoints, -breakpoints[::-1])
+
+#-------rows and nearest test cases----------
+def test_rows():
+    from timeseries.ArrayTimeSeries import ArrayTimeSeries
+    expected = [[1.0, 2.0], [3.0, 4.0]]
+    assert stats.rows(np.array(expected)).tolist() == expected
+    assert stats.rows([[1, 2], (3, 4)]).tolist() == expected
+    assert stats.rows([ArrayTimeSeries([0, 1], [1, 2]), ArrayTimeSeries([0, 1], [3, 4])]).tolist() == expected
+    with raises(ValueError):
+        stats.rows([[1, 2], [3]])
+
+def test_nearest():
+    distances = np.random.RandomState(24).uniform(0, 1, 100)
+    nearest = stats.Nearest(3)
+    assert nearest.radius() == np.inf
+    for start in range(0, 100, 7):
+        nearest.add(distances[start:start+7], np.arange(start, min(start + 7, 100)))
+    order = np.argsort(distances)[:3]
+    assert nearest.result() == list(zip(distances[order].tolist(), order.tolist()))
+    assert nearest.radius() == distances[order[-1]]
+    with raises(ValueError):
+        stats.Nearest(0)
+
+#-------cross correlation test cases----------
+def test_cross_correlation_normalized():
+    rs = np.random.RandomState(15)
+    a = rs.normal(3, 2, 64)
+    lags, values = stats.cross_correlation(a, a)
+    assert np.isclose(values[lags == 0][0], 1)
+    assert np.all(np.abs(values) <= 1 + 1e-12)
+    lags, values = stats.cross_correlation(a, np.ones(10))
+    assert np.all(values == 0)
+
+#-------linear scan test cases----------
+def test_linear_scan():
+    b = np.random.RandomState(8).normal(0, 1, 777)
+    expected, y = [], 2.0
+    for x in b:
+        y = 0.9 * y + x
+        expected.append(y)
+    assert np.allclose(stats.linear_scan(b, 0.9, 2.0), expected)
+    assert len(stats.linear_scan(np.array([]), 0.9, 2.0)) == 0
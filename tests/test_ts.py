@@ -116,6 +116,18 @@ def test_unsorted_time():
     ts = TimeSeries(data, time)
     assert repr(ts) == 'TimeSeries([(1, 4), (2, 5), (3, 6)])'
 
+#test presorted time argument
+def test_presorted_time():
+    data = [4,5,6]
+    time = [1,2,3]
+    ts = TimeSeries(data, time, presorted=True)
+    assert ts._key is time and ts._value is data
+    assert ts == TimeSeries(data, time)
+
+def test_presorted_slice():
+    ts = TimeSeries([0,1,2,3,4], [5,6,7,8,9])
+    assert ts[::-2] == TimeSeries([4,2,0], [9,7,5])
+
 #--------str test cases-----------
 # length less or equal than five 
 def test_str_less_than_five():
@@ -323,3 +335,56 @@ def test_bool_zero():
 
 #if __name__ == '__main__':
 #    unittest.main()
+
+#-------value_at test cases----------
+def test_value_at():
+    ts = TimeSeries([0,1,2,3,4], [5,6,7,8,9])
+    assert ts.value_at(5) == 0
+    assert ts.value_at(9) == 4
+
+def test_value_at_missing():
+    ts = TimeSeries([0,1,2,3,4], [5,6,7,8,9])
+    with raises(KeyError):
+        ts.value_at(6.5)
+    with raises(KeyError):
+        ts.value_at(10)
+
+#-------between test cases----------
+def test_between():
+    ts = TimeSeries([0,1,2,3,4], [5,6,7,8,9])
+    assert ts.between(6, 8) == TimeSeries([1,2],[6,7])
+    assert ts.between(5.5, 7.5) == TimeSeries([1,2],[6,7])
+    assert ts.between(8) == TimeSeries([3,4],[8,9])
+    assert ts.between(stop=7) == TimeSeries([0,1],[5,6])
+
+def test_between_empty():
+    ts = TimeSeries([0,1,2,3,4], [5,6,7,8,9])
+    assert len(ts.between(8, 6)) == 0
+    assert len(ts.between(100, 200)) == 0
+
+#-------value index test cases----------
+def test_contains_setitem():
+    ts = TimeSeries([4,5,6,5], [1,2,3,4])
+    assert 5 in ts
+    ts[1] = 7
+    assert 5 in ts and 7 in ts
+    ts[3] = 8
+    assert not 5 in ts
+    assert 8 in ts and 4 in ts
+
+def test_contains_setitem_unhashable():
+    ts = TimeSeries([4,5,6], [1,2,3])
+    assert 4 in ts
+    ts[0] = [1]
+    ts[0] = 9
+    assert 9 in ts and not 4 in ts
+    with raises(IndexError):
+        ts[10] = 1
+    assert 5 in ts
+
+def test_contains_setitem_slice():
+    ts = TimeSeries([4,5,6,5], [1,2,3,4])
+    assert 4 in ts
+    ts[0:2] = [9, 9]
+    assert 9 in ts
+    assert not 4 in ts
@@ -0,0 +1,74 @@
+import numpy as np
+from pytest import raises
+from timeseries.ArrayTimeSeries import ArrayTimeSeries
+from timeseries.TimeSeriesCollection import TimeSeriesCollection
+
+#-------TimeSeriesCollection constructor test cases----------
+def test_init_sorts_time():
+    c = TimeSeriesCollection([3, 1, 2], [[30, 10, 20], [3, 1, 2]])
+    assert list(c.times()) == [1, 2, 3]
+    assert c.values().tolist() == [[10, 20, 30], [1, 2, 3]]
+
+def test_init_errors():
+    with raises(ValueError):
+        TimeSeriesCollection([1, 2], [1, 2])
+    with raises(Exception):
+        TimeSeriesCollection([1, 2], [[1, 2, 3]])
+
+def test_from_series():
+    a = ArrayTimeSeries([1, 2, 3], [1, 2, 3])
+    b = ArrayTimeSeries([1, 2, 3], [4, 5, 6])
+    c = TimeSeriesCollection.from_series([a, b])
+    assert len(c) == 2
+    assert c[1] == b
+    with raises(ValueError):
+        TimeSeriesCollection.from_series([a, ArrayTimeSeries([1, 2, 4], [1, 2, 3])])
+
+#-------view test cases----------
+def test_views_share_data():
+    c = TimeSeriesCollection([1, 2, 3], [[1, 2, 3], [4, 5, 6]])
+    ts = c[0]
+    assert np.shares_memory(ts._value, c._value)
+    assert ts._key is c._key
+    ts[0] = 100
+    assert c.values()[0, 0] == 1
+    assert ts.values()[0] == 100
+    assert [s.values().tolist() for s in c] == [[1, 2, 3], [4, 5, 6]]
+    sub = c[1:]
+    assert isinstance(sub, TimeSeriesCollection) and len(sub) == 1
+    assert np.shares_memory(sub._value, c._value)
+
+#-------statistics test cases----------
+def test_mean_std():
+    rs = np.random.RandomState(9)
+    data = rs.normal(0, 1, (50, 200))
+    c = TimeSeriesCollection(np.arange(200), data)
+    assert np.allclose(c.mean(), [ArrayTimeSeries(np.arange(200), row).mean() for row in data])
+    assert np.allclose(c.std(), [ArrayTimeSeries(np.arange(200), row).std() for row in data])
+
+#-------arithmetic test cases----------
+def test_arithmetic():
+    c = TimeSeriesCollection([1, 2, 3], [[1, 2, 3], [4, 5, 6]])
+    assert (c + 1).values().tolist() == [[2, 3, 4], [5, 6, 7]]
+    assert (1 - c).values().tolist() == [[0, -1, -2], [-3, -4, -5]]
+    assert (c * [1, 10]).values().tolist() == [[1, 2, 3], [40, 50, 60]]
+    assert (c - c[0]).values().tolist() == [[0, 0, 0], [3, 3, 3]]
+    assert (c / c).values().tolist() == [[1, 1, 1], [1, 1, 1]]
+    assert (2 * c).values().tolist() == (-c * -2).values().tolist()
+    assert (c[0] - c).values().tolist() == [[0, 0, 0], [-3, -3, -3]]
+    assert (c[1] * c).values().tolist() == [[4, 10, 18], [16, 25, 36]]
+    with raises(ValueError):
+        c + ArrayTimeSeries([1, 2, 4], [1, 2, 3])
+    with raises(ValueError):
+        c * [1, 2, 3]
+
+#-------interpolate test cases----------
+def test_interpolate():
+    rs = np.random.RandomState(10)
+    time = np.sort(rs.uniform(0, 100, 50))
+    c = TimeSeriesCollection(time, rs.normal(0, 1, (20, 50)))
+    new_time = [-5, 0.5, 17.25, 50, 99.9, 150]
+    result = c.interpolate(new_time)
+    assert list(result.times()) == new_time
+    for row, ts in zip(result, c):
+        assert np.allclose(row.values(), ts.interpolate(new_time).values())
@@ -1,11 +1,14 @@
+import collections
 import numbers
 import reprlib
 import numpy as np
 import sys
-from timeseries.lazy import LazyOperation
+from timeseries.lazy import LazyOperation, identity
 import math
 from timeseries.SizedContainerTimeSeriesInterface import SizedContainerTimeSeriesInterface
 from timeseries.TimeSeriesInterface import TimeSeriesInterface
+from timeseries import stats
+from timeseries import dtw
 
 class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
     '''This is the ArrayTimeSeries class implemented using Python.
@@ -27,6 +30,7 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
          __len__: The function to get the length of the ArrayTimeSeries.
          __getitem__: The function to get a time series item.
          __setitem__: Set the data to the input value at the position specified by index.
+         _mapped: The private helper function to check whether the values are backed by a memory-mapped file.
          __repr__: return formal string representation of the timeseries data.
          __str__: The function to return a string representation of the timeseries data.
 
@@ -39,17 +43,29 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
          items: The function to get a list of time-value tuple pairs.
 
          __contains__: The function to check whether a value is in the time series.
+         value_at: The function to get the value at a time point.
+         between: The function to get the part of the time series within a time range.
          interpolate: for every new time point passed in, compute a value for the ArrayTimeSeries class.
          _binary_search: The private helper function. For a time point, find the nearest two time points.
          __eq__: The function to check whether the new ArrayTimeSeries object is the same as the current one.
          lazy: The function is to change from the lazy decorator on a function to a property of 
            the ArratTimeSeries CLass.
 
+         align: The function to put two ArrayTimeSeries objects on a common time domain.
+         apply_aligned: The function to apply an arithmetic operation to two ArrayTimeSeries objects with 
+           different time domains.
+         _values_on: The private helper function to get the values of the time series at other time points.
          _check_time: The function is a decorator function for checking two ArrayTimeSeries objects have the same
            time domain before doing all the arithmetic operations.
+         _rhs_value: The private helper function to get the operand of an arithmetic operation.
+         _with_value: The private helper function to build a new ArrayTimeSeries on the time domain of self.
          __add__: The arithmetic operation function to add two ArrayTimeSeries objects.
          __sub__: The arithmetic operation function to get the difference of two ArrayTimeSeries objects.
          __mul__: The arithmetic operation function to multiply two ArrayTimeSeries objects elementwise.
+         __truediv__: The arithmetic operation function to divide two ArrayTimeSeries objects elementwise.
+         __pow__: The arithmetic operation function to raise an ArrayTimeSeries object to a power elementwise.
+         __radd__, __rsub__, __rmul__, __rtruediv__, __rpow__: The arithmetic operation functions with a 
+           number on the left hand side.
          __pos__: The uniary operation function to have a new ArrayTimeSeries that have the same time
            domain and value
          __neg__: The uniary operation function negative to have a new ArrayTimeSeries that have 
@@ -58,6 +74,19 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
          __bool__: The function that returns false when the length of self is 0, otherwise true.
          mean: The function that returns the mean of the time series.
          std: The function that returns the standard deviation of the time series data.
+         rolling_mean: The function that returns the mean of a sliding window ending at every time point.
+         rolling_std: The function that returns the standard deviation of a sliding window ending at every time point.
+         rolling_min: The function that returns the minimum of a sliding window ending at every time point.
+         rolling_max: The function that returns the maximum of a sliding window ending at every time point.
+         xcorr: The function to get the cross-correlation with another time series at every lag.
+         autocorr: The function to get the autocorrelation of the time series at every lag.
+         best_lag: The function to find the lag at which another time series matches the time series best.
+         dtw: The function to get the dynamic time warping distance to another time series.
+         paa: The function to get the piecewise aggregate approximation of the time series.
+         sax: The function to get the SAX word of the time series.
+         resample: The function to aggregate the time series over the buckets of a regular time grid.
+         save: The function to write the time series to a binary file.
+         open: The function to open a time series file written by save as a memory-mapped ArrayTimeSeries.
     
        Examples:
        --------  
@@ -80,6 +109,10 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
        [(5, 0), (6, 1), (7, 2), (8, 3), (9, 4)]
        >>> 3 in ArrayTimeSeries([5,6,7,8,9], [0,1,2,3,4])
        True
+       >>> ArrayTimeSeries([5,6,7,8,9], [0,1,2,3,4]).value_at(7)
+       2
+       >>> ArrayTimeSeries([5,6,7,8,9], [0,1,2,3,4]).between(6, 8)
+       ArrayTimeSeries([(6, 1), (7, 2)])
        >>> ArrayTimeSeries([0,5,10], [1,2,3]).interpolate([1])
        ArrayTimeSeries([(1, 1.2)])
        >>> ArrayTimeSeries([1, 2, 3], [4, 5, 6]) == ArrayTimeSeries([1, 2, 3], [4, 5, 6])
@@ -99,19 +132,38 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
        >>> bool(ArrayTimeSeries([1, 2, 3], [4, 5, 6]))
        True
     '''
-    def __init__(self, time, data):
+    # lazy arithmetic on ArrayTimeSeries is computed on the value arrays in one pass, see timeseries.lazy
+    _fusable = True
+    # numpy operands on the left defer to the reflected operators, so np.float64(2) * ts keeps the time
+    __array_ufunc__ = None
+
+    def __init__(self, time, data, presorted=False):
         '''The constructor to initialize a ArrayTimeSeries object.
+           Time points that are already in increasing order are detected in one pass and not sorted again.
            Param: 
              data: the initial sequence-like data to fill the time series. Data can have length 0, but must be given.
              time: the initial time to fill the time series.
+             presorted: if True, time is trusted to be in increasing order. Time and data are neither 
+               checked nor sorted, and numpy arrays are adopted without a copy.
         '''
         if len(time) != len(data):
             raise Exception('The length of time input has to be equal to the length of value input')
-        sort_order = np.argsort(time)
-        time = np.array(time)[sort_order]
-        data = np.array(data)[sort_order]
-        self._key = np.array(time)
-        self._value = np.array(data)
+        # True while the value buffer is shared with a slice view, see __getitem__ and __setitem__
+        self._shared = False
+        # count of every value, built on the first __contains__ and kept up to date by __setitem__
+        self._value_index = None
+        if presorted:
+            self._key = np.asarray(time)
+            self._value = np.asarray(data)
+            return
+        time = np.array(time)
+        data = np.array(data)
+        if not np.all(time[:-1] <= time[1:]):
+            sort_order = np.argsort(time)
+            time = time[sort_order]
+            data = data[sort_order]
+        self._key = time
+        self._value = data
     
     def __len__(self):
         '''The function to get the length of the ArrayTimeSeries.
@@ -122,17 +174,43 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
 
     def __getitem__(self,index):
         '''The function to get a time series item.
+           A slice with a positive step is a view: it shares the time and value buffers of self 
+           instead of copying them. The values are copy-on-write, so the first __setitem__ on 
+           either the view or self copies the values of that object first, and neither sees the 
+           other's later changes.
+           The values of a memory-mapped time series (see open) are not copy-on-write: the view 
+           and self share the mapping and see each other's changes.
            Param:
-             index: int, the position of the item to get.
+             index: int, the position of the item to get, or a slice.
            Return:  
-             the data at the position specified by index. 
+             the data at the position specified by index, or an ArrayTimeSeries for a slice. 
         '''
         cls = type(self)
         if isinstance(index, slice):
-            return cls(self._key[index],self._value[index])
+            if index.step is not None and index.step < 0:
+                return cls(self._key[index],self._value[index])
+            view = cls(self._key[index],self._value[index],presorted=True)
+            # a memory-mapped time series is never copied: writes go to the mapping in modes 'r+' 
+            # and 'c', and stay forbidden in mode 'r', for self and its views alike
+            if not self._mapped():
+                view._shared = True
+                self._shared = True
+            return view
         elif isinstance(index, numbers.Integral):
             return (self._key[index],self._value[index])
     
+    def _mapped(self):
+        '''The private helper function to check whether the values are backed by a memory-mapped file.
+           Return:
+             True if the value array or any array it is a view of is a numpy memmap.
+        '''
+        array = self._value
+        while array is not None:
+            if isinstance(array, np.memmap):
+                return True
+            array = getattr(array, 'base', None)
+        return False
+
     def __setitem__(self, index, val):
         '''Set the data to the input value at the position specified by index.
            Param:
@@ -142,7 +220,18 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
              None.
         '''
         #pass in only the value. We can't change the time -- precondition
-        self._value[index] = val
+        if self._shared:
+            self._value = self._value.copy()
+            self._shared = False
+        if self._value_index is not None and isinstance(index, numbers.Integral):
+            # the counts change only after the assignment succeeds
+            old = self._value[index].item()
+            self._value[index] = val
+            self._value_index[old] -= 1
+            self._value_index[self._value[index].item()] += 1
+        else:
+            self._value_index = None
+            self._value[index] = val
 
     def __repr__(self):
         '''The function to return formal string representation of the timeseries data.
@@ -229,13 +318,52 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
 
     def __contains__(self,val):
         '''The function to check whether a value is in the time series.
+           The first check builds a count of every value in O(n), so later checks take O(1).
+           A memory-mapped time series shares its values with its views, which can change them 
+           behind the count, so its values are scanned on every check instead.
            Param:
              val: the value to check
            Return:
              boolean, whether the value is in the time series.
         '''
-        return val in self._value
-
+        if self._mapped():
+            return val in self._value
+        if self._value_index is None:
+            self._value_index = collections.Counter(self._value.tolist())
+        try:
+            return self._value_index[val] > 0
+        except TypeError:
+            return val in self._value
+
+
+    def value_at(self, time):
+        '''The function to get the value at a time point.
+           The time points are sorted, so the time point is found by binary search in O(log n).
+           If the time point is repeated, the value of its first occurrence is returned.
+           Param:
+             time: the time point to look up.
+           Return:
+             the value at the time point.
+           Raise:
+             KeyError if the time point is not in the time series.
+        '''
+        index = np.searchsorted(self._key, time, side='left')
+        if index == len(self._key) or self._key[index] != time:
+            raise KeyError(time)
+        return self._value[index]
+
+    def between(self, start=None, stop=None):
+        '''The function to get the part of the time series within the time range [start, stop).
+           The bounds are found by binary search in O(log n), and the result is a slice of self.
+           Param:
+             start: the first time point to include. None means from the beginning.
+             stop: the time point to stop before. None means until the end.
+           Return:
+             a ArrayTimeSeries object with the time points t such that start <= t < stop.
+        '''
+        lo = 0 if start is None else np.searchsorted(self._key, start, side='left')
+        hi = len(self._key) if stop is None else np.searchsorted(self._key, stop, side='left')
+        return self[lo:max(lo, hi)]
 
     def interpolate(self, inter_time):
         '''for every new time point passed in, compute a value for the ArrayTimeSeries class.
@@ -247,22 +375,21 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
            Return:
              an ArrayTimeSeries object with the input as its time, values as computed by interpolate function. 
         '''
-        inter_values = []
-        for ti in inter_time:
-            if ti < self._key[0]:
-                inter_values.append(self._value[0])
-            
-            elif ti > self._key[-1]:
-                inter_values.append(self._value[-1])
-            
-            else:
-                left, right = self._binary_search(self._key, ti)
-                if left == right:
-                    inter_values.append(self._value[left])
-                else:
-                    slope = (self._value[right] - self._value[left]) / (self._key[right]- self._key[left])
-                    pred_value = (ti- self._key[left])*slope + self._value[left]
-                    inter_values.append(pred_value)
+        inter_time = np.asarray(inter_time)
+        # index of the first existing time point that is not smaller than each new time point,
+        # clipped so that points beyond either end fall onto the first or the last time point
+        right = np.searchsorted(self._key, inter_time, side='left')
+        right = np.clip(right, 0, len(self._key)-1)
+        left = np.clip(right-1, 0, len(self._key)-1)
+        hit = (self._key[right] == inter_time) | (inter_time < self._key[0]) | (inter_time > self._key[-1])
+        inter_values = self._value[right]
+        between = ~hit
+        if np.any(between):
+            l, r = left[between], right[between]
+            slope = (self._value[r] - self._value[l]) / (self._key[r] - self._key[l])
+            pred_value = (inter_time[between] - self._key[l])*slope + self._value[l]
+            inter_values = inter_values.astype(np.result_type(inter_values, pred_value))
+            inter_values[between] = pred_value
 
         result = ArrayTimeSeries(inter_time, inter_values) #change
         return result
@@ -316,61 +443,263 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
            Return:
              LaayOperation, which can be used to call an eval() of it in order to calculate.
         '''
-        identity = lambda x: x
         return LazyOperation(identity, self)
 
+    _JOINS = ('inner', 'outer', 'left', 'asof')
+    _METHODS = (None, 'interpolate', 'ffill')
+
+    def align(self, other, how='inner', method=None, fill=np.nan, tolerance=None):
+        '''The function to put two ArrayTimeSeries objects on a common time domain.
+           The common time points come from the two sorted time arrays at once: the outer join 
+           merges them with a stable sort, which merges the two sorted runs in linear time, and 
+           the other joins look up the time points of one array in the other with searchsorted. 
+           The missing values are then filled for all the time points at once.
+           Param:
+             other: another ArrayTimeSeries object.
+             how: 'inner' keeps the time points of both, 'outer' those of either, 'left' those of self, 
+               and 'asof' those of self with the last value of other at or before every time point.
+             method: how to fill a value at a time point the time series does not have. None uses fill; 
+               'interpolate' draws a line between the nearest two time points and uses fill outside 
+               the time series; 'ffill' uses the last value at or before the time point.
+             fill: the value of a time point that is not filled by method.
+             tolerance: for 'ffill' and 'asof', the largest distance to the last time point, None for no limit.
+           Return:
+             a tuple of two ArrayTimeSeries objects with the same time domain, sharing one time array. 
+             Their values are new arrays, so writing to them does not change self or other.
+        '''
+        for ts in (self, other):
+            if len(ts._key) > 1 and np.any(ts._key[1:] == ts._key[:-1]):
+                raise ValueError('Time series with repeated time points cannot be aligned')
+        if how not in self._JOINS:
+            raise ValueError('how must be one of ' + ', '.join(self._JOINS))
+        if method not in self._METHODS:
+            raise ValueError("method must be None, 'interpolate' or 'ffill'")
+        if how == 'inner':
+            index = np.clip(np.searchsorted(other._key, self._key), 0, max(len(other._key)-1, 0))
+            times = self._key[other._key[index] == self._key] if len(other._key) else self._key[:0]
+        elif how == 'outer':
+            times = np.sort(np.concatenate([self._key, other._key]), kind='stable')
+            times = times[np.concatenate([[True], times[1:] != times[:-1]])] if len(times) else times
+        else:
+            times = self._key
+        if how in ('left', 'asof'):
+            left = self._value.copy()
+        else:
+            left = self._values_on(times, method, fill, tolerance)
+        right = other._values_on(times, 'ffill' if how == 'asof' else method, fill, tolerance)
+        return (ArrayTimeSeries(times, left, presorted=True), 
+                ArrayTimeSeries(times, right, presorted=True))
+
+    def apply_aligned(self, other, op, how='inner', method=None, fill=np.nan, tolerance=None):
+        '''The function to apply an arithmetic operation to two ArrayTimeSeries objects with 
+           different time domains. The two are aligned first, see align.
+           Param:
+             other: another ArrayTimeSeries object.
+             op: a function of two numpy arrays, such as operator.add or numpy.maximum.
+             how, method, fill, tolerance: see align.
+           Return:
+             an ArrayTimeSeries object on the common time domain with the result of op.
+        '''
+        left, right = self.align(other, how, method, fill, tolerance)
+        return left._with_value(op(left._value, right._value))
+
+    def _values_on(self, times, method, fill, tolerance):
+        '''The private helper function to get the values of the time series at other time points.
+           Param:
+             times: a sorted numpy array of time points.
+             method, fill, tolerance: see align.
+           Return:
+             a numpy array of values, one per time point.
+        '''
+        if len(self._key) == 0:
+            return np.full(len(times), fill)
+        # index of the last time point at or before every new time point
+        last = np.searchsorted(self._key, times, side='right') - 1
+        index = np.clip(last, 0, len(self._key)-1)
+        values = self._value[index]
+        if method == 'ffill':
+            missing = last < 0
+            if tolerance is not None:
+                missing |= times - self._key[index] > tolerance
+        else:
+            missing = (last < 0) | (self._key[index] != times)
+            if method == 'interpolate':
+                inside = missing & (times > self._key[0]) & (times < self._key[-1])
+                if np.any(inside):
+                    l = index[inside]
+                    slope = (self._value[l+1] - self._value[l]) / (self._key[l+1] - self._key[l])
+                    pred_value = (times[inside] - self._key[l])*slope + self._value[l]
+                    values = values.astype(np.result_type(values, pred_value))
+                    values[inside] = pred_value
+                    missing &= ~inside
+        if np.any(missing):
+            values = values.astype(np.result_type(values, fill))
+            values[missing] = fill
+        return values
+
     def _check_time(function):
         '''The function is a decorator function for checking two ArrayTimeSeries objects have the same
            time domain before doing all the arithmetic operations.
+           A number on the right hand side is broadcast over the whole time domain, so it is not checked.
            Param:
              function: the function use _check_time on
            Return:
              ValueError if two objects have different time domain.
         '''
         def _check_time_helper(self,rhs):
-            if not np.all(self._key ==  rhs._key):
+            if isinstance(rhs, numbers.Number):
+                return function(self, rhs)
+            if not hasattr(rhs, '_key'):
+                return NotImplemented
+            # a collection of many time series handles the operation with its reflected method
+            if isinstance(rhs._value, np.ndarray) and rhs._value.ndim != 1:
+                return NotImplemented
+            if self._key is not rhs._key and not np.array_equal(self._key, rhs._key):
                 raise ValueError(str(self)+' and '+str(rhs)+' must have the same time points')
             return function(self,rhs)
         return _check_time_helper
+
+    def _rhs_value(self, rhs):
+        '''The private helper function to get the operand of an arithmetic operation.
+           Param:
+             rhs: a number or a time series with the same time domain as self.
+           Return:
+             the number itself, or the values of the time series as a numpy array.
+        '''
+        if isinstance(rhs, numbers.Number):
+            return rhs
+        return np.asarray(rhs._value)
+
+    def _with_value(self, value):
+        '''The private helper function to build a new ArrayTimeSeries on the time domain of self.
+           The time domain of self is already sorted, so it is shared by the new object instead of 
+           being sorted and copied again. Nothing modifies the time of an ArrayTimeSeries in place.
+           Param:
+             value: a numpy array of values with the same length as self.
+           Return:
+             The new ArrayTimeSeries object.
+        '''
+        return ArrayTimeSeries(self._key, value, presorted=True)
     
     @_check_time
     def __add__(self, rhs):
         '''The arithmetic operation function to add two ArrayTimeSeries objects elementwise if two 
            objects have the same time domain, otherwise return a value error
            Param:
-             rhs: another ArrayTimeSeries object
+             rhs: another ArrayTimeSeries object, or a number to add to every value
            Return:
              The new ArrayTimeSeries object that has the same time domain as self and the value is 
              the addition of rhs's and self's value.
         '''
-        added_value = [self._value[i] + rhs._value[i] for i in range(len(rhs))]
-        return ArrayTimeSeries(self._key, added_value) #change
+        return self._with_value(self._value + self._rhs_value(rhs))
 
     @_check_time
     def __sub__(self,rhs):
         '''The arithmetic operation function to subtract two ArrayTimeSeries objects elementwise 
            if two objects have the same time domain, otherwise return a value error
            Param:
-             rhs: another ArrayTimeSeries object
+             rhs: another ArrayTimeSeries object, or a number to subtract from every value
            Return:
              The new ArrayTimeSeries object that has the same time domain as self and the value is 
              self.value-rhs.value.
         '''
-        added_value = [self._value[i] - rhs._value[i] for i in range(len(rhs))]
-        return ArrayTimeSeries(self._key, added_value) #change
+        return self._with_value(self._value - self._rhs_value(rhs))
     
     @_check_time
     def __mul__(self,rhs):
         '''The arithmetic operation function to multiply two ArrayTimeSeries objects elementwise 
            if two objects have the same time domain, otherwise return a value error
            Param:
-             rhs: another ArrayTimeSeries object
+             rhs: another ArrayTimeSeries object, or a number to multiply every value with
            Return:
              The new ArrayTimeSeries object that has the same time domain as self and the value 
              is elementwise self.value*rhs.value.
         '''
-        mul_value = [self._value[i] * rhs._value[i] for i in range(len(rhs))]
-        return ArrayTimeSeries(self._key, mul_value) #change
+        return self._with_value(self._value * self._rhs_value(rhs))
+
+    @_check_time
+    def __truediv__(self,rhs):
+        '''The arithmetic operation function to divide two ArrayTimeSeries objects elementwise 
+           if two objects have the same time domain, otherwise return a value error
+           Param:
+             rhs: another ArrayTimeSeries object, or a number to divide every value by
+           Return:
+             The new ArrayTimeSeries object that has the same time domain as self and the value 
+             is elementwise self.value/rhs.value.
+        '''
+        return self._with_value(self._value / self._rhs_value(rhs))
+
+    @_check_time
+    def __pow__(self,rhs):
+        '''The arithmetic operation function to raise an ArrayTimeSeries object to a power elementwise 
+           if two objects have the same time domain, otherwise return a value error
+           Param:
+             rhs: another ArrayTimeSeries object, or a number as the exponent of every value
+           Return:
+             The new ArrayTimeSeries object that has the same time domain as self and the value 
+             is elementwise self.value**rhs.value.
+        '''
+        return self._with_value(self._value ** self._rhs_value(rhs))
+
+    def __radd__(self, lhs):
+        '''The arithmetic operation function to add an ArrayTimeSeries object to a number.
+           Param:
+             lhs: a number
+           Return:
+             The new ArrayTimeSeries object that has the same time domain as self and the value 
+             is lhs+self.value.
+        '''
+        if not isinstance(lhs, numbers.Number):
+            return NotImplemented
+        return self._with_value(lhs + self._value)
+
+    def __rsub__(self, lhs):
+        '''The arithmetic operation function to subtract an ArrayTimeSeries object from a number.
+           Param:
+             lhs: a number
+           Return:
+             The new ArrayTimeSeries object that has the same time domain as self and the value 
+             is lhs-self.value.
+        '''
+        if not isinstance(lhs, numbers.Number):
+            return NotImplemented
+        return self._with_value(lhs - self._value)
+
+    def __rmul__(self, lhs):
+        '''The arithmetic operation function to multiply a number with an ArrayTimeSeries object.
+           Param:
+             lhs: a number
+           Return:
+             The new ArrayTimeSeries object that has the same time domain as self and the value 
+             is lhs*self.value.
+        '''
+        if not isinstance(lhs, numbers.Number):
+            return NotImplemented
+        return self._with_value(lhs * self._value)
+
+    def __rtruediv__(self, lhs):
+        '''The arithmetic operation function to divide a number by an ArrayTimeSeries object.
+           Param:
+             lhs: a number
+           Return:
+             The new ArrayTimeSeries object that has the same time domain as self and the value 
+             is lhs/self.value.
+        '''
+        if not isinstance(lhs, numbers.Number):
+            return NotImplemented
+        return self._with_value(lhs / self._value)
+
+    def __rpow__(self, lhs):
+        '''The arithmetic operation function to raise a number to the power of an ArrayTimeSeries object.
+           Param:
+             lhs: a number
+           Return:
+             The new ArrayTimeSeries object that has the same time domain as self and the value 
+             is lhs**self.value.
+        '''
+        if not isinstance(lhs, numbers.Number):
+            return NotImplemented
+        return self._with_value(lhs ** self._value)
     
     def __pos__(self):
         '''The uniary operation function to have a new ArrayTimeSeries that have the same time
@@ -378,7 +707,7 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
            Return:
              The new ArrayTimeSeries object that has the same time and value domain as self
         '''
-        return ArrayTimeSeries(self._key, self._value) #change
+        return self._with_value(self._value.copy())
 
     def __neg__(self):
         '''The uniary operation function negative to have a new ArrayTimeSeries that have 
@@ -387,15 +716,14 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
              The new ArrayTimeSeries object that has the same time and the negative of
              self.value
         '''
-        neg_value = [-i for i in self._value]
-        return ArrayTimeSeries(self._key, neg_value)#change
+        return self._with_value(-self._value)
 
     def __abs__(self):
         '''The function that returns the 2-norm of self.value
            Return:
              float, the 2-norm of self.value
         '''
-        return math.sqrt(sum([i**2 for i in self._value]))
+        return math.sqrt(np.dot(self._value, self._value))
  
     def __bool__(self):
         '''The function that returns false when the length of self is 0, otherwise true.
@@ -424,3 +752,227 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
              the standard deviation of the time series data.
         '''
         return np.std(self._value)
+
+    def rolling_mean(self, size=None, duration=None):
+        '''The function that returns the mean of a sliding window ending at every time point.
+           All windows are computed at once from cumulative sums.
+           Param:
+             size: the window is the last size time points.
+             duration: the window is the time points t with t_end - duration < t <= t_end. 
+               Exactly one of size and duration must be given.
+           Return:
+             an ArrayTimeSeries object with the same time as self and the mean of every window.
+        '''
+        means, std = stats.window_moments(self._value, stats.window_starts(self._key, size, duration))
+        return self._with_value(means)
+
+    def rolling_std(self, size=None, duration=None, ddof=0):
+        '''The function that returns the standard deviation of a sliding window ending at every time point.
+           All windows are computed at once from cumulative sums.
+           Param:
+             size: the window is the last size time points.
+             duration: the window is the time points t with t_end - duration < t <= t_end. 
+               Exactly one of size and duration must be given.
+             ddof: divide by the window count minus ddof, as numpy.std does.
+           Return:
+             an ArrayTimeSeries object with the same time as self and the standard deviation of every window.
+        '''
+        means, std = stats.window_moments(self._value, stats.window_starts(self._key, size, duration), ddof)
+        return self._with_value(std)
+
+    def rolling_min(self, size=None, duration=None):
+        '''The function that returns the minimum of a sliding window ending at every time point.
+           All windows are computed at once, see stats.window_extreme.
+           Param:
+             size: the window is the last size time points.
+             duration: the window is the time points t with t_end - duration < t <= t_end. 
+               Exactly one of size and duration must be given.
+           Return:
+             an ArrayTimeSeries object with the same time as self and the minimum of every window.
+        '''
+        starts = stats.window_starts(self._key, size, duration)
+        return self._with_value(stats.window_extreme(self._value, starts, np.minimum))
+
+    def rolling_max(self, size=None, duration=None):
+        '''The function that returns the maximum of a sliding window ending at every time point.
+           All windows are computed at once, see stats.window_extreme.
+           Param:
+             size: the window is the last size time points.
+             duration: the window is the time points t with t_end - duration < t <= t_end. 
+               Exactly one of size and duration must be given.
+           Return:
+             an ArrayTimeSeries object with the same time as self and the maximum of every window.
+        '''
+        starts = stats.window_starts(self._key, size, duration)
+        return self._with_value(stats.window_extreme(self._value, starts, np.maximum))
+
+    def xcorr(self, other, normalize=True, max_lag=None):
+        '''The function to get the cross-correlation with another time series at every lag.
+           The lags count time points, so the time series should be sampled at the same regular 
+           interval. Computed by FFT in O(n log n), see stats.cross_correlation.
+           Param:
+             other: another ArrayTimeSeries object.
+             normalize: if True, the means are removed and the result is divided by the product
+               of the norms, so it lies in [-1, 1].
+             max_lag: if given, only the lags from -max_lag to max_lag are kept.
+           Return:
+             an ArrayTimeSeries object whose time is the lag, and whose value at lag L is the 
+             correlation of self[t + L] with other[t]; a positive lag means self follows other.
+        '''
+        lags, values = stats.cross_correlation(self._value, other._value, normalize)
+        if max_lag is not None:
+            if max_lag < 0:
+                raise ValueError('max_lag must not be negative')
+            keep = np.abs(lags) <= max_lag
+            lags, values = lags[keep], values[keep]
+        return ArrayTimeSeries(lags, values, presorted=True)
+
+    def autocorr(self, normalize=True, max_lag=None):
+        '''The function to get the autocorrelation of the time series at every lag.
+           Param:
+             normalize: if True, the mean is removed and the result is divided by the sum of 
+               squares, so it is 1 at lag 0.
+             max_lag: if given, only the lags from 0 to max_lag are kept.
+           Return:
+             an ArrayTimeSeries object whose time is the lag, from 0, and whose value is the 
+             correlation of self[t + L] with self[t].
+        '''
+        correlation = self.xcorr(self, normalize, max_lag)
+        return correlation[len(correlation)//2:]
+
+    def best_lag(self, other, max_lag=None):
+        '''The function to find the lag at which another time series matches the time series best.
+           Param:
+             other: another ArrayTimeSeries object.
+             max_lag: if given, only the lags from -max_lag to max_lag are searched.
+           Return:
+             a tuple of the lag with the largest normalized cross-correlation, see xcorr, and that correlation.
+        '''
+        correlation = self.xcorr(other, True, max_lag)
+        best = int(np.argmax(correlation._value))
+        return int(correlation._key[best]), float(correlation._value[best])
+
+    def dtw(self, other, window=None):
+        '''The function to get the dynamic time warping distance to another time series.
+           Only the values are matched; see timeseries.dtw.distance.
+           Param:
+             other: another ArrayTimeSeries object.
+             window: the Sakoe-Chiba band, the largest difference of the positions of two matched 
+               points; None for no band.
+           Return:
+             the square root of the smallest sum of squared differences over a warping path.
+        '''
+        return float(dtw.distance(self._value, other._value, window))
+
+    def paa(self, segments):
+        '''The function to get the piecewise aggregate approximation of the time series.
+           Param:
+             segments: the number of segments of nearly equal length, at most the length of the time series.
+           Return:
+             a numpy array with the mean of the values of every segment.
+        '''
+        return stats.paa(self._value, segments)
+
+    def sax(self, segments=8, alphabet=4):
+        '''The function to get the SAX word of the time series.
+           The values are z-normalized, averaged over every segment, and every mean is replaced by 
+           a symbol so that every symbol is equally likely for normally distributed values.
+           Param:
+             segments: the number of segments, at most the length of the time series.
+             alphabet: the number of symbols, at least 2.
+           Return:
+             an integer numpy array with the symbol from 0 to alphabet - 1 of every segment.
+        '''
+        return stats.sax(self._value, segments, alphabet)
+
+    def resample(self, interval, how='mean', origin=None, fill=None):
+        '''The function to aggregate the time series over the buckets of a regular time grid.
+           The bucket of a time point t is [origin + j * interval, origin + (j+1) * interval) with 
+           j = floor((t - origin) / interval), where the bounds are computed in floating point like 
+           the start times of the result, so a time point equal to a start time is in its bucket. 
+           The bucket numbers of the sorted times are computed at once, the buckets start where the 
+           number changes, and every bucket is aggregated with one numpy reduction, see 
+           stats.bucket_reduce.
+           Param:
+             interval: the length of a bucket, a positive number.
+             how: the aggregate, one of 'mean', 'sum', 'min', 'max', 'count', 'first' and 'last'.
+             origin: a time point on the grid. By default the grid is aligned to multiples of interval.
+             fill: None to leave out the buckets without a time point; otherwise the result has every 
+               bucket from the first to the last one, and the empty ones get fill (count gets 0).
+           Return:
+             an ArrayTimeSeries object with the start time of every bucket and its aggregate.
+        '''
+        if interval <= 0:
+            raise ValueError('interval must be positive')
+        if origin is None:
+            origin = 0
+        buckets = ((self._key - origin) // interval).astype(np.int64)
+        # floor division of floats can be off by one at a boundary, e.g. 0.5 // 0.1 == 4.0, so 
+        # every time point is moved to the bucket whose start time, as reported, is the last one not after it
+        buckets -= origin + buckets * interval > self._key
+        buckets += origin + (buckets + 1) * interval <= self._key
+        starts = np.flatnonzero(np.diff(buckets)) + 1
+        starts = np.concatenate([[0], starts]) if len(buckets) else starts
+        aggregate = stats.bucket_reduce(self._value, starts, how)
+        buckets = buckets[starts]
+        if fill is not None and len(buckets):
+            full = np.full(buckets[-1] - buckets[0] + 1, 0 if how == 'count' else fill,
+                           dtype=np.result_type(aggregate, 0 if how == 'count' else fill))
+            full[buckets - buckets[0]] = aggregate
+            buckets = np.arange(buckets[0], buckets[-1] + 1)
+            aggregate = full
+        return ArrayTimeSeries(origin + buckets * interval, aggregate, presorted=True)
+
+    def save(self, path):
+        '''The function to write the time series to a binary file.
+           The file holds two npy records one after the other: the times, then the values. 
+           Each record is a numpy header followed by the raw array, so the file can be 
+           memory-mapped by open.
+           Param:
+             path: the path of the file to write.
+           Return:
+             None.
+        '''
+        key = np.ascontiguousarray(self._key)
+        value = np.ascontiguousarray(self._value)
+        if key.dtype.hasobject or value.dtype.hasobject:
+            raise ValueError('Only time series of numeric times and values can be saved')
+        with open(path, 'wb') as f:
+            np.lib.format.write_array(f, key, allow_pickle=False)
+            np.lib.format.write_array(f, value, allow_pickle=False)
+
+    @classmethod
+    def open(cls, path, mode='c'):
+        '''The function to open a time series file written by save as a memory-mapped ArrayTimeSeries.
+           Only the headers are read; the times and values stay on disk and are paged in when 
+           they are touched, so slicing, interpolate, mean and std work on the mapped buffers.
+           Param:
+             path: the path of the file written by save.
+             mode: the numpy memmap mode. 'c' keeps changes made by __setitem__ in memory only, 
+               'r+' writes them back to the file, and 'r' makes the time series read-only.
+               Slices and between return views of the same mapping, so this holds for them too.
+           Return:
+             an ArrayTimeSeries object backed by the file.
+        '''
+        with open(path, 'rb') as f:
+            key_header = cls._read_npy_header(f)
+            f.seek(key_header[3] + key_header[0][0] * key_header[2].itemsize)
+            value_header = cls._read_npy_header(f)
+        key = np.memmap(path, dtype=key_header[2], mode=mode, offset=key_header[3], shape=key_header[0])
+        value = np.memmap(path, dtype=value_header[2], mode=mode, offset=value_header[3], shape=value_header[0])
+        return cls(key, value, presorted=True)
+
+    @staticmethod
+    def _read_npy_header(f):
+        '''The private helper function to read one npy header of a file written by save.
+           Param:
+             f: the file object, positioned at the start of the npy record.
+           Return:
+             the shape, fortran order, and dtype of the array, and the offset where its data starts.
+        '''
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        return shape, fortran_order, dtype, f.tell()
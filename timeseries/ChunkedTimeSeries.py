@@ -0,0 +1,199 @@
+import json
+import math
+import struct
+import zlib
+import numpy as np
+from timeseries.ArrayTimeSeries import ArrayTimeSeries
+from timeseries import stats
+
+class ChunkedTimeSeries:
+    '''This is the ChunkedTimeSeries class implemented using Python.
+       The ChunkedTimeSeries class reads an ArrayTimeSeries stored on disk in fixed-size chunks.
+
+       File layout:
+
+         magic, then for every chunk the zlib-compressed times and values, then the index
+         as json, then the length of the index as a little-endian uint64, then the magic again.
+         The index holds the dtypes and, for every chunk, its position in the file, its
+         first and last time point, and the count, mean, sum of squared deviations (m2),
+         min and max of its values.
+
+
+       Attributes:
+
+         path: the path of the file.
+         index: the index read from the end of the file.
+         t_min: a numpy array of the first time point of every chunk.
+         t_max: a numpy array of the last time point of every chunk.
+
+
+       Methods:
+
+         save: The function to write an ArrayTimeSeries to a chunked file.
+         __len__: The function to get the length of the stored time series.
+         __repr__: The function to return formal string representation of the ChunkedTimeSeries.
+         between: The function to read the part of the time series within a time range.
+         mean: The function that returns the mean of the time series from the chunk summaries.
+         std: The function that returns the standard deviation of the time series from the chunk summaries.
+         _read_chunk: The private helper function to decompress the times and values of one chunk.
+         _summary: The private helper function to merge the summaries of all chunks.
+
+       Examples:
+       --------
+       >>> import os, tempfile
+       >>> path = os.path.join(tempfile.mkdtemp(), 'ts.chunks')
+       >>> ChunkedTimeSeries.save(ArrayTimeSeries([1,2,3,4,5], [5,6,7,8,9]), path, chunk_size=2)
+       >>> cts = ChunkedTimeSeries(path)
+       >>> len(cts)
+       5
+       >>> cts.between(2, 4)
+       ArrayTimeSeries([(2, 6), (3, 7)])
+       >>> cts.mean()
+       7.0
+    '''
+    _MAGIC = b'TSCHUNK1'
+
+    def __init__(self, path):
+        '''The constructor to open a chunked file. Only the index at the end of the file is read.
+           Param:
+             path: the path of a file written by save.
+        '''
+        self._path = path
+        with open(path, 'rb') as f:
+            if f.read(len(self._MAGIC)) != self._MAGIC:
+                raise ValueError(path + ' is not a chunked time series file')
+            f.seek(-(8 + len(self._MAGIC)), 2)
+            index_len, = struct.unpack('<Q', f.read(8))
+            if f.read(len(self._MAGIC)) != self._MAGIC:
+                raise ValueError(path + ' is not a chunked time series file')
+            f.seek(-(8 + len(self._MAGIC) + index_len), 2)
+            self._index = json.loads(f.read(index_len).decode('utf-8'))
+        self._key_dtype = np.dtype(self._index['key_dtype'])
+        self._value_dtype = np.dtype(self._index['value_dtype'])
+        chunks = self._index['chunks']
+        self._t_min = np.array([c['t_min'] for c in chunks], dtype=self._key_dtype)
+        self._t_max = np.array([c['t_max'] for c in chunks], dtype=self._key_dtype)
+
+    @classmethod
+    def save(cls, ts, path, chunk_size=65536, level=6):
+        '''The function to write an ArrayTimeSeries to a chunked file.
+           Param:
+             ts: the ArrayTimeSeries to write.
+             path: the path of the file to write.
+             chunk_size: the number of time points in every chunk but the last.
+             level: the zlib compression level.
+           Return:
+             None.
+        '''
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be positive')
+        key = np.ascontiguousarray(ts._key)
+        value = np.ascontiguousarray(ts._value)
+        if key.dtype.hasobject or value.dtype.hasobject:
+            raise ValueError('Only time series of numeric times and values can be saved')
+        chunks = []
+        with open(path, 'wb') as f:
+            f.write(cls._MAGIC)
+            for start in range(0, len(key), chunk_size):
+                key_chunk = key[start:start+chunk_size]
+                value_chunk = value[start:start+chunk_size]
+                key_bytes = zlib.compress(key_chunk.tobytes(), level)
+                value_bytes = zlib.compress(value_chunk.tobytes(), level)
+                count, mean, m2 = stats.summary(value_chunk)
+                chunks.append({'offset': f.tell(),
+                               'key_nbytes': len(key_bytes),
+                               'value_nbytes': len(value_bytes),
+                               't_min': key_chunk[0].item(),
+                               't_max': key_chunk[-1].item(),
+                               'count': count,
+                               'mean': mean,
+                               'm2': m2,
+                               'min': value_chunk.min().item(),
+                               'max': value_chunk.max().item()})
+                f.write(key_bytes)
+                f.write(value_bytes)
+            index = json.dumps({'key_dtype': key.dtype.str,
+                                'value_dtype': value.dtype.str,
+                                'chunk_size': chunk_size,
+                                'length': len(key),
+                                'chunks': chunks}).encode('utf-8')
+            f.write(index)
+            f.write(struct.pack('<Q', len(index)))
+            f.write(cls._MAGIC)
+
+    def __len__(self):
+        '''The function to get the length of the stored time series.
+           Return:
+             length of the time series data.
+        '''
+        return self._index['length']
+
+    def __repr__(self):
+        '''The function to return formal string representation of the ChunkedTimeSeries.
+           Return:
+             a string with the path and the number of chunks.
+        '''
+        return 'ChunkedTimeSeries({!r}, chunks={})'.format(self._path, len(self._index['chunks']))
+
+    def _read_chunk(self, f, chunk):
+        '''The private helper function to decompress the times and values of one chunk.
+           Param:
+             f: the open file.
+             chunk: the index entry of the chunk.
+           Return:
+             the numpy arrays of times and values of the chunk.
+        '''
+        f.seek(chunk['offset'])
+        key = np.frombuffer(zlib.decompress(f.read(chunk['key_nbytes'])), dtype=self._key_dtype)
+        value = np.frombuffer(zlib.decompress(f.read(chunk['value_nbytes'])), dtype=self._value_dtype)
+        return key, value
+
+    def between(self, start=None, stop=None):
+        '''The function to read the part of the time series within the time range [start, stop).
+           The chunks overlapping the range are found from the index by binary search, and
+           only those chunks are read and decompressed.
+           Param:
+             start: the first time point to include. None means from the beginning.
+             stop: the time point to stop before. None means until the end.
+           Return:
+             an ArrayTimeSeries object with the time points t such that start <= t < stop.
+        '''
+        lo = 0 if start is None else np.searchsorted(self._t_max, start, side='left')
+        hi = len(self._t_min) if stop is None else np.searchsorted(self._t_min, stop, side='left')
+        keys = [np.array([], dtype=self._key_dtype)]
+        values = [np.array([], dtype=self._value_dtype)]
+        with open(self._path, 'rb') as f:
+            for chunk in self._index['chunks'][lo:hi]:
+                key, value = self._read_chunk(f, chunk)
+                keys.append(key)
+                values.append(value)
+        ts = ArrayTimeSeries(np.concatenate(keys), np.concatenate(values), presorted=True)
+        return ts.between(start, stop)
+
+    def _summary(self):
+        '''The private helper function to merge the summaries of all chunks.
+           Return:
+             the count, mean and sum of squared deviations of the whole time series.
+        '''
+        n, mean, m2 = 0, 0.0, 0.0
+        for chunk in self._index['chunks']:
+            n, mean, m2 = stats.combine(n, mean, m2, chunk['count'], chunk['mean'], chunk['m2'])
+        return n, mean, m2
+
+    def mean(self):
+        '''The function that returns the mean of the time series from the chunk summaries.
+           No chunk is read.
+           Return:
+             the mean of the time series data.
+        '''
+        n, mean, m2 = self._summary()
+        return mean if n else float('nan')
+
+    def std(self):
+        '''The function that returns the standard deviation of the time series from the chunk summaries.
+           No chunk is read. Like numpy.std, this is the population standard deviation.
+           Return:
+             the standard deviation of the time series data.
+        '''
+        n, mean, m2 = self._summary()
+        return math.sqrt(m2 / n) if n else float('nan')
@@ -0,0 +1,304 @@
+import heapq
+import json
+import numpy as np
+from timeseries import stats
+
+class ISAXIndex:
+    '''This is the ISAXIndex class implemented using Python.
+       The ISAXIndex class indexes time series of one length by their iSAX words, to find the
+       time series nearest to a query by z-normalized Euclidean distance while reading only a
+       few leaves.
+
+       Every time series gets a SAX word with 2**bits symbols per segment (see stats.sax). A node
+       of the tree stands for the time series whose symbols start with the node's symbols at the
+       node's number of bits per segment. The roots have 1 bit per segment. A leaf that holds more
+       than leaf_size time series becomes an inner node that splits on the segment that divides
+       its time series most evenly, with one more bit for that segment in its two children.
+
+       The distance between the PAA of the query and the region of a node's word is a lower bound
+       of the distance to every time series below it, so the nodes are searched in order of that
+       bound. The search stops after the given number of leaves, or, with leaves=None, when the
+       bound is not smaller than the k-th distance found, which gives the exact nearest ones.
+
+       File layout:
+
+         a numpy npz archive with the z-normalized time series, their words and PAA, and the tree
+         as json.
+
+
+       Attributes:
+
+         length: the length of the time series.
+         segments: the number of segments of a word.
+         leaf_size: the largest number of time series in a leaf that can be split.
+         bits: the largest number of bits of a symbol.
+         data: the 2-D array of z-normalized time series, one per row, with room to grow.
+         words: the SAX word of every time series, with bits bits per symbol.
+         paa: the PAA of every time series.
+         count: the number of indexed time series.
+         nodes: the bits, symbols, split segment, children and time series of every node.
+         roots: the node of every word with 1 bit per segment.
+         leaves_visited: the number of leaves read by the last query.
+
+
+       Methods:
+
+         __len__: The function to get the number of indexed time series.
+         insert: The function to add a time series to the index.
+         insert_many: The function to add several time series to the index.
+         query: The function to find the k time series nearest to a query.
+         save: The function to write the index to a file.
+         open: The function to read an index written by save.
+         _append: The private helper function to store z-normalized time series and their words.
+         _place: The private helper function to put a stored time series in its leaf.
+         _split: The private helper function to turn an overfull leaf into an inner node.
+         _mindist: The private helper function to get the lower bound of the distance to a node.
+
+       Examples:
+       --------
+       >>> from timeseries.ArrayTimeSeries import ArrayTimeSeries
+       >>> index = ISAXIndex(4, segments=2)
+       >>> index.insert_many([[1, 2, 3, 4], [4, 3, 2, 1], [1, 3, 2, 4]])
+       >>> [i for d, i in index.query(ArrayTimeSeries(range(4), [10, 20, 30, 41]), k=2, leaves=None)]
+       [0, 2]
+    '''
+    def __init__(self, length, segments=8, leaf_size=100, bits=8):
+        '''The constructor of an empty ISAXIndex.
+           Param:
+             length: the length of the time series.
+             segments: the number of segments of a word, at most length.
+             leaf_size: the largest number of time series in a leaf that can be split.
+             bits: the largest number of bits of a symbol, from 1 to 8.
+        '''
+        stats.paa_bounds(length, segments)
+        if leaf_size < 1:
+            raise ValueError('leaf_size must be positive')
+        if not 1 <= bits <= 8:
+            raise ValueError('bits must be between 1 and 8')
+        self._length = length
+        self._segments = segments
+        self._leaf_size = leaf_size
+        self._bits = bits
+        self._lengths = np.diff(np.append(stats.paa_bounds(length, segments), length))
+        # the edges of the region of every symbol, for every number of bits
+        self._edges = [np.concatenate([[-np.inf], stats.sax_breakpoints(2**b), [np.inf]]) if b else None
+                       for b in range(bits + 1)]
+        self._data = np.zeros((0, length))
+        self._words = np.zeros((0, segments), dtype=np.uint8)
+        self._paa = np.zeros((0, segments))
+        self._count = 0
+        self._nodes = []
+        self._roots = {}
+        self._leaves_visited = 0
+
+    def __len__(self):
+        '''The function to get the number of indexed time series.
+           Return:
+             the number of time series.
+        '''
+        return self._count
+
+    def _append(self, values):
+        '''The private helper function to store z-normalized time series and their words.
+           The arrays double in size when they are full, so adding a time series takes amortized O(length).
+           Param:
+             values: a 2-D numpy array with one time series per row.
+           Return:
+             a range of the positions of the time series.
+        '''
+        if values.ndim != 2 or values.shape[1] != self._length:
+            raise ValueError('Every time series must have length {}'.format(self._length))
+        needed = self._count + len(values)
+        if needed > len(self._data):
+            capacity = max(needed, 2 * len(self._data))
+            for name in ('_data', '_words', '_paa'):
+                old = getattr(self, name)
+                new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+                new[:self._count] = old[:self._count]
+                setattr(self, name, new)
+        data = stats.znormalize(values)
+        paa = stats.paa(data, self._segments)
+        positions = range(self._count, needed)
+        self._data[self._count:needed] = data
+        self._paa[self._count:needed] = paa
+        self._words[self._count:needed] = np.searchsorted(stats.sax_breakpoints(2**self._bits), paa, side='right')
+        self._count = needed
+        return positions
+
+    def insert(self, series):
+        '''The function to add a time series to the index.
+           Param:
+             series: an ArrayTimeSeries or a sequence of values of the indexed length.
+           Return:
+             the position of the time series, which query returns.
+        '''
+        values = np.asarray(getattr(series, '_value', series), dtype=float)
+        position, = self._append(values.reshape(1, -1))
+        self._place(position)
+        return position
+
+    def insert_many(self, series):
+        '''The function to add several time series to the index.
+           The words of all of them are computed at once.
+           Param:
+             series: a sequence of ArrayTimeSeries or sequences of values, a TimeSeriesCollection,
+               or a 2-D numpy array with one time series per row.
+           Return:
+             None.
+        '''
+        values = stats.rows(series)
+        if values.size == 0:
+            return
+        for position in self._append(values):
+            self._place(position)
+
+    def _place(self, position):
+        '''The private helper function to put a stored time series in its leaf.
+           Param:
+             position: the position of the time series.
+           Return:
+             None.
+        '''
+        word = self._words[position].tolist()
+        key = tuple(symbol >> (self._bits - 1) for symbol in word)
+        node = self._roots.get(key)
+        if node is None:
+            node = len(self._nodes)
+            self._nodes.append({'bits': [1] * self._segments, 'symbols': list(key),
+                                'split': None, 'children': None, 'members': []})
+            self._roots[key] = node
+        while self._nodes[node]['children'] is not None:
+            entry = self._nodes[node]
+            s = entry['split']
+            node = entry['children'][(word[s] >> (self._bits - entry['bits'][s] - 1)) & 1]
+        self._nodes[node]['members'].append(position)
+        if len(self._nodes[node]['members']) > self._leaf_size:
+            self._split(node)
+
+    def _split(self, node):
+        '''The private helper function to turn an overfull leaf into an inner node.
+           The children that are still overfull are split again, until every symbol has all its bits.
+           Param:
+             node: the overfull leaf.
+           Return:
+             None.
+        '''
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            entry = self._nodes[node]
+            splittable = [s for s in range(self._segments) if entry['bits'][s] < self._bits]
+            if len(entry['members']) <= self._leaf_size or not splittable:
+                continue
+            members = np.array(entry['members'])
+            best, best_balance = None, -1
+            for s in splittable:
+                ones = int(np.sum((self._words[members, s] >> (self._bits - entry['bits'][s] - 1)) & 1))
+                balance = min(ones, len(members) - ones)
+                if balance > best_balance:
+                    best, best_balance = s, balance
+            chosen = (self._words[members, best] >> (self._bits - entry['bits'][best] - 1)) & 1
+            children = []
+            for bit in (0, 1):
+                bits = list(entry['bits'])
+                bits[best] += 1
+                symbols = list(entry['symbols'])
+                symbols[best] = 2 * symbols[best] + bit
+                children.append(len(self._nodes))
+                self._nodes.append({'bits': bits, 'symbols': symbols, 'split': None, 'children': None,
+                                    'members': members[chosen == bit].tolist()})
+            entry['split'] = best
+            entry['children'] = children
+            entry['members'] = []
+            stack.extend(children)
+
+    def _mindist(self, query_paa, node):
+        '''The private helper function to get the lower bound of the distance to a node.
+           Param:
+             query_paa: the PAA of the z-normalized query.
+             node: the node.
+           Return:
+             the distance from the PAA of the query to the region of the word of the node, weighted
+             by the segment lengths.
+        '''
+        entry = self._nodes[node]
+        total = 0.0
+        for s in range(self._segments):
+            edges = self._edges[entry['bits'][s]]
+            symbol = entry['symbols'][s]
+            gap = max(edges[symbol] - query_paa[s], query_paa[s] - edges[symbol + 1], 0.0)
+            total += self._lengths[s] * gap * gap
+        return np.sqrt(total)
+
+    def query(self, query, k=1, leaves=1):
+        '''The function to find the k time series nearest to a query.
+           Param:
+             query: an ArrayTimeSeries or a sequence of values of the indexed length.
+             k: the number of time series to find.
+             leaves: the largest number of leaves to read, for an approximate answer; None to read
+               as many as needed for the exact answer.
+           Return:
+             a list of (distance, position) pairs, nearest first.
+        '''
+        values = np.asarray(getattr(query, '_value', query), dtype=float)
+        if values.shape != (self._length,):
+            raise ValueError('The query must have length {}'.format(self._length))
+        nearest = stats.Nearest(k)
+        query = stats.znormalize(values)
+        query_paa = stats.paa(query, self._segments)
+        self._leaves_visited = 0
+        frontier = [(self._mindist(query_paa, node), node) for node in self._roots.values()]
+        heapq.heapify(frontier)
+        while frontier:
+            bound, node = heapq.heappop(frontier)
+            if bound >= nearest.radius():
+                break
+            entry = self._nodes[node]
+            if entry['children'] is not None:
+                for child in entry['children']:
+                    heapq.heappush(frontier, (max(bound, self._mindist(query_paa, child)), child))
+                continue
+            members = np.array(entry['members'], dtype=int)
+            distances = np.sqrt(np.sum((self._data[members] - query)**2, axis=1))
+            nearest.add(distances, members)
+            if members.size:
+                self._leaves_visited += 1
+            if leaves is not None and self._leaves_visited >= leaves and nearest.radius() < np.inf:
+                break
+        return nearest.result()
+
+    def save(self, path):
+        '''The function to write the index to a file.
+           Param:
+             path: the path of the file to write.
+           Return:
+             None.
+        '''
+        tree = json.dumps({'length': self._length,
+                           'segments': self._segments,
+                           'leaf_size': self._leaf_size,
+                           'bits': self._bits,
+                           'nodes': self._nodes,
+                           'roots': [[list(key), node] for key, node in self._roots.items()]})
+        with open(path, 'wb') as f:
+            np.savez(f, data=self._data[:self._count], words=self._words[:self._count],
+                     paa=self._paa[:self._count], tree=np.array(tree))
+
+    @classmethod
+    def open(cls, path):
+        '''The function to read an index written by save. The tree is not rebuilt.
+           Param:
+             path: the path of a file written by save.
+           Return:
+             an ISAXIndex object, to which more time series can be added.
+        '''
+        with np.load(path, allow_pickle=False) as archive:
+            tree = json.loads(str(archive['tree']))
+            index = cls(tree['length'], tree['segments'], tree['leaf_size'], tree['bits'])
+            index._data = archive['data']
+            index._words = archive['words']
+            index._paa = archive['paa']
+        index._count = len(index._data)
+        index._nodes = tree['nodes']
+        index._roots = {tuple(key): node for key, node in tree['roots']}
+        return index
@@ -0,0 +1,147 @@
+import heapq
+import numpy as np
+from timeseries import stats
+
+class SimilaritySearch:
+    '''This is the SimilaritySearch class implemented using Python.
+       The SimilaritySearch class finds the time series of a corpus that are nearest to a query
+       by z-normalized Euclidean distance, without computing the distance to every time series.
+
+       The z-normalized time series are indexed by a vantage-point tree. Every inner node has a
+       vantage point and the median distance mu of the time series below it to the vantage point;
+       the time series within mu go to the inside child, the others to the outside child. For a
+       query at distance d from the vantage point, the triangle inequality bounds the distance
+       to anything inside by d - mu, and to anything outside by mu - d. The nodes are searched
+       in order of these lower bounds, and the search stops when the next bound is not smaller
+       than the k-th distance found so far. In a leaf, the distance between the PAA of the query
+       and of every time series is a cheaper lower bound (see stats.paa) that skips most of the
+       full distances.
+
+
+       Attributes:
+
+         data: the 2-D array of z-normalized time series, one per row.
+         paa: the PAA of every time series.
+         lengths: the length of every PAA segment.
+         nodes: the vantage point, mu, inside child and outside child of every inner node, or
+           the array of time series of a leaf.
+         distance_count: the number of full distances computed by the last query.
+
+
+       Methods:
+
+         __len__: The function to get the number of indexed time series.
+         query: The function to find the k time series nearest to a query.
+         _build: The private helper function to build the vantage-point tree.
+         _distances: The private helper function to get the distances from a query to some time series.
+
+       Examples:
+       --------
+       >>> from timeseries.ArrayTimeSeries import ArrayTimeSeries
+       >>> corpus = [ArrayTimeSeries(range(4), v) for v in ([1, 2, 3, 4], [4, 3, 2, 1], [1, 3, 2, 4])]
+       >>> index = SimilaritySearch(corpus)
+       >>> [i for d, i in index.query(ArrayTimeSeries(range(4), [10, 20, 30, 41]), k=2)]
+       [0, 2]
+    '''
+    def __init__(self, series, leaf_size=16, segments=8, seed=None):
+        '''The constructor to build the index.
+           Param:
+             series: a sequence of ArrayTimeSeries objects of the same length, a TimeSeriesCollection,
+               or a 2-D numpy array with one time series per row.
+             leaf_size: the largest number of time series in a leaf.
+             segments: the number of PAA segments for the lower bound in the leaves.
+             seed: the seed of the random choice of the vantage points.
+        '''
+        values = stats.rows(series)
+        if values.ndim != 2 or values.shape[0] == 0 or values.shape[1] == 0:
+            raise ValueError('At least one non-empty time series is needed')
+        if leaf_size < 1:
+            raise ValueError('leaf_size must be positive')
+        self._data = stats.znormalize(values)
+        segments = min(segments, self._data.shape[1])
+        self._paa = stats.paa(self._data, segments)
+        self._lengths = np.diff(np.append(stats.paa_bounds(self._data.shape[1], segments), self._data.shape[1]))
+        self._nodes = []
+        self._distance_count = 0
+        self._build(leaf_size, np.random.RandomState(seed))
+
+    def __len__(self):
+        '''The function to get the number of indexed time series.
+           Return:
+             the number of time series.
+        '''
+        return len(self._data)
+
+    def _build(self, leaf_size, rng):
+        '''The private helper function to build the vantage-point tree.
+           The nodes are built from an explicit stack, so deep trees do not hit the recursion limit.
+           Param:
+             leaf_size: the largest number of time series in a leaf.
+             rng: the numpy random number generator that picks the vantage points.
+           Return:
+             None.
+        '''
+        self._nodes.append(None)
+        stack = [(0, np.arange(len(self._data)))]
+        while stack:
+            node, members = stack.pop()
+            if len(members) <= leaf_size:
+                self._nodes[node] = members
+                continue
+            pick = rng.randint(len(members))
+            vantage = members[pick]
+            others = np.delete(members, pick)
+            distances = np.sqrt(np.sum((self._data[others] - self._data[vantage])**2, axis=1))
+            mu = np.median(distances)
+            inside, outside = len(self._nodes), len(self._nodes) + 1
+            self._nodes.extend([None, None])
+            self._nodes[node] = (vantage, mu, inside, outside)
+            stack.append((inside, others[distances <= mu]))
+            stack.append((outside, others[distances > mu]))
+
+    def _distances(self, query, members):
+        '''The private helper function to get the distances from a query to some time series.
+           Param:
+             query: a z-normalized numpy array.
+             members: a numpy array of the rows of the time series.
+           Return:
+             a numpy array of distances.
+        '''
+        self._distance_count += len(members)
+        return np.sqrt(np.sum((self._data[members] - query)**2, axis=1))
+
+    def query(self, query, k=1):
+        '''The function to find the k time series nearest to a query.
+           Param:
+             query: an ArrayTimeSeries or a sequence of values with the same length as the indexed time series.
+             k: the number of time series to find.
+           Return:
+             a list of (distance, position) pairs, nearest first, where position is the index of the
+             time series in the corpus.
+        '''
+        values = np.asarray(getattr(query, '_value', query), dtype=float)
+        if values.shape != (self._data.shape[1],):
+            raise ValueError('The query must have the same length as the indexed time series')
+        nearest = stats.Nearest(k)
+        query = stats.znormalize(values)
+        query_paa = stats.paa(query, len(self._lengths))
+        self._distance_count = 0
+        frontier = [(0.0, 0)]
+        while frontier:
+            bound, node = heapq.heappop(frontier)
+            if bound >= nearest.radius():
+                break
+            entry = self._nodes[node]
+            if isinstance(entry, tuple):
+                vantage, mu, inside, outside = entry
+                distance = self._distances(query, np.array([vantage]))
+                nearest.add(distance, [vantage])
+                distance = distance[0]
+                heapq.heappush(frontier, (max(bound, distance - mu), inside))
+                heapq.heappush(frontier, (max(bound, mu - distance), outside))
+            else:
+                lower = np.sqrt(np.sum(self._lengths * (self._paa[entry] - query_paa)**2, axis=1))
+                members = entry[lower < nearest.radius()]
+                if len(members):
+                    nearest.add(self._distances(query, members), members)
+        return nearest.result()
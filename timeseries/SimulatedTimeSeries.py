@@ -3,11 +3,16 @@ import reprlib
 import numpy as np
 import sys
 import math
+import itertools
 from timeseries.TimeSeriesInterface import TimeSeriesInterface
 from timeseries.StreamTimeSeriesInterface import StreamTimeSeriesInterface
+from timeseries import stats
+from timeseries.QuantileSketch import QuantileSketch
 #from TimeSeriesInterface import TimeSeriesInterface
 #from StreamTimeSeriesInterface import StreamTimeSeriesInterface
 from random import normalvariate, random
+import collections
+import heapq
 
 class SimulatedTimeSeries(StreamTimeSeriesInterface):
     '''This is the imulatedTimeSeries class implemented using Python.
@@ -27,6 +32,7 @@ class SimulatedTimeSeries(StreamTimeSeriesInterface):
          n: the number keeping track of at what position the generator is at.
          mu_std: the helper variable for calculating the standard deviation.
          n_std: the nth standard deviation.
+         produced: the number of elements taken from the generator, used as the time of bare values.
 
 
 
@@ -37,14 +43,37 @@ class SimulatedTimeSeries(StreamTimeSeriesInterface):
          __str__: The function to return a string representation of SimulatedTimeSeries.
          __iter__: The function that iterates over time series' data.
          produce: The function that produce a list of outcome from SimulatedTimeSeries' generator.
+         produce_arrays: The function that produce numpy arrays of times and values from SimulatedTimeSeries' generator.
          itervalues: The function that iterates over the time series' data.
          itertimes: The function that iterates over the time series' times.
          iteritems: The function that iterates over the time series' time-value tuple pairs.
+         _elements: The function that iterates over the generator and counts the elements taken.
 
          online_mean: The function that convert a generator of mean to a SimulatedTimeSeries of mean.
          _online_mean_helper: The function to return a online mean of SimulatedTimeSeries.
          online_std: The function that convert a generator of standard deviation to a SimulatedTimeSeries of mean.
          _online_std_helper: The function to return a online standard deviation of SimulatedTimeSeries.
+         online_mean_arrays: The function that returns a generator of numpy arrays of online mean, one per chunk.
+         online_std_arrays: The function that returns a generator of numpy arrays of online standard deviation, one per chunk.
+         _online_arrays_helper: The function to return the running mean and m2 of every chunk.
+         rolling_mean: The function that returns a SimulatedTimeSeries of the mean of a sliding window.
+         rolling_std: The function that returns a SimulatedTimeSeries of the standard deviation of a sliding window.
+         rolling_min: The function that returns a SimulatedTimeSeries of the minimum of a sliding window.
+         rolling_max: The function that returns a SimulatedTimeSeries of the maximum of a sliding window.
+         _rolling_helper: The function to return the (time, statistic) pairs of a sliding window.
+         ewm_mean: The function that returns a SimulatedTimeSeries of exponentially weighted mean.
+         ewm_var: The function that returns a SimulatedTimeSeries of exponentially weighted variance.
+         _ewm_helper: The function to return the exponentially weighted mean and variance after every element.
+         ewm_mean_arrays: The function that returns a generator of numpy arrays of exponentially weighted mean, one per chunk.
+         ewm_var_arrays: The function that returns a generator of numpy arrays of exponentially weighted variance, one per chunk.
+         _ewm_arrays_helper: The function to return the exponentially weighted mean and variance of every chunk.
+         online_quantile: The function that returns a SimulatedTimeSeries of approximate quantiles from a QuantileSketch.
+         _online_quantile_helper: The function to return the approximate quantiles after every element.
+         online_quantile_arrays: The function that returns a generator of numpy arrays of approximate quantiles, one per chunk.
+         tee: The function that splits the SimulatedTimeSeries into several that read the generator once.
+         merge: The function that merges several SimulatedTimeSeries into one ordered by time.
+         _merge_helper: The function to return the elements of several generators in the order of time.
+         _pull: The function to return the (time, data) pairs of a generator, pulled in blocks.
 
     '''
     def __init__(self, gen):
@@ -61,6 +90,7 @@ class SimulatedTimeSeries(StreamTimeSeriesInterface):
         self._n = 0
         self._mu_std = 0
         self._n_std = 0
+        self._produced = 0
   
     def __len__(self):
         '''The function to get the length of the SimulatedTimeSeries.
@@ -68,7 +98,7 @@ class SimulatedTimeSeries(StreamTimeSeriesInterface):
              length of the timeseries data.
         '''
         l = 0
-        for v in self._gen:
+        for v in self._elements():
             l += 1
         self._length = l
         return self._length
@@ -92,7 +122,7 @@ class SimulatedTimeSeries(StreamTimeSeriesInterface):
            Return:
              an iterator of the time series' data.
         '''
-        for i in self._gen:
+        for i in self._elements():
             if isinstance(i,tuple):
                 yield i[1]
             elif isinstance(i, numbers.Integral):
@@ -108,15 +138,38 @@ class SimulatedTimeSeries(StreamTimeSeriesInterface):
         result = []
         for i in range(chunk):
             result.append(next(self._gen))
+            self._produced += 1
         return result 
 
+    def produce_arrays(self, chunk=1):
+        '''The function that produce numpy arrays of times and values from SimulatedTimeSeries' generator.
+           The elements are pulled from the generator as one block instead of one next() call each.
+           If the generator's elements are (time, data) tuples, their times and data are returned;
+           if they are data only, the time is the order of generating data, counted across the calls 
+           of every method that takes elements from the generator.
+           Param:
+             chunk: the number of elements to produce. Fewer are returned when the generator runs out.
+           Return:
+             a tuple of two contiguous numpy arrays, the times and the values.
+        '''
+        items = list(itertools.islice(self._gen, chunk))
+        if items and isinstance(items[0], tuple):
+            # every column gets its own dtype, so integer times are not rounded through float64
+            times = np.array([i[0] for i in items])
+            values = np.array([i[1] for i in items])
+        else:
+            values = np.array(items)
+            times = np.arange(self._produced, self._produced + len(items))
+        self._produced += len(items)
+        return times, values
+
 
     def itervalues(self):
         '''The function that iterates over the time series' data.
            Return:
              an iterator of the time series' data.
         '''
-        for i in self._gen:
+        for i in self._elements():
             if isinstance(i,tuple):
                 yield i[1]
             elif isinstance(i, numbers.Integral):
@@ -129,8 +182,8 @@ class SimulatedTimeSeries(StreamTimeSeriesInterface):
            Return:
              an iterator of the time series' times.
        '''
-        count = 0
-        for i in self._gen:
+        count = self._produced
+        for i in self._elements():
             if isinstance(i,tuple):
                 yield i[0]
             elif isinstance(i, numbers.Integral):
@@ -144,14 +197,24 @@ class SimulatedTimeSeries(StreamTimeSeriesInterface):
            Return:
              an iterator of the time series' (time, data) pairs.
         '''
-        count = 0
-        for i in self._gen:
+        count = self._produced
+        for i in self._elements():
             if isinstance(i,tuple):
                 yield i
             elif isinstance(i, numbers.Integral):
                 yield (count,i) 
             count += 1
 
+    def _elements(self):
+        '''The function that iterates over the generator and counts the elements taken.
+           Every method that takes elements from the generator goes through it, so the times of 
+           bare values go on from where the previous call stopped.
+           Return:
+             an iterator of the generator's elements.
+        '''
+        for i in self._gen:
+            self._produced += 1
+            yield i
 
     def online_mean(self):
         '''The function that convert a generator of mean to a SimulatedTimeSeries of mean.
@@ -165,7 +228,7 @@ class SimulatedTimeSeries(StreamTimeSeriesInterface):
            Return:
              a generator of online mean. 
         '''
-        for value in self._gen:
+        for value in self._elements():
             self._n += 1
             delta = value - self._mu
             self._mu += delta / self._n
@@ -184,7 +247,7 @@ class SimulatedTimeSeries(StreamTimeSeriesInterface):
              a generator of online standard deviation. 
         '''
         dev_accum = 0
-        for value in self._gen:#_value:# according to the formulae in my remarks 
+        for value in self._elements():#_value:# according to the formulae in my remarks 
             self._n_std += 1
             mu_new = (value - self._mu_std) / self._n_std + self._mu_std   #every time comes a new element, calculate a new mu
             dev_accum = dev_accum + (value - self._mu_std) * (value - mu_new) 
@@ -194,3 +257,489 @@ class SimulatedTimeSeries(StreamTimeSeriesInterface):
             else:
                 stddev = 0
             yield stddev
+
+    def online_mean_arrays(self, chunk=4096):
+        '''The function that returns a generator of numpy arrays of online mean, one per chunk.
+           The values are the same as those of online_mean, up to floating-point rounding, but 
+           every chunk is computed with numpy at once.
+           Param:
+             chunk: the number of elements to pull from the generator at a time.
+           Return:
+             a generator of numpy arrays of the mean after every element.
+        '''
+        for means, m2s, counts in self._online_arrays_helper(chunk):
+            yield means
+
+    def online_std_arrays(self, chunk=4096):
+        '''The function that returns a generator of numpy arrays of online standard deviation, one per chunk.
+           The values are the same as those of online_std, up to floating-point rounding, but 
+           every chunk is computed with numpy at once.
+           Param:
+             chunk: the number of elements to pull from the generator at a time.
+           Return:
+             a generator of numpy arrays of the sample standard deviation after every element.
+        '''
+        for means, m2s, counts in self._online_arrays_helper(chunk):
+            stddev = np.zeros(len(m2s))
+            more = counts > 1
+            stddev[more] = np.sqrt(m2s[more] / (counts[more] - 1))
+            yield stddev
+
+    def _online_arrays_helper(self, chunk):
+        '''The function to return the running mean and m2 of every chunk.
+           The (count, mean, m2) summary of every chunk is merged into the running summary with 
+           the parallel form of Welford's algorithm, see timeseries.stats.
+           Param:
+             chunk: the number of elements to pull from the generator at a time.
+           Return:
+             a generator of the running means, running m2 and counts after every element of a chunk.
+        '''
+        n, mean, m2 = 0, 0.0, 0.0
+        while True:
+            times, values = self.produce_arrays(chunk)
+            if len(values) == 0:
+                return
+            counts = n + np.arange(1, len(values)+1)
+            means, m2s, n, mean, m2 = stats.running(values, n, mean, m2)
+            yield means, m2s, counts
+
+    def rolling_mean(self, size=None, duration=None):
+        '''The function that returns a SimulatedTimeSeries of the mean of a sliding window.
+           Param:
+             size: the window is the last size elements.
+             duration: the window is the elements within the last duration time units. 
+               Exactly one of size and duration must be given.
+           Return:
+             a SimulatedTimeSeries object of (time, mean) pairs, one per element.
+        '''
+        return SimulatedTimeSeries(self._rolling_helper(stats.RollingWindow(size, duration), lambda w: w.mean()))
+
+    def rolling_std(self, size=None, duration=None, ddof=0):
+        '''The function that returns a SimulatedTimeSeries of the standard deviation of a sliding window.
+           Param:
+             size: the window is the last size elements.
+             duration: the window is the elements within the last duration time units. 
+               Exactly one of size and duration must be given.
+             ddof: divide by the window count minus ddof, as numpy.std does.
+           Return:
+             a SimulatedTimeSeries object of (time, standard deviation) pairs, one per element.
+        '''
+        return SimulatedTimeSeries(self._rolling_helper(stats.RollingWindow(size, duration), lambda w: w.std(ddof)))
+
+    def rolling_min(self, size=None, duration=None):
+        '''The function that returns a SimulatedTimeSeries of the minimum of a sliding window.
+           Param:
+             size: the window is the last size elements.
+             duration: the window is the elements within the last duration time units. 
+               Exactly one of size and duration must be given.
+           Return:
+             a SimulatedTimeSeries object of (time, minimum) pairs, one per element.
+        '''
+        return SimulatedTimeSeries(self._rolling_helper(stats.RollingWindow(size, duration), lambda w: w.min()))
+
+    def rolling_max(self, size=None, duration=None):
+        '''The function that returns a SimulatedTimeSeries of the maximum of a sliding window.
+           Param:
+             size: the window is the last size elements.
+             duration: the window is the elements within the last duration time units. 
+               Exactly one of size and duration must be given.
+           Return:
+             a SimulatedTimeSeries object of (time, maximum) pairs, one per element.
+        '''
+        return SimulatedTimeSeries(self._rolling_helper(stats.RollingWindow(size, duration), lambda w: w.max()))
+
+    def _rolling_helper(self, window, statistic):
+        '''The function to return the (time, statistic) pairs of a sliding window.
+           If the generator's elements are data only, the time is the order of generating data.
+           Param:
+             window: an empty stats.RollingWindow.
+             statistic: the function that gets the statistic from the window.
+           Return:
+             a generator of (time, statistic) pairs.
+        '''
+        count = self._produced
+        for i in self._elements():
+            if isinstance(i, tuple):
+                time, value = i
+            else:
+                time, value = count, i
+            count += 1
+            window.update(time, value)
+            yield (time, statistic(window))
+
+    def ewm_mean(self, alpha=None, halflife=None):
+        '''The function that returns a SimulatedTimeSeries of exponentially weighted mean.
+           Only the current mean is kept, so the memory does not grow with the stream.
+           Param:
+             alpha: the weight of the newest element, 0 < alpha <= 1.
+             halflife: the number of elements after which the weight of an element halves.
+               Exactly one of alpha and halflife must be given.
+           Return:
+             a SimulatedTimeSeries object of the mean after every element.
+        '''
+        alpha = stats.ewm_alpha(alpha, halflife)
+        return SimulatedTimeSeries(mean for mean, var in self._ewm_helper(alpha))
+
+    def ewm_var(self, alpha=None, halflife=None):
+        '''The function that returns a SimulatedTimeSeries of exponentially weighted variance.
+           Only the current mean and variance are kept, so the memory does not grow with the stream.
+           Param:
+             alpha: the weight of the newest element, 0 < alpha <= 1.
+             halflife: the number of elements after which the weight of an element halves.
+               Exactly one of alpha and halflife must be given.
+           Return:
+             a SimulatedTimeSeries object of the variance after every element.
+        '''
+        alpha = stats.ewm_alpha(alpha, halflife)
+        return SimulatedTimeSeries(var for mean, var in self._ewm_helper(alpha))
+
+    def _ewm_helper(self, alpha):
+        '''The function to return the exponentially weighted mean and variance after every element.
+           For every value x, with d = x - mean, mean becomes mean + alpha * d and var becomes 
+           (1 - alpha) * (var + alpha * d**2). The first value starts mean at x and var at 0.
+           Param:
+             alpha: the smoothing factor.
+           Return:
+             a generator of (mean, variance) pairs.
+        '''
+        mean = None
+        var = 0.0
+        for i in self._elements():
+            value = i[1] if isinstance(i, tuple) else i
+            if mean is None:
+                mean = value
+            delta = value - mean
+            mean = mean + alpha * delta
+            var = (1 - alpha) * (var + alpha * delta * delta)
+            yield mean, var
+
+    def ewm_mean_arrays(self, alpha=None, halflife=None, chunk=4096):
+        '''The function that returns a generator of numpy arrays of exponentially weighted mean, one per chunk.
+           Every chunk is computed with numpy at once, see stats.ewm_running.
+           Param:
+             alpha: the weight of the newest element, 0 < alpha <= 1.
+             halflife: the number of elements after which the weight of an element halves.
+               Exactly one of alpha and halflife must be given.
+             chunk: the number of elements to pull from the generator at a time.
+           Return:
+             a generator of numpy arrays of the mean after every element.
+        '''
+        alpha = stats.ewm_alpha(alpha, halflife)
+        return (means for means, variances in self._ewm_arrays_helper(alpha, chunk))
+
+    def ewm_var_arrays(self, alpha=None, halflife=None, chunk=4096):
+        '''The function that returns a generator of numpy arrays of exponentially weighted variance, one per chunk.
+           Every chunk is computed with numpy at once, see stats.ewm_running.
+           Param:
+             alpha: the weight of the newest element, 0 < alpha <= 1.
+             halflife: the number of elements after which the weight of an element halves.
+               Exactly one of alpha and halflife must be given.
+             chunk: the number of elements to pull from the generator at a time.
+           Return:
+             a generator of numpy arrays of the variance after every element.
+        '''
+        alpha = stats.ewm_alpha(alpha, halflife)
+        return (variances for means, variances in self._ewm_arrays_helper(alpha, chunk))
+
+    def _ewm_arrays_helper(self, alpha, chunk):
+        '''The function to return the exponentially weighted mean and variance of every chunk.
+           Param:
+             alpha: the smoothing factor.
+             chunk: the number of elements to pull from the generator at a time.
+           Return:
+             a generator of numpy arrays of means and variances, one pair per chunk.
+        '''
+        n, mean, var = 0, 0.0, 0.0
+        while True:
+            times, values = self.produce_arrays(chunk)
+            if len(values) == 0:
+                return
+            means, variances, n, mean, var = stats.ewm_running(values, alpha, n, mean, var)
+            yield means, variances
+
+    def online_quantile(self, q=0.5, k=200, sketch=None):
+        '''The function that returns a SimulatedTimeSeries of approximate quantiles from a QuantileSketch.
+           The sketch keeps about 3k values whatever the length of the stream, and the rank of every
+           quantile is within about 2.5/k of q, see timeseries.QuantileSketch.
+           Param:
+             q: a number in [0, 1], or a sequence of them such as (0.5, 0.95, 0.99).
+             k: the size of the sketch.
+             sketch: a QuantileSketch to update, to merge it with the sketches of other streams
+               afterwards. A new sketch is used when it is None.
+           Return:
+             a SimulatedTimeSeries object of the quantile, or the list of quantiles, after every element.
+        '''
+        if sketch is None:
+            sketch = QuantileSketch(k)
+        return SimulatedTimeSeries(self._online_quantile_helper(q, sketch))
+
+    def _online_quantile_helper(self, q, sketch):
+        '''The function to return the approximate quantiles after every element.
+           Param:
+             q: a number in [0, 1], or a sequence of them.
+             sketch: the QuantileSketch to update.
+           Return:
+             a generator of quantiles.
+        '''
+        for i in self._elements():
+            sketch.update(i[1] if isinstance(i, tuple) else i)
+            yield sketch.quantile(q)
+
+    def online_quantile_arrays(self, q=0.5, k=200, sketch=None, chunk=4096):
+        '''The function that returns a generator of numpy arrays of approximate quantiles, one per chunk.
+           Every chunk is added to the sketch with update_many and the sketch is queried once, 
+           after the last element of the chunk, which is much cheaper than online_quantile.
+           Param:
+             q: a number in [0, 1], or a sequence of them such as (0.5, 0.95, 0.99).
+             k: the size of the sketch.
+             sketch: a QuantileSketch to update. A new sketch is used when it is None.
+             chunk: the number of elements to pull from the generator at a time.
+           Return:
+             a generator of numpy arrays of the quantiles after the last element of every chunk, 
+             one per number of q.
+        '''
+        if sketch is None:
+            sketch = QuantileSketch(k)
+        while True:
+            times, values = self.produce_arrays(chunk)
+            if len(values) == 0:
+                return
+            sketch.update_many(values)
+            yield np.atleast_1d(sketch.quantile(q))
+
+    def tee(self, n=2, maxlen=1024):
+        '''The function that splits the SimulatedTimeSeries into several that read the generator once.
+           Every element is pulled from the generator once and kept in a buffer shared by all the
+           branches until every branch has read it, so several statistics can be computed in one pass,
+           e.g. zip(a.online_mean(), b.online_std()). A branch that is closed or garbage collected
+           stops holding elements in the buffer.
+           Param:
+             n: the number of branches.
+             maxlen: the largest number of elements the buffer holds, None for no limit. A branch
+               that gets more than maxlen elements ahead of another raises BufferError; the branch 
+               stays open, and reading it again succeeds once the other branches have caught up.
+           Return:
+             a tuple of n SimulatedTimeSeries objects.
+        '''
+        if n < 1:
+            raise ValueError('n must be positive')
+        if maxlen is not None and maxlen < 1:
+            raise ValueError('maxlen must be positive')
+        buffer = _SharedBuffer(self._gen, n, maxlen)
+        branches = tuple(SimulatedTimeSeries(buffer.branch(i)) for i in range(n))
+        for branch in branches:
+            # the times of bare values go on from the elements already taken from the generator
+            branch._produced = self._produced
+        return branches
+
+    @staticmethod
+    def merge(streams, tagged=False, chunk=1):
+        '''The function that merges several SimulatedTimeSeries into one ordered by time.
+           The next element of every stream is kept in a heap, so every element takes O(log k) time 
+           and only O(k * chunk) elements are held, where k is the number of streams. Elements with 
+           the same time come out in the order of their streams.
+           Param:
+             streams: a sequence of SimulatedTimeSeries (or iterables) whose elements are in order of time.
+               If the elements are data only, the time is the order of generating data in the stream.
+             tagged: if True, every element is a (time, data, source) tuple where source is the index 
+               of its stream; otherwise it is a (time, data) pair.
+             chunk: the number of elements to pull from a stream at a time.
+           Return:
+             a SimulatedTimeSeries object of the elements of all the streams.
+        '''
+        if chunk < 1:
+            raise ValueError('chunk must be positive')
+        sources = [SimulatedTimeSeries._pull(s._gen, chunk, s._produced) if isinstance(s, SimulatedTimeSeries)
+                   else SimulatedTimeSeries._pull(iter(s), chunk) for s in streams]
+        return SimulatedTimeSeries(SimulatedTimeSeries._merge_helper(sources, tagged))
+
+    @staticmethod
+    def _merge_helper(sources, tagged):
+        '''The function to return the elements of several generators in the order of time.
+           Param:
+             sources: a list of generators of (time, data) pairs.
+             tagged: whether to add the index of the source to every element.
+           Return:
+             a generator of (time, data) pairs or (time, data, source) tuples.
+        '''
+        heap = []
+        for i, source in enumerate(sources):
+            for time, value in source:
+                heap.append((time, i, value))
+                break
+        heapq.heapify(heap)
+        while heap:
+            time, i, value = heap[0]
+            yield (time, value, i) if tagged else (time, value)
+            for time, value in sources[i]:
+                heapq.heapreplace(heap, (time, i, value))
+                break
+            else:
+                heapq.heappop(heap)
+
+    @staticmethod
+    def _pull(gen, chunk, start=0):
+        '''The function to return the (time, data) pairs of a generator, pulled in blocks.
+           Param:
+             gen: a generator whose elements are numbers or (time, data) tuples.
+             chunk: the number of elements to pull at a time.
+             start: the time of the first element, if the elements are data only.
+           Return:
+             a generator of (time, data) pairs.
+        '''
+        count = start
+        while True:
+            block = list(itertools.islice(gen, chunk))
+            if not block:
+                return
+            for i in block:
+                yield i if isinstance(i, tuple) else (count, i)
+                count += 1
+
+
+class _SharedBuffer:
+    '''The private helper class that holds the elements of a generator until every branch of a tee has read them.
+
+       Attributes:
+
+         source: the generator.
+         items: a deque of the elements not read by every branch.
+         first: the position in the generator of the first element of items.
+         positions: the position of the next element of every branch, None for a closed branch.
+         maxlen: the largest number of elements in items.
+
+       Methods:
+
+         branch: The function that returns the iterator of the elements for one branch.
+         _close: The private helper function to stop holding elements for a branch.
+         _next: The private helper function to get the next element of a branch.
+         _trim: The private helper function to drop the elements read by every branch.
+    '''
+    def __init__(self, source, n, maxlen):
+        '''The constructor of _SharedBuffer.
+           Param:
+             source: the generator.
+             n: the number of branches.
+             maxlen: the largest number of elements held, None for no limit.
+        '''
+        self._source = iter(source)
+        self._items = collections.deque()
+        self._first = 0
+        self._positions = [0] * n
+        self._maxlen = maxlen
+        self._done = False
+
+    def branch(self, i):
+        '''The function that returns the iterator of the elements for one branch.
+           Param:
+             i: the index of the branch.
+           Return:
+             a _Branch iterator of the elements of the source.
+        '''
+        return _Branch(self, i)
+
+    def _close(self, i):
+        '''The private helper function to stop holding elements for a branch.
+           Param:
+             i: the index of the branch.
+           Return:
+             None.
+        '''
+        if self._positions[i] is not None:
+            self._positions[i] = None
+            self._trim()
+
+    def _next(self, i):
+        '''The private helper function to get the next element of a branch.
+           Param:
+             i: the index of the branch.
+           Return:
+             a tuple of whether there is an element and the element. The position of the branch 
+             does not change when BufferError is raised.
+        '''
+        if self._positions[i] is None:
+            return False, None
+        offset = self._positions[i] - self._first
+        if offset == len(self._items):
+            if self._done:
+                return False, None
+            if self._maxlen is not None and len(self._items) >= self._maxlen:
+                raise BufferError('A branch is more than {} elements ahead of another'.format(self._maxlen))
+            try:
+                self._items.append(next(self._source))
+            except StopIteration:
+                self._done = True
+                return False, None
+        item = self._items[offset]
+        self._positions[i] += 1
+        if offset == 0:
+            self._trim()
+        return True, item
+
+    def _trim(self):
+        '''The private helper function to drop the elements read by every branch.
+           Return:
+             None.
+        '''
+        open_positions = [p for p in self._positions if p is not None]
+        slowest = min(open_positions) if open_positions else self._first + len(self._items)
+        while self._first < slowest:
+            self._items.popleft()
+            self._first += 1
+
+
+class _Branch:
+    '''The private helper class of the iterator of one branch of a tee.
+       Unlike a generator, it is not closed by an exception, so a read that raised BufferError 
+       can be retried.
+
+       Attributes:
+
+         buffer: the _SharedBuffer of the tee.
+         index: the index of the branch.
+
+       Methods:
+
+         __iter__: The function that returns the iterator itself.
+         __next__: The function to get the next element of the branch.
+         close: The function to stop reading the branch, so that it no longer holds elements.
+         __del__: The function to close the branch when it is garbage collected.
+    '''
+    def __init__(self, buffer, index):
+        '''The constructor of _Branch.
+           Param:
+             buffer: the _SharedBuffer of the tee.
+             index: the index of the branch.
+        '''
+        self._buffer = buffer
+        self._index = index
+
+    def __iter__(self):
+        '''The function that returns the iterator itself.
+           Return:
+             the _Branch object.
+        '''
+        return self
+
+    def __next__(self):
+        '''The function to get the next element of the branch.
+           Return:
+             the next element of the source; StopIteration at the end of the source or after close,
+             BufferError when the branch is maxlen elements ahead of another.
+        '''
+        found, item = self._buffer._next(self._index)
+        if not found:
+            raise StopIteration
+        return item
+
+    def close(self):
+        '''The function to stop reading the branch, so that it no longer holds elements.
+           Return:
+             None.
+        '''
+        self._buffer._close(self._index)
+
+    def __del__(self):
+        '''The function to close the branch when it is garbage collected.
+        '''
+        self.close()
@@ -13,6 +13,8 @@ class SizedContainerTimeSeriesInterface(TimeSeriesInterface):
          times: get times from SizeContainerTimeSeriesInterface.
          items: get time-values tuple pairs from SizedContainerTimeSeriesInterface.
          __contains__: A test for whether item is in set.
+         value_at: get the value at a time point from SizedContainerTimeSeriesInterface.
+         between: get the part of SizedContainerTimeSeriesInterface within a time range.
          interpolate: predict the given time value in SizedContainerTimeSeriesInterface.
          __eq__: compare two objects, check if they are equal.
          __add__: add two TimeSeriesInterface.
@@ -55,6 +57,14 @@ class SizedContainerTimeSeriesInterface(TimeSeriesInterface):
     def __contains__(self,val)->bool:
         "A test for whether item is in set"
     
+    @abc.abstractmethod
+    def value_at(self,time):
+        "get the value at a time point from SizedContainerTimeSeriesInterface."
+
+    @abc.abstractmethod
+    def between(self,start=None,stop=None):
+        "get the part of SizedContainerTimeSeriesInterface within a time range."
+
     @abc.abstractmethod
     def interpolate(self,inter_time):
         "predict the given time value in SizedContainerTimeSeriesInterface."
@@ -1,8 +1,10 @@
+import bisect
+import collections
 import numbers
 import reprlib
 import numpy as np
 import sys
-from timeseries.lazy import LazyOperation
+from timeseries.lazy import LazyOperation, identity
 import math
 from timeseries.SizedContainerTimeSeriesInterface import SizedContainerTimeSeriesInterface
 from timeseries.TimeSeriesInterface import TimeSeriesInterface
@@ -39,6 +41,8 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
          items: The function to get a list of time-value tuple pairs.
 
          __contains__: The function to check whether a value is in the time series.
+         value_at: The function to get the value at a time point.
+         between: The function to get the part of the time series within a time range.
          interpolate: for every new time point passed in, compute a value for the TimeSeries class.
          _binary_search: The private helper function. For a time point, find the nearest two time points.
          __eq__: The function to check whether the new TimeSeries object is the same as the current one.
@@ -80,6 +84,10 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
        [(5, 0), (6, 1), (7, 2), (8, 3), (9, 4)]
        >>> 3 in TimeSeries([0,1,2,3,4],[5,6,7,8,9])
        True
+       >>> TimeSeries([0,1,2,3,4],[5,6,7,8,9]).value_at(7)
+       2
+       >>> TimeSeries([0,1,2,3,4],[5,6,7,8,9]).between(6, 8)
+       TimeSeries([(6, 1), (7, 2)])
        >>> TimeSeries([1,2,3], [0,5,10]).interpolate([1])
        TimeSeries([(1, 1.2)])
        >>> TimeSeries([4, 5, 6], [1, 2, 3]) == TimeSeries([4, 5, 6], [1, 2, 3])
@@ -99,23 +107,34 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
        >>> bool(TimeSeries([4,5,6],[1,2,3]))
        True
     '''
-    def __init__(self, data, time = None):
+    def __init__(self, data, time = None, presorted = False):
         '''The constructor to initialize a TimeSeries object.
+           Time points that are already in increasing order are detected in one pass and not sorted again.
            Param: 
              data: the initial sequence-like data to fill the time series. Data can have length 0, but must be given.
              time: the initial time to fill the time series. Time is an optional argument.
+             presorted: if True, time is trusted to be in increasing order. Time and data are neither 
+               checked nor sorted, and lists are adopted without a copy.
         '''
         ##the time has to be in order when pass in -- precondtion
+        # count of every value, built on the first __contains__ and kept up to date by __setitem__
+        self._value_index = None
         len_data = len(data)
-        if time == None:
+        if time is None:
             self._key = list(range(len_data))
             self._value = data
+        elif presorted:
+            self._key = time if isinstance(time, list) else list(time)
+            self._value = data if isinstance(data, list) else list(data)
         else:
-            sort_order = np.argsort(np.array(time))
-            time = list(np.array(time)[sort_order])
-            data = list(np.array(data)[sort_order])
-            self._key = time
-            self._value = data
+            time = np.array(time)
+            data = np.array(data)
+            if not np.all(time[:-1] <= time[1:]):
+                sort_order = np.argsort(time)
+                time = time[sort_order]
+                data = data[sort_order]
+            self._key = list(time)
+            self._value = list(data)
         if len(self._value) != len(self._key):
             raise Exception('The length of time input has to be equal to the length of value input')
         #self._time_series = list(zip(self._key, self._value))
@@ -136,7 +155,9 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
         '''
         cls = type(self)
         if isinstance(index, slice):
-            return cls(self._value[index],self._key[index])
+            if index.step is not None and index.step < 0:
+                return cls(self._value[index],self._key[index])
+            return cls(self._value[index],self._key[index],presorted=True)
         elif isinstance(index, numbers.Integral):
             return (self._key[index],self._value[index])
     
@@ -149,7 +170,18 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
              None.
         '''
         #pass in only the value. We can't change the time -- precondition
-        self._value[index] = val
+        if self._value_index is not None and isinstance(index, numbers.Integral):
+            # the counts change only after the assignment succeeds
+            old = self._value[index]
+            self._value[index] = val
+            self._value_index[old] -= 1
+            try:
+                self._value_index[val] += 1
+            except TypeError:
+                self._value_index = None
+        else:
+            self._value_index = None
+            self._value[index] = val
 
     def __repr__(self):
         '''The function to return formal string representation of the timeseries data.
@@ -236,13 +268,48 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
 
     def __contains__(self,val):
         '''The function to check whether a value is in the time series.
+           The first check builds a count of every value in O(n), so later checks take O(1).
            Param:
              val: the value to check
            Return:
              boolean, whether the value is in the time series.
         '''
-        return val in self._value
-
+        if self._value_index is None:
+            self._value_index = collections.Counter(self._value)
+        try:
+            return self._value_index[val] > 0
+        except TypeError:
+            return val in self._value
+
+
+    def value_at(self, time):
+        '''The function to get the value at a time point.
+           The time points are sorted, so the time point is found by binary search in O(log n).
+           If the time point is repeated, the value of its first occurrence is returned.
+           Param:
+             time: the time point to look up.
+           Return:
+             the value at the time point.
+           Raise:
+             KeyError if the time point is not in the time series.
+        '''
+        index = bisect.bisect_left(self._key, time)
+        if index == len(self._key) or self._key[index] != time:
+            raise KeyError(time)
+        return self._value[index]
+
+    def between(self, start=None, stop=None):
+        '''The function to get the part of the time series within the time range [start, stop).
+           The bounds are found by binary search in O(log n), and the result is a slice of self.
+           Param:
+             start: the first time point to include. None means from the beginning.
+             stop: the time point to stop before. None means until the end.
+           Return:
+             a TimeSeries object with the time points t such that start <= t < stop.
+        '''
+        lo = 0 if start is None else bisect.bisect_left(self._key, start)
+        hi = len(self._key) if stop is None else bisect.bisect_left(self._key, stop)
+        return self[lo:max(lo, hi)]
 
     def interpolate(self, inter_time):
         '''for every new time point passed in, compute a value for the TimeSeries class.
@@ -323,7 +390,6 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
            Return:
              LaayOperation, which can be used to call an eval() of it in order to calculate.
         '''
-        identity = lambda x: x
         return LazyOperation(identity, self)
 
     def _check_time(function):
@@ -351,7 +417,7 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
              the addition of rhs's and self's value.
         '''
         added_value = [self._value[i] + rhs._value[i] for i in range(len(rhs))]
-        return TimeSeries(added_value, self._key)
+        return TimeSeries(added_value, self._key, presorted=True)
 
     @_check_time
     def __sub__(self,rhs):
@@ -364,7 +430,7 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
              self.value-rhs.value.
         '''
         added_value = [self._value[i] - rhs._value[i] for i in range(len(rhs))]
-        return TimeSeries(added_value, self._key)
+        return TimeSeries(added_value, self._key, presorted=True)
     
     @_check_time
     def __mul__(self,rhs):
@@ -377,7 +443,7 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
              is elementwise self.value*rhs.value.
         '''
         added_value = [self._value[i] * rhs._value[i] for i in range(len(rhs))]
-        return TimeSeries(added_value, self._key)
+        return TimeSeries(added_value, self._key, presorted=True)
     
     def __pos__(self):
         '''The uniary operation function to have a new TimeSeries that have the same time
@@ -385,7 +451,7 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
            Return:
              The new TimeSeries object that has the same time and value domain as self
         '''
-        return TimeSeries(self._value, self._key)
+        return TimeSeries(list(self._value), self._key, presorted=True)
 
     def __neg__(self):
         '''The uniary operation function negative to have a new TimeSeries that have 
@@ -395,7 +461,7 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
              self.value
         '''
         neg_value = [-i for i in self._value]
-        return TimeSeries(neg_value, self._key)
+        return TimeSeries(neg_value, self._key, presorted=True)
 
     def __abs__(self):
         '''The function that returns the 2-norm of self.value
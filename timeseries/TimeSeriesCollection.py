@@ -0,0 +1,294 @@
+import numbers
+import numpy as np
+from timeseries.ArrayTimeSeries import ArrayTimeSeries
+
+class TimeSeriesCollection:
+    '''This is the TimeSeriesCollection class implemented using Python.
+       The TimeSeriesCollection class stores many time series with the same time points as one
+       2-D numpy array, one row per time series, and one shared time array.
+
+
+       Attributes:
+
+         key: the time shared by every time series.
+         value: the 2-D array of data, one row per time series.
+
+
+       Methods:
+
+         from_series: The function to build a TimeSeriesCollection from ArrayTimeSeries with the same time.
+         __len__: The function to get the number of time series.
+         __getitem__: The function to get one time series as an ArrayTimeSeries view, or some of them as a collection.
+         __iter__: The function that iterates over the time series as ArrayTimeSeries views.
+         __repr__: The function to return formal string representation of the TimeSeriesCollection.
+         times: The function to get the shared time.
+         values: The function to get the 2-D array of data.
+         mean: The function that returns the mean of every time series.
+         std: The function that returns the standard deviation of every time series.
+         interpolate: The function to interpolate every time series at new time points at once.
+         _rhs_value: The private helper function to get the operand of an arithmetic operation.
+         _with_value: The private helper function to build a new TimeSeriesCollection on the shared time.
+         __add__, __sub__, __mul__, __truediv__: The arithmetic operation functions, broadcast over
+           the time series.
+         __radd__, __rsub__, __rmul__, __rtruediv__: The arithmetic operation functions with a number
+           or an ArrayTimeSeries on the left hand side.
+         __neg__: The uniary operation function negative.
+
+       Examples:
+       --------
+       >>> c = TimeSeriesCollection([1, 2, 3], [[1, 2, 3], [4, 6, 8]])
+       >>> len(c)
+       2
+       >>> c[1]
+       ArrayTimeSeries([(1, 4), (2, 6), (3, 8)])
+       >>> c.mean()
+       array([2., 6.])
+       >>> (c + c[0])[1]
+       ArrayTimeSeries([(1, 5), (2, 8), (3, 11)])
+    '''
+    def __init__(self, time, data, presorted=False):
+        '''The constructor to initialize a TimeSeriesCollection object.
+           Param:
+             time: the sequence-like time shared by every time series.
+             data: a 2-D sequence-like of data with one row per time series and one column per time point.
+             presorted: if True, time is trusted to be in increasing order and numpy arrays are
+               adopted without a copy.
+        '''
+        time = np.asarray(time) if presorted else np.array(time)
+        data = np.asarray(data) if presorted else np.array(data)
+        if data.ndim == 1 and len(data) == 0:
+            data = data.reshape(0, len(time))
+        if data.ndim != 2:
+            raise ValueError('data must be 2-D, with one row per time series')
+        if data.shape[1] != len(time):
+            raise Exception('The length of time input has to be equal to the length of every time series')
+        if not presorted and not np.all(time[:-1] <= time[1:]):
+            sort_order = np.argsort(time)
+            time = time[sort_order]
+            data = data[:, sort_order]
+        self._key = time
+        self._value = data
+
+    @classmethod
+    def from_series(cls, series):
+        '''The function to build a TimeSeriesCollection from ArrayTimeSeries with the same time.
+           Param:
+             series: a sequence of ArrayTimeSeries objects.
+           Return:
+             a TimeSeriesCollection object with one row per time series.
+        '''
+        series = list(series)
+        if not series:
+            raise ValueError('At least one time series is needed')
+        key = series[0]._key
+        for ts in series[1:]:
+            if ts._key is not key and not np.array_equal(ts._key, key):
+                raise ValueError('Every time series must have the same time points')
+        return cls(key, np.stack([ts._value for ts in series]), presorted=True)
+
+    def __len__(self):
+        '''The function to get the number of time series.
+           Return:
+             the number of rows.
+        '''
+        return len(self._value)
+
+    def __getitem__(self, index):
+        '''The function to get one time series as an ArrayTimeSeries view, or some of them as a collection.
+           The data is not copied. Like a slice of an ArrayTimeSeries, the view copies its data
+           before the first assignment, so the collection is not changed through it.
+           Param:
+             index: an integer, a slice, or an integer or boolean array of rows.
+           Return:
+             an ArrayTimeSeries object for an integer, otherwise a TimeSeriesCollection object.
+        '''
+        if isinstance(index, numbers.Integral):
+            ts = ArrayTimeSeries(self._key, self._value[index], presorted=True)
+            ts._shared = True
+            return ts
+        return TimeSeriesCollection(self._key, self._value[index], presorted=True)
+
+    def __iter__(self):
+        '''The function that iterates over the time series as ArrayTimeSeries views.
+           Return:
+             an iterator of ArrayTimeSeries objects.
+        '''
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        '''The function to return formal string representation of the TimeSeriesCollection.
+           Return:
+             a string with the number of time series and time points.
+        '''
+        return 'TimeSeriesCollection(series={}, times={})'.format(*self._value.shape)
+
+    def times(self):
+        '''The function to get the shared time.
+           Return:
+             a numpy array of the time.
+        '''
+        return np.array(self._key)
+
+    def values(self):
+        '''The function to get the 2-D array of data.
+           Return:
+             a 2-D numpy array with one row per time series.
+        '''
+        return np.array(self._value)
+
+    def mean(self):
+        '''The function that returns the mean of every time series.
+           Return:
+             a numpy array with one mean per time series.
+        '''
+        return np.mean(self._value, axis=1)
+
+    def std(self):
+        '''The function that returns the standard deviation of every time series.
+           Return:
+             a numpy array with one standard deviation per time series.
+        '''
+        return np.std(self._value, axis=1)
+
+    def interpolate(self, inter_time):
+        '''The function to interpolate every time series at new time points at once.
+           The neighbours and weights of the new time points are found once and used for every row.
+           As in ArrayTimeSeries.interpolate, a new time point beyond either end gets the first or
+           the last value.
+           Param:
+             inter_time: a sequence-like of time points.
+           Return:
+             a TimeSeriesCollection object with the input as its time.
+        '''
+        inter_time = np.asarray(inter_time)
+        sort_order = np.argsort(inter_time, kind='stable')
+        inter_time = inter_time[sort_order]
+        right = np.clip(np.searchsorted(self._key, inter_time, side='left'), 0, len(self._key)-1)
+        left = np.clip(right-1, 0, len(self._key)-1)
+        hit = (self._key[right] == inter_time) | (inter_time < self._key[0]) | (inter_time > self._key[-1])
+        inter_values = self._value[:, right]
+        between = ~hit
+        if np.any(between):
+            l, r = left[between], right[between]
+            weight = (inter_time[between] - self._key[l]) / (self._key[r] - self._key[l])
+            pred_value = self._value[:, l] + (self._value[:, r] - self._value[:, l]) * weight
+            inter_values = inter_values.astype(np.result_type(inter_values, pred_value))
+            inter_values[:, between] = pred_value
+        return TimeSeriesCollection(inter_time, inter_values, presorted=True)
+
+    def _rhs_value(self, rhs):
+        '''The private helper function to get the operand of an arithmetic operation.
+           Param:
+             rhs: a number; a 1-D sequence with one number per time series; an ArrayTimeSeries
+               or a TimeSeriesCollection with the same time.
+           Return:
+             an operand that numpy broadcasts over the 2-D array of data, or NotImplemented.
+        '''
+        if isinstance(rhs, numbers.Number):
+            return rhs
+        if isinstance(rhs, (ArrayTimeSeries, TimeSeriesCollection)):
+            if rhs._key is not self._key and not np.array_equal(rhs._key, self._key):
+                raise ValueError('The time series must have the same time points')
+            return rhs._value
+        if isinstance(rhs, (list, tuple, np.ndarray)):
+            rhs = np.asarray(rhs)
+            if rhs.shape != (len(self),):
+                raise ValueError('A sequence operand must have one number per time series')
+            return rhs[:, np.newaxis]
+        return NotImplemented
+
+    def _with_value(self, value):
+        '''The private helper function to build a new TimeSeriesCollection on the shared time.
+           Param:
+             value: a 2-D numpy array of data.
+           Return:
+             The new TimeSeriesCollection object.
+        '''
+        return TimeSeriesCollection(self._key, value, presorted=True)
+
+    def __add__(self, rhs):
+        '''The arithmetic operation function to add to every time series.
+           Param:
+             rhs: a number, a sequence with one number per time series, an ArrayTimeSeries added to
+               every time series, or a TimeSeriesCollection added row by row.
+           Return:
+             The new TimeSeriesCollection object.
+        '''
+        value = self._rhs_value(rhs)
+        return NotImplemented if value is NotImplemented else self._with_value(self._value + value)
+
+    def __sub__(self, rhs):
+        '''The arithmetic operation function to subtract from every time series.
+           Param:
+             rhs: see __add__.
+           Return:
+             The new TimeSeriesCollection object.
+        '''
+        value = self._rhs_value(rhs)
+        return NotImplemented if value is NotImplemented else self._with_value(self._value - value)
+
+    def __mul__(self, rhs):
+        '''The arithmetic operation function to multiply every time series elementwise.
+           Param:
+             rhs: see __add__.
+           Return:
+             The new TimeSeriesCollection object.
+        '''
+        value = self._rhs_value(rhs)
+        return NotImplemented if value is NotImplemented else self._with_value(self._value * value)
+
+    def __truediv__(self, rhs):
+        '''The arithmetic operation function to divide every time series elementwise.
+           Param:
+             rhs: see __add__.
+           Return:
+             The new TimeSeriesCollection object.
+        '''
+        value = self._rhs_value(rhs)
+        return NotImplemented if value is NotImplemented else self._with_value(self._value / value)
+
+    def __radd__(self, lhs):
+        '''The arithmetic operation function to add every time series to a number or a time series.
+           Param:
+             lhs: a number or an ArrayTimeSeries with the same time.
+           Return:
+             The new TimeSeriesCollection object.
+        '''
+        return self + lhs
+
+    def __rsub__(self, lhs):
+        '''The arithmetic operation function to subtract every time series from a number or a time series.
+           Param:
+             lhs: a number or an ArrayTimeSeries with the same time.
+           Return:
+             The new TimeSeriesCollection object.
+        '''
+        value = self._rhs_value(lhs)
+        return NotImplemented if value is NotImplemented else self._with_value(value - self._value)
+
+    def __rmul__(self, lhs):
+        '''The arithmetic operation function to multiply a number or a time series by every time series.
+           Param:
+             lhs: a number or an ArrayTimeSeries with the same time.
+           Return:
+             The new TimeSeriesCollection object.
+        '''
+        return self * lhs
+
+    def __rtruediv__(self, lhs):
+        '''The arithmetic operation function to divide a number or a time series by every time series elementwise.
+           Param:
+             lhs: a number or an ArrayTimeSeries with the same time.
+           Return:
+             The new TimeSeriesCollection object.
+        '''
+        value = self._rhs_value(lhs)
+        return NotImplemented if value is NotImplemented else self._with_value(value / self._value)
+
+    def __neg__(self):
+        '''The uniary operation function negative.
+           Return:
+             The new TimeSeriesCollection object with the negative of every value.
+        '''
+        return self._with_value(-self._value)
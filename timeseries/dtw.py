@@ -0,0 +1,146 @@
+import numpy as np
+from timeseries import stats
+
+def _window(n, m, window):
+    '''The private helper function to get the Sakoe-Chiba band of two sequences.
+       Param:
+         n, m: the lengths of the sequences.
+         window: the largest |i - j| of a matched pair (i, j), None for no band.
+       Return:
+         the band, widened to |n - m| so that the last points can be matched.
+    '''
+    if window is None:
+        return max(n, m)
+    if window < 0:
+        raise ValueError('window must not be negative')
+    return max(window, abs(n - m))
+
+def distance(a, b, window=None, cutoff=np.inf):
+    '''The function to get the dynamic time warping distance of two sequences.
+       The distance is the square root of the smallest sum of (a[i] - b[j])**2 over a warping path
+       from (0, 0) to (n-1, m-1) with steps (1, 0), (0, 1) and (1, 1). The cells of an anti-diagonal
+       i + j = d only depend on the two diagonals before it, so every diagonal is computed at once
+       with numpy, and only three diagonals of length n + 1 are kept.
+       Param:
+         a, b: numpy arrays of values.
+         window: the Sakoe-Chiba band, the largest |i - j| of a matched pair; None for no band.
+         cutoff: stop as soon as the distance is known to be larger than cutoff.
+       Return:
+         the distance, or inf if it is larger than cutoff.
+    '''
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    n, m = len(a), len(b)
+    if n == 0 or m == 0:
+        raise ValueError('The sequences must not be empty')
+    w = _window(n, m, window)
+    limit = cutoff * cutoff
+    # position p of a diagonal holds row i = p - 1; position 0 is the inf border before row 0
+    diagonals = [np.full(n + 1, np.inf) for _ in range(3)]
+    ranges = [(1, 0), (1, 0), (1, 0)]
+    for d in range(n + m - 1):
+        lo = max(0, d - m + 1, -((w - d) // 2))
+        hi = min(n - 1, d, (d + w) // 2)
+        older, previous, current = diagonals[(d - 2) % 3], diagonals[(d - 1) % 3], diagonals[d % 3]
+        old_lo, old_hi = ranges[d % 3]
+        current[old_lo+1:old_hi+2] = np.inf
+        ranges[d % 3] = (lo, hi)
+        if lo > hi:
+            continue
+        rows = np.arange(lo, hi + 1)
+        cost = (a[rows] - b[d - rows])**2
+        if d == 0:
+            current[1] = cost[0]
+            continue
+        best = np.minimum(np.minimum(older[lo:hi+1], previous[lo:hi+1]), previous[lo+1:hi+2])
+        current[lo+1:hi+2] = cost + best
+        if limit < np.inf:
+            previous_lo, previous_hi = ranges[(d - 1) % 3]
+            reached = current[lo+1:hi+2].min()
+            if previous_lo <= previous_hi:
+                reached = min(reached, previous[previous_lo+1:previous_hi+2].min())
+            if reached > limit:
+                return np.inf
+    total = diagonals[(n + m - 2) % 3][n]
+    return np.sqrt(total) if total <= limit else np.inf
+
+def lb_kim(a, b):
+    '''The function to get the LB_Kim lower bound of the dynamic time warping distance.
+       Every warping path matches the first points and the last points, so their costs are a
+       lower bound. Takes O(1) time.
+       Param:
+         a, b: numpy arrays of values, or 2-D numpy arrays with one sequence per row.
+       Return:
+         the lower bound, one per row for 2-D input.
+    '''
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    first = (a[..., 0] - b[..., 0])**2
+    if a.shape[-1] == 1 and b.shape[-1] == 1:
+        return np.sqrt(first)
+    return np.sqrt(first + (a[..., -1] - b[..., -1])**2)
+
+def envelope(a, window):
+    '''The function to get the lower and upper envelope of a sequence over a band.
+       Param:
+         a: a numpy array of values.
+         window: the band; the envelope at i is over the points from i - window to i + window.
+       Return:
+         a numpy array of the minimum and a numpy array of the maximum around every point.
+    '''
+    a = np.asarray(a, dtype=float)
+    n = len(a)
+    ends = np.arange(n + window)
+    starts = np.maximum(ends - 2 * window, 0)
+    lower = stats.window_extreme(np.concatenate([a, np.full(window, np.inf)]), starts, np.minimum)
+    upper = stats.window_extreme(np.concatenate([a, np.full(window, -np.inf)]), starts, np.maximum)
+    return lower[window:], upper[window:]
+
+def lb_keogh(query, candidates, window, bounds=None):
+    '''The function to get the LB_Keogh lower bound of the dynamic time warping distance.
+       A point of a candidate can only be matched to the points of the query within the band, so
+       its cost is at least its distance to the envelope of the query. Takes O(n) time per candidate.
+       Param:
+         query: a numpy array of values.
+         candidates: a numpy array of the same length, or a 2-D numpy array with one per row.
+         window: the Sakoe-Chiba band.
+         bounds: the envelope of the query, to reuse it; it is computed when None.
+       Return:
+         the lower bound, one per row for 2-D input.
+    '''
+    lower, upper = envelope(query, window) if bounds is None else bounds
+    candidates = np.asarray(candidates, dtype=float)
+    if candidates.shape[-1] != len(lower):
+        raise ValueError('LB_Keogh needs sequences of the same length')
+    excess = np.maximum(candidates - upper, 0) + np.maximum(lower - candidates, 0)
+    return np.sqrt(np.sum(excess * excess, axis=-1))
+
+def search(query, candidates, k=1, window=None):
+    '''The function to find the k candidates nearest to a query by dynamic time warping distance.
+       LB_Kim and then LB_Keogh are computed for every candidate at once. The candidates are visited
+       in order of their lower bound, and the search stops when the next bound is not smaller than
+       the k-th distance found so far; every full distance is abandoned once it passes that distance.
+       Param:
+         query: an ArrayTimeSeries or a sequence of values.
+         candidates: a sequence of ArrayTimeSeries or sequences of values with the length of the
+           query, a TimeSeriesCollection, or a 2-D numpy array with one candidate per row.
+         k: the number of candidates to find.
+         window: the Sakoe-Chiba band, None for no band.
+       Return:
+         a list of (distance, position) pairs, nearest first, and the number of full distances computed.
+    '''
+    query = np.asarray(getattr(query, '_value', query), dtype=float)
+    candidates = stats.rows(candidates)
+    if candidates.ndim != 2 or candidates.shape[1] != len(query):
+        raise ValueError('Every candidate must have the length of the query')
+    nearest = stats.Nearest(k)
+    w = _window(len(query), len(query), window)
+    bound = np.maximum(lb_kim(query, candidates), lb_keogh(query, candidates, min(w, len(query))))
+    computed = 0
+    for position in np.argsort(bound, kind='stable').tolist():
+        radius = nearest.radius()
+        if bound[position] >= radius:
+            break
+        computed += 1
+        nearest.add([distance(query, candidates[position], window, radius)], [position])
+    return nearest.result(), computed
@@ -1,36 +1,410 @@
+import concurrent.futures
+import numbers
+import operator
+import numpy as np
+
+def identity(x):
+    '''The identity function, shared by every lazy wrapper so that wrapping the same object
+       twice gives the same subexpression.
+       Param:
+         x: any object.
+       Return:
+         x itself.
+    '''
+    return x
+
+def _value_of(result):
+    '''The private helper function to get the value of an evaluated node.
+       Param:
+         result: the result of a node, maybe a _FusedExpression that is not computed yet.
+       Return:
+         the value of the node.
+    '''
+    return result.value() if isinstance(result, _FusedExpression) else result
+
+def _apply(function, args, kwargs):
+    '''The private helper function to run the function of a node. It runs on a worker when eval is parallel.
+       Param:
+         function: the function of the node.
+         args: the evaluated positional arguments.
+         kwargs: the evaluated keyword arguments.
+       Return:
+         the function result.
+    '''
+    args = [_value_of(a) for a in args]
+    kwargs = {k:_value_of(v) for k,v in kwargs.items()}
+    return function(*args, **kwargs)
+
+class _FusedExpression:
+    '''The private class for the result of an arithmetic LazyOperation before it is computed.
+       A tree of these is computed in one fused pass when its value is needed: if every leaf is a 
+       number or a fusable time series (a class with _fusable set, like ArrayTimeSeries), the time 
+       domains are checked once and the values are combined with numpy ufuncs that write into 
+       buffers owned by the expression, so no intermediate time series is built. Otherwise the 
+       operators are applied one by one as written.
+
+       Attributes:
+
+         function: the operator of the node.
+         operands: the operands, numbers, objects or other _FusedExpression.
+         shared: whether the node is used more than once, so it is computed on its own.
+
+       Methods:
+
+         value: The function to compute the expression once and return its result.
+         _program: The private helper function to compile the tree into postfix instructions.
+         _run: The private helper function to run the compiled instructions.
+    '''
+    _UFUNCS = {operator.add: np.add, operator.sub: np.subtract, operator.mul: np.multiply,
+               operator.truediv: np.divide, operator.pow: np.power,
+               operator.neg: np.negative, operator.pos: np.positive}
+    def __init__(self, function, operands, shared):
+        '''The constructor of _FusedExpression.
+           Param:
+             function: the operator of the node, one of the keys of _UFUNCS.
+             operands: the operands of the operator.
+             shared: whether the node is used more than once.
+        '''
+        self._function = function
+        self._operands = operands
+        self._shared = shared
+        self._computed = False
+        self._value = None
+
+    def value(self):
+        '''The function to compute the expression once and return its result.
+           Return:
+             the result of the expression.
+        '''
+        if not self._computed:
+            program, leaves = self._program()
+            self._value = self._run(program, leaves)
+            self._computed = True
+        return self._value
+
+    def _program(self):
+        '''The private helper function to compile the tree into postfix instructions.
+           Operands that are computed already or used elsewhere become leaves.
+           Return:
+             the instructions, ('leaf', index) or ('op', function, number of operands), and the leaves.
+        '''
+        program = []
+        leaves = []
+        stack = [(True, self)]
+        while stack:
+            is_operand, item = stack.pop()
+            if not is_operand:
+                program.append(item)
+            elif isinstance(item, _FusedExpression) and (item is self or 
+                    (not item._shared and not item._computed)):
+                stack.append((False, ('op', item._function, len(item._operands))))
+                stack.extend((True, operand) for operand in reversed(item._operands))
+            else:
+                if isinstance(item, _FusedExpression):
+                    item = item.value()
+                program.append(('leaf', len(leaves)))
+                leaves.append(item)
+        return program, leaves
+
+    def _run(self, program, leaves):
+        '''The private helper function to run the compiled instructions.
+           Param:
+             program: the postfix instructions from _program.
+             leaves: the leaves from _program.
+           Return:
+             the result of the expression.
+        '''
+        series = [leaf for leaf in leaves if getattr(leaf, '_fusable', False)]
+        fused = series and all(getattr(leaf, '_fusable', False) or isinstance(leaf, numbers.Number) 
+                               for leaf in leaves)
+        if fused:
+            key = series[0]._key
+            for ts in series[1:]:
+                if ts._key is not key and not np.array_equal(ts._key, key):
+                    raise ValueError(str(series[0])+' and '+str(ts)+' must have the same time points')
+        # the stack holds (operand, whether the operand is a buffer owned by this expression)
+        stack = []
+        for instruction in program:
+            if instruction[0] == 'leaf':
+                leaf = leaves[instruction[1]]
+                stack.append((leaf._value if fused and getattr(leaf, '_fusable', False) else leaf, False))
+                continue
+            _, function, n = instruction
+            args = stack[-n:]
+            del stack[-n:]
+            operands = [a for a, owned in args]
+            if not fused:
+                stack.append((function(*operands), False))
+                continue
+            ufunc = self._UFUNCS[function]
+            dtype = ufunc(*[a[:0] if isinstance(a, np.ndarray) else a for a in operands]).dtype
+            out = None
+            for a, owned in args:
+                if owned and isinstance(a, np.ndarray) and a.dtype == dtype:
+                    out = a
+                    break
+            result = ufunc(*operands) if out is None else ufunc(*operands, out=out)
+            stack.append((result, isinstance(result, np.ndarray)))
+        result = stack[0][0]
+        if fused:
+            return series[0]._with_value(result)
+        return result
+
 class LazyOperation:
     '''The LazyOperation class to calculate function in a lazy way.
+       A lazy expression is a DAG of LazyOperation nodes. Nodes with the same function applied to
+       the same arguments are the same subexpression, and eval computes each of them only once.
+       Arithmetic operators on a LazyOperation build new nodes, e.g. (a.lazy + b.lazy) * c.lazy.
 
        Attributes:
-   
+
        function: the function that need lazy operation.
        *agrs: the parameters of that function.
        **kwargs: the parameters of that function.
+       cache: whether the result of the node is kept across evaluations.
+       result: the kept result of the node.
 
        Methods:
 
          eval: The function to do the lazy eval on LazyOperation object.
+         cache: The function to keep the result of the node across evaluations.
+         clear_cache: The function to drop the kept result of the node.
+         _graph: The private helper function to list the distinct subexpressions of the DAG.
+         _arg_key: The private helper function to get the key of an argument of a node.
+         _binary: The private helper function to build a lazy arithmetic node.
+         __add__, __sub__, __mul__, __truediv__, __pow__, __neg__, __pos__ and the reflected 
+           operators: The functions to build lazy arithmetic nodes.
 
     '''
+    _NO_RESULT = object()
+
     def __init__(self, function, *args, **kwargs):
         '''The constructor of LazyOperation.
-           Param: 
+           Param:
              function: the function that need lazy operation
              *agrs: the parameters of that function
              **kwargs: the parameters of that function
         '''
         self._function = function
-        self._args = args 
+        self._args = args
         self._kwargs = kwargs
+        self._cache = False
+        self._result = self._NO_RESULT
+
+    def cache(self):
+        '''The function to keep the result of the node across evaluations.
+           The next eval of any expression containing the node computes it once,
+           and later evals reuse the result without evaluating its arguments again.
+           Changes to the objects the node depends on are not seen until clear_cache is called.
+           Return:
+             the node itself.
+        '''
+        self._cache = True
+        return self
+
+    def clear_cache(self):
+        '''The function to drop the kept result of the node, so the next eval computes it again.
+           Return:
+             None.
+        '''
+        self._result = self._NO_RESULT
+
+    @staticmethod
+    def _arg_key(arg, keys):
+        '''The private helper function to get the key of an argument of a node.
+           Param:
+             arg: the argument.
+             keys: the keys of the nodes seen so far, by id.
+           Return:
+             the key of the lazy node, the argument itself if it is hashable, or its id otherwise.
+             A number that is not an integer is keyed by its repr, so 0.0 and -0.0, which compare 
+             equal, are different arguments. Tuples and frozensets are keyed by the keys of their 
+             items, so (1,) and (1.0,) are different arguments too.
+        '''
+        if isinstance(arg, LazyOperation):
+            return ('lazy', keys[id(arg)])
+        try:
+            hash(arg)
+        except TypeError:
+            return ('id', id(arg))
+        if isinstance(arg, numbers.Number) and not isinstance(arg, numbers.Integral):
+            return ('number', type(arg), repr(arg))
+        if isinstance(arg, tuple):
+            return ('tuple', type(arg), tuple(LazyOperation._arg_key(a, keys) for a in arg))
+        if isinstance(arg, frozenset):
+            return ('frozenset', type(arg), frozenset(LazyOperation._arg_key(a, keys) for a in arg))
+        return ('value', type(arg), arg)
+
+    def _graph(self):
+        '''The private helper function to list the distinct subexpressions of the DAG.
+           The DAG is walked without recursion, so deep expressions do not hit the recursion limit.
+           Arguments of a node with a kept result are not walked.
+           Return:
+             the nodes with every node after its arguments, and the key of every node by id.
+             Nodes with equal keys are the same subexpression.
+        '''
+        order = []
+        keys = {}
+        # every distinct subexpression gets a small integer key, so keys do not nest
+        distinct = {}
+        stack = [(self, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if id(node) in keys:
+                continue
+            if node._result is not self._NO_RESULT:
+                keys[id(node)] = distinct.setdefault(('cached', id(node)), len(distinct))
+                order.append(node)
+            elif expanded:
+                args = tuple(self._arg_key(a, keys) for a in node._args)
+                kwargs = tuple(sorted((k, self._arg_key(v, keys)) for k, v in node._kwargs.items()))
+                keys[id(node)] = distinct.setdefault((node._function, args, kwargs), len(distinct))
+                order.append(node)
+            else:
+                stack.append((node, True))
+                children = list(node._args) + list(node._kwargs.values())
+                for child in reversed(children):
+                    if isinstance(child, LazyOperation) and id(child) not in keys:
+                        stack.append((child, False))
+        return order, keys
+
+    def _binary(self, function, other, reflected=False):
+        '''The private helper function to build a lazy arithmetic node.
+           Param:
+             function: the operator.
+             other: the other operand, a LazyOperation, a number or a time series.
+             reflected: whether self is the right operand.
+           Return:
+             the new LazyOperation.
+        '''
+        if reflected:
+            return LazyOperation(function, other, self)
+        return LazyOperation(function, self, other)
+
+    def __add__(self, other):
+        '''The function to build the lazy addition of self and other.'''
+        return self._binary(operator.add, other)
 
-    def eval(self):
+    def __radd__(self, other):
+        '''The function to build the lazy addition of other and self.'''
+        return self._binary(operator.add, other, True)
+
+    def __sub__(self, other):
+        '''The function to build the lazy subtraction of other from self.'''
+        return self._binary(operator.sub, other)
+
+    def __rsub__(self, other):
+        '''The function to build the lazy subtraction of self from other.'''
+        return self._binary(operator.sub, other, True)
+
+    def __mul__(self, other):
+        '''The function to build the lazy product of self and other.'''
+        return self._binary(operator.mul, other)
+
+    def __rmul__(self, other):
+        '''The function to build the lazy product of other and self.'''
+        return self._binary(operator.mul, other, True)
+
+    def __truediv__(self, other):
+        '''The function to build the lazy division of self by other.'''
+        return self._binary(operator.truediv, other)
+
+    def __rtruediv__(self, other):
+        '''The function to build the lazy division of other by self.'''
+        return self._binary(operator.truediv, other, True)
+
+    def __pow__(self, other):
+        '''The function to build the lazy power of self to other.'''
+        return self._binary(operator.pow, other)
+
+    def __rpow__(self, other):
+        '''The function to build the lazy power of other to self.'''
+        return self._binary(operator.pow, other, True)
+
+    def __neg__(self):
+        '''The function to build the lazy negative of self.'''
+        return LazyOperation(operator.neg, self)
+
+    def __pos__(self):
+        '''The function to build the lazy positive of self.'''
+        return LazyOperation(operator.pos, self)
+
+    def eval(self, workers=None, executor=None):
         '''The function to do the lazy eval on LazyOperation object
+           Every distinct subexpression is computed once, however many times it is used.
+           Arithmetic nodes are not computed one by one: every tree of them is computed in one 
+           fused pass when its value is needed, see _FusedExpression.
+           With workers or executor, every node is started as soon as its arguments are computed, 
+           so subexpressions that do not depend on each other are computed at the same time. 
+           The result is the same as without them.
+           Param:
+             workers: the number of threads to compute subexpressions with. None or 1 computes 
+               them one by one in the calling thread.
+             executor: a concurrent.futures executor to compute subexpressions with, for example a 
+               ProcessPoolExecutor. The functions and arguments of the nodes must then be picklable.
+               Overrides workers.
            Return:
             The function result
         '''
-        # Recursively eval() lazy args
-        new_args = [a.eval() if isinstance(a,LazyOperation) else a for a in self._args]
-        new_kwargs = {k:v.eval() if isinstance(v,LazyOperation) else v for k,v in self._kwargs}
-        return self._function(*new_args, **new_kwargs)
-    
-  
+        if executor is None and workers is not None and workers > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+                return self.eval(executor=pool)
+        order, keys = self._graph()
+        nodes = {}
+        parents = {}
+        pending = {}
+        for node in order:
+            key = keys[id(node)]
+            nodes.setdefault(key, []).append(node)
+            if len(nodes[key]) > 1 or node._result is not self._NO_RESULT:
+                pending.setdefault(key, 0)
+                continue
+            pending[key] = 0
+            for a in list(node._args) + list(node._kwargs.values()):
+                if isinstance(a, LazyOperation):
+                    parents.setdefault(keys[id(a)], []).append(key)
+                    pending[key] += 1
+        root = keys[id(self)]
+        results = {}
+        ready = [key for key in pending if pending[key] == 0]
+        running = {}
+
+        def finish(key, value):
+            results[key] = value
+            for node in nodes[key]:
+                if node._cache:
+                    node._result = value
+            for parent in parents.get(key, []):
+                pending[parent] -= 1
+                if pending[parent] == 0:
+                    ready.append(parent)
+
+        def submit(key, function, *args):
+            if executor is None:
+                finish(key, function(*args))
+            else:
+                running[executor.submit(function, *args)] = key
+
+        while ready or running:
+            while ready:
+                key = ready.pop()
+                node = nodes[key][0]
+                if node._result is not self._NO_RESULT:
+                    finish(key, node._result)
+                    continue
+                args = [results[keys[id(a)]] if isinstance(a,LazyOperation) else a for a in node._args]
+                if node._function in _FusedExpression._UFUNCS and not node._kwargs:
+                    # used once: leave it to be fused into the expression that uses it
+                    expression = _FusedExpression(node._function, args, len(parents.get(key, [])) > 1)
+                    if key == root or expression._shared or any(n._cache for n in nodes[key]):
+                        submit(key, _value_of, expression)
+                    else:
+                        finish(key, expression)
+                else:
+                    kwargs = {k:results[keys[id(v)]] if isinstance(v,LazyOperation) else v for k,v in node._kwargs.items()}
+                    submit(key, _apply, node._function, args, kwargs)
+            if running:
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    finish(running.pop(future), future.result())
+        return _value_of(results[root])
@@ -0,0 +1,550 @@
+import collections
+import functools
+import heapq
+import math
+import numpy as np
+
+def combine(n_a, mean_a, m2_a, n_b, mean_b, m2_b):
+    '''The function to merge the (count, mean, m2) summaries of two parts of a time series,
+       where m2 is the sum of squared deviations from the mean.
+       Uses the parallel form of Welford's algorithm, which stays stable when the means are far apart.
+       Param:
+         n_a, mean_a, m2_a: the count, mean and m2 of the first part.
+         n_b, mean_b, m2_b: the count, mean and m2 of the second part.
+       Return:
+         the count, mean and m2 of both parts together.
+    '''
+    n = n_a + n_b
+    if n == 0:
+        return 0, 0.0, 0.0
+    delta = mean_b - mean_a
+    mean = mean_a + delta * n_b / n
+    m2 = m2_a + m2_b + delta**2 * n_a * n_b / n
+    return n, mean, m2
+
+def summary(values):
+    '''The function to get the (count, mean, m2) summary of a chunk of values.
+       Param:
+         values: a numpy array of values.
+       Return:
+         the count, mean and m2 of the values.
+    '''
+    if len(values) == 0:
+        return 0, 0.0, 0.0
+    mean = np.mean(values)
+    return len(values), float(mean), float(np.sum((values - mean)**2))
+
+def running(values, n=0, mean=0.0, m2=0.0):
+    '''The function to get the running mean and m2 after every value of a chunk,
+       starting from the (count, mean, m2) summary of the values before the chunk.
+       The values are shifted by the running mean (or by the first value when there is no value
+       before the chunk) before the cumulative sums, which keeps the sums small. The summary of
+       the chunk is then merged into the running summary.
+       Param:
+         values: a numpy array of values.
+         n, mean, m2: the count, mean and m2 of the values before the chunk.
+       Return:
+         a numpy array of running means, a numpy array of running m2, and the
+         count, mean and m2 of all the values including the chunk.
+    '''
+    values = np.asarray(values, dtype=float)
+    counts = n + np.arange(1, len(values)+1)
+    shift = mean if n or len(values) == 0 else values[0]
+    shifted = values - shift
+    s1 = n * (mean - shift) + np.cumsum(shifted)
+    s2 = m2 + n * (mean - shift)**2 + np.cumsum(shifted * shifted)
+    means = shift + s1 / counts
+    m2s = np.maximum(s2 - s1 * s1 / counts, 0)
+    return (means, m2s) + combine(n, mean, m2, *summary(values))
+
+def window_starts(times, size=None, duration=None):
+    '''The function to get where the window ending at every point of a sized time series starts.
+       A window holds either the last size points, or the points within the last duration time
+       units, that is the points whose time t satisfies t_end - duration < t <= t_end.
+       Param:
+         times: a sorted numpy array of times.
+         size: the number of points in a window.
+         duration: the length of time of a window.
+       Return:
+         a numpy array with the index of the first point of the window ending at every point.
+    '''
+    if (size is None) == (duration is None):
+        raise ValueError('Exactly one of size and duration must be given')
+    if size is not None:
+        if size < 1:
+            raise ValueError('size must be positive')
+        return np.maximum(np.arange(len(times)) - size + 1, 0)
+    if duration <= 0:
+        raise ValueError('duration must be positive')
+    return np.searchsorted(times, times - duration, side='right')
+
+def window_moments(values, starts, ddof=0):
+    '''The function to get the mean and standard deviation of the window ending at every point.
+       Uses the differences of cumulative sums of the values shifted by their mean. The 
+       rounding error of a window's variance is about the machine epsilon times the sum of 
+       squared deviations of all the values up to the window, so it only shows for windows far 
+       less spread than the whole series; a window of one point has exactly 0.
+       Param:
+         values: a numpy array of values.
+         starts: the index of the first point of the window ending at every point.
+         ddof: the standard deviation divides by the window count minus ddof, as numpy.std does.
+       Return:
+         a numpy array of means and a numpy array of standard deviations. The standard 
+         deviation of a window with no more than ddof points is 0.
+    '''
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return np.array([]), np.array([])
+    shift = np.mean(values)
+    shifted = values - shift
+    s1 = np.concatenate([[0.0], np.cumsum(shifted)])
+    s2 = np.concatenate([[0.0], np.cumsum(shifted * shifted)])
+    ends = np.arange(1, len(values)+1)
+    counts = ends - starts
+    w1 = s1[ends] - s1[starts]
+    w2 = s2[ends] - s2[starts]
+    means = shift + w1 / counts
+    means[counts == 1] = values[counts == 1]
+    m2 = np.maximum(w2 - w1 * w1 / counts, 0)
+    std = np.zeros(len(values))
+    more = (counts > ddof) & (counts > 1)
+    std[more] = np.sqrt(m2[more] / (counts[more] - ddof))
+    return means, std
+
+def window_extreme(values, starts, ufunc):
+    '''The function to get the minimum or maximum of the window ending at every point.
+       Level k of a sparse table holds the extreme of every run of 2**k values; the extreme of 
+       a window is that of the two overlapping runs of the largest 2**k that fits in it. The 
+       levels are built one after the other and only the current one is kept, so this takes 
+       O(n log w) time and O(n) memory, where w is the largest window.
+       Param:
+         values: a numpy array of values.
+         starts: the index of the first point of the window ending at every point.
+         ufunc: np.minimum or np.maximum.
+       Return:
+         a numpy array of the extreme of every window.
+    '''
+    values = np.asarray(values)
+    n = len(values)
+    result = values.copy()
+    if n == 0:
+        return result
+    ends = np.arange(n)
+    levels = np.frexp(ends - starts + 1)[1] - 1
+    table = values
+    for k in range(1, levels.max()+1):
+        half = 2**(k-1)
+        table = ufunc(table[:-half], table[half:])
+        at = np.nonzero(levels == k)[0]
+        result[at] = ufunc(table[starts[at]], table[ends[at] - 2*half + 1])
+    return result
+
+_BUCKET_REDUCTIONS = ('mean', 'sum', 'min', 'max', 'count', 'first', 'last')
+
+def bucket_reduce(values, starts, how):
+    '''The function to aggregate the runs of values that start at the given positions.
+       Every run is reduced at once with the reduceat of a numpy ufunc.
+       Param:
+         values: a numpy array of values.
+         starts: an increasing numpy array of the index of the first value of every run, starting 
+           with 0. Every run holds at least one value.
+         how: one of 'mean', 'sum', 'min', 'max', 'count', 'first' and 'last'.
+       Return:
+         a numpy array with the aggregate of every run.
+    '''
+    if how not in _BUCKET_REDUCTIONS:
+        raise ValueError('how must be one of ' + ', '.join(_BUCKET_REDUCTIONS))
+    values = np.asarray(values)
+    if len(starts) == 0:
+        return np.array([], dtype=int if how == 'count' else values.dtype)
+    counts = np.diff(np.append(starts, len(values)))
+    if how == 'count':
+        return counts
+    if how == 'first':
+        return values[starts]
+    if how == 'last':
+        return values[starts + counts - 1]
+    if how == 'min':
+        return np.minimum.reduceat(values, starts)
+    if how == 'max':
+        return np.maximum.reduceat(values, starts)
+    sums = np.add.reduceat(values, starts)
+    return sums if how == 'sum' else sums / counts
+
+def znormalize(values):
+    '''The function to shift and scale time series to mean 0 and standard deviation 1.
+       Param:
+         values: a numpy array of values, or a 2-D numpy array with one time series per row.
+       Return:
+         a float numpy array of the same shape. A constant time series becomes all zeros.
+    '''
+    values = np.asarray(values, dtype=float)
+    mean = values.mean(axis=-1, keepdims=True)
+    std = values.std(axis=-1, keepdims=True)
+    return (values - mean) / np.where(std > 0, std, 1)
+
+def rows(series):
+    '''The function to get the values of several time series of one length as a 2-D numpy array.
+       Param:
+         series: a sequence of ArrayTimeSeries or sequences of values, a TimeSeriesCollection,
+           or a 2-D numpy array with one time series per row.
+       Return:
+         a float numpy array with one time series per row.
+    '''
+    if hasattr(series, '_value') and np.ndim(series._value) == 2:
+        values = series._value
+    elif isinstance(series, np.ndarray):
+        values = series
+    else:
+        values = [np.asarray(getattr(s, '_value', s)) for s in series]
+        if len(set(np.shape(v) for v in values)) > 1:
+            raise ValueError('Every time series must have the same length')
+    return np.asarray(values, dtype=float)
+
+def paa_bounds(n, segments):
+    '''The function to split n points into segments of nearly equal length.
+       Param:
+         n: the number of points.
+         segments: the number of segments, at most n.
+       Return:
+         a numpy array of the first index of every segment.
+    '''
+    if not 1 <= segments <= n:
+        raise ValueError('segments must be between 1 and the length of the time series')
+    return (np.arange(segments) * n) // segments
+
+def paa(values, segments):
+    '''The function to get the piecewise aggregate approximation (PAA) of time series, the mean 
+       of every segment of nearly equal length, see paa_bounds.
+       For two time series of length n, the Euclidean distance is at least
+       sqrt(sum of length_j * (paa_a[j] - paa_b[j])**2 over the segments j).
+       Param:
+         values: a numpy array of values, or a 2-D numpy array with one time series per row.
+         segments: the number of segments.
+       Return:
+         a numpy array with the mean of every segment, with one row per time series for 2-D input.
+    '''
+    values = np.asarray(values, dtype=float)
+    starts = paa_bounds(values.shape[-1], segments)
+    lengths = np.diff(np.append(starts, values.shape[-1]))
+    return np.add.reduceat(values, starts, axis=-1) / lengths
+
+def sax_breakpoints(alphabet):
+    '''The function to get the breakpoints of the symbols of SAX (symbolic aggregate approximation).
+       The breakpoints cut the standard normal distribution into alphabet parts of equal probability.
+       For an alphabet of 2**b symbols, the breakpoints of 2**(b-1) symbols are every other one, so
+       the symbol of a value with b - 1 bits is its symbol with b bits shifted right by one.
+       The breakpoints are found once per alphabet, by bisection on the normal cdf from math.erf.
+       Param:
+         alphabet: the number of symbols, at least 2.
+       Return:
+         a numpy array of the alphabet - 1 breakpoints, in increasing order.
+    '''
+    if alphabet < 2:
+        raise ValueError('alphabet must be at least 2')
+    return np.array(_normal_quantiles(alphabet))
+
+@functools.lru_cache(maxsize=None)
+def _normal_quantiles(alphabet):
+    '''The private helper function to get the quantiles i / alphabet of the standard normal distribution.
+       Only the lower half is bisected; the upper half is its mirror image, so the breakpoints
+       are symmetric and the middle one of an even alphabet is exactly 0.
+       Param:
+         alphabet: the number of parts.
+       Return:
+         a tuple of the alphabet - 1 quantiles, in increasing order.
+    '''
+    lower = []
+    for i in range(1, (alphabet + 1) // 2):
+        p = i / alphabet
+        low, high = -40.0, 0.0
+        while True:
+            middle = (low + high) / 2
+            if middle in (low, high):
+                break
+            if 0.5 * math.erfc(-middle / math.sqrt(2)) < p:
+                low = middle
+            else:
+                high = middle
+        lower.append(high)
+    middle = [0.0] if alphabet % 2 == 0 else []
+    return tuple(lower + middle + [-x for x in reversed(lower)])
+
+def sax(values, segments, alphabet):
+    '''The function to get the SAX word of time series: the PAA of the z-normalized time series,
+       with every segment mean replaced by the number of breakpoints not larger than it.
+       Param:
+         values: a numpy array of values, or a 2-D numpy array with one time series per row.
+         segments: the number of segments.
+         alphabet: the number of symbols.
+       Return:
+         an integer numpy array of symbols from 0 to alphabet - 1, with one row per time series for 2-D input.
+    '''
+    return np.searchsorted(sax_breakpoints(alphabet), paa(znormalize(values), segments), side='right')
+
+def cross_correlation(a, b, normalize=True):
+    '''The function to get the cross-correlation of two sequences at every lag by FFT.
+       The value at lag L is the sum over t of a[t + L] * b[t], so a positive lag means that a
+       follows b by L points. Both sequences are zero-padded to a power of two of at least 
+       len(a) + len(b) - 1 points, so the circular correlation of the FFT is the linear one. 
+       Takes O(n log n) time.
+       Param:
+         a, b: numpy arrays of values.
+         normalize: if True, the means are removed first and the result is divided by the 
+           product of the norms, so it lies in [-1, 1] and is 1 for a at lag 0 with itself.
+       Return:
+         a numpy array of the lags from -(len(b)-1) to len(a)-1 and a numpy array of the values.
+    '''
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    if len(a) == 0 or len(b) == 0:
+        raise ValueError('The sequences must not be empty')
+    if normalize:
+        a = a - a.mean()
+        b = b - b.mean()
+    n = len(a) + len(b) - 1
+    nfft = 1 << (n - 1).bit_length()
+    full = np.fft.irfft(np.fft.rfft(a, nfft) * np.conj(np.fft.rfft(b, nfft)), nfft)
+    values = np.concatenate([full[nfft-len(b)+1:], full[:len(a)]])
+    if normalize:
+        norm = np.sqrt(np.dot(a, a) * np.dot(b, b))
+        values = values / norm if norm > 0 else np.zeros(len(values))
+    return np.arange(-(len(b)-1), len(a)), values
+
+class RollingWindow:
+    '''The RollingWindow class keeps the statistics of the last points of a stream.
+       Every update takes amortized O(1) time: the mean and the sum of squared deviations are
+       updated with Welford's algorithm as points enter and leave the window, and the minimum
+       and maximum are the fronts of two monotonic deques.
+
+       Attributes:
+
+         size: the number of points in the window.
+         duration: the length of time of the window.
+         items: the (time, value) pairs in the window.
+         n, mu, m2: the count, mean and sum of squared deviations of the window.
+         low, high: the monotonic deques of (position, value) for the minimum and maximum.
+
+       Methods:
+
+         update: The function to add a point to the window and drop the points that left it.
+         mean: The function that returns the mean of the window.
+         std: The function that returns the standard deviation of the window.
+         min: The function that returns the minimum of the window.
+         max: The function that returns the maximum of the window.
+         _remove: The private helper function to drop the oldest point of the window.
+    '''
+    def __init__(self, size=None, duration=None):
+        '''The constructor of RollingWindow.
+           Param:
+             size: the number of points in a window.
+             duration: the length of time of a window. Exactly one of size and duration must be given.
+        '''
+        window_starts(np.array([]), size, duration)
+        self._size = size
+        self._duration = duration
+        self._items = collections.deque()
+        self._first = 0
+        self._n = 0
+        self._mu = 0.0
+        self._m2 = 0.0
+        self._low = collections.deque()
+        self._high = collections.deque()
+
+    def update(self, time, value):
+        '''The function to add a point to the window and drop the points that left it.
+           Param:
+             time: the time of the point, not smaller than the time of the previous point.
+             value: the value of the point.
+           Return:
+             None.
+        '''
+        position = self._first + len(self._items)
+        self._items.append((time, value))
+        self._n += 1
+        delta = value - self._mu
+        self._mu += delta / self._n
+        self._m2 += delta * (value - self._mu)
+        while self._low and self._low[-1][1] >= value:
+            self._low.pop()
+        self._low.append((position, value))
+        while self._high and self._high[-1][1] <= value:
+            self._high.pop()
+        self._high.append((position, value))
+        if self._size is not None:
+            while len(self._items) > self._size:
+                self._remove()
+        else:
+            while time - self._items[0][0] >= self._duration:
+                self._remove()
+
+    def _remove(self):
+        '''The private helper function to drop the oldest point of the window.
+           Return:
+             None.
+        '''
+        time, value = self._items.popleft()
+        if self._low[0][0] == self._first:
+            self._low.popleft()
+        if self._high[0][0] == self._first:
+            self._high.popleft()
+        self._first += 1
+        self._n -= 1
+        if self._n == 0:
+            self._mu = 0.0
+            self._m2 = 0.0
+            return
+        delta = value - self._mu
+        self._mu -= delta / self._n
+        self._m2 = max(self._m2 - delta * (value - self._mu), 0.0)
+
+    def mean(self):
+        '''The function that returns the mean of the window.
+           Return:
+             the mean of the values in the window.
+        '''
+        return self._mu
+
+    def std(self, ddof=0):
+        '''The function that returns the standard deviation of the window.
+           Param:
+             ddof: divide by the window count minus ddof, as numpy.std does.
+           Return:
+             the standard deviation of the values in the window, 0 if it has no more than ddof points.
+        '''
+        if self._n <= ddof:
+            return 0.0
+        return math.sqrt(self._m2 / (self._n - ddof))
+
+    def min(self):
+        '''The function that returns the minimum of the window.
+           Return:
+             the minimum of the values in the window.
+        '''
+        return self._low[0][1]
+
+    def max(self):
+        '''The function that returns the maximum of the window.
+           Return:
+             the maximum of the values in the window.
+        '''
+        return self._high[0][1]
+
+class Nearest:
+    '''The Nearest class keeps the k nearest items found so far by a search.
+       The items are kept in a max-heap of (-distance, position), so the k-th distance is at the
+       top and replacing it takes O(log k) time.
+
+       Attributes:
+
+         k: the number of items to keep.
+         heap: the max-heap of (-distance, position) pairs.
+
+       Methods:
+
+         add: The function to offer items, which are kept if they are among the k nearest.
+         radius: The function that returns the k-th distance found so far.
+         result: The function that returns the items kept, nearest first.
+    '''
+    def __init__(self, k):
+        '''The constructor of Nearest.
+           Param:
+             k: the number of items to keep, at least 1.
+        '''
+        if k < 1:
+            raise ValueError('k must be positive')
+        self._k = k
+        self._heap = []
+
+    def add(self, distances, positions):
+        '''The function to offer items, which are kept if they are among the k nearest.
+           Param:
+             distances: a sequence or numpy array of distances.
+             positions: the position of every item.
+           Return:
+             None.
+        '''
+        distances = distances.tolist() if isinstance(distances, np.ndarray) else distances
+        positions = positions.tolist() if isinstance(positions, np.ndarray) else positions
+        for distance, position in zip(distances, positions):
+            if len(self._heap) < self._k:
+                heapq.heappush(self._heap, (-distance, position))
+            elif distance < -self._heap[0][0]:
+                heapq.heapreplace(self._heap, (-distance, position))
+
+    def radius(self):
+        '''The function that returns the k-th distance found so far.
+           Return:
+             the k-th distance, or inf while fewer than k items were offered.
+        '''
+        return -self._heap[0][0] if len(self._heap) == self._k else np.inf
+
+    def result(self):
+        '''The function that returns the items kept, nearest first.
+           Return:
+             a list of (distance, position) pairs.
+        '''
+        return sorted((-d, p) for d, p in self._heap)
+
+def ewm_alpha(alpha=None, halflife=None):
+    '''The function to get the smoothing factor of an exponentially weighted statistic.
+       Param:
+         alpha: the weight of the newest element, 0 < alpha <= 1.
+         halflife: the number of elements after which the weight of an element halves, 
+           so alpha = 1 - 0.5**(1/halflife). Exactly one of alpha and halflife must be given.
+       Return:
+         alpha.
+    '''
+    if (alpha is None) == (halflife is None):
+        raise ValueError('Exactly one of alpha and halflife must be given')
+    if halflife is not None:
+        if halflife <= 0:
+            raise ValueError('halflife must be positive')
+        return 1 - 0.5**(1.0/halflife)
+    if not 0 < alpha <= 1:
+        raise ValueError('alpha must be in (0, 1]')
+    return alpha
+
+def linear_scan(b, a, y0):
+    '''The function to solve y[i] = a * y[i-1] + b[i] for every i at once, with y[-1] = y0.
+       Uses a doubling scan: after the pass with step s every y[i] holds the sum of 
+       a**k * b[i-k] for k < 2s. All the multipliers are at most 1 when |a| <= 1, so the 
+       result is as stable as the loop. Takes O(n log n) time.
+       Param:
+         b: a numpy array.
+         a: the constant factor.
+         y0: the value before the first element.
+       Return:
+         a numpy array of y.
+    '''
+    y = np.array(b, dtype=float)
+    step = 1
+    power = a
+    while step < len(y):
+        y[step:] += power * y[:-step]
+        step *= 2
+        power *= power
+    return y + a ** np.arange(1, len(y)+1) * y0
+
+def ewm_running(values, alpha, n=0, mean=0.0, var=0.0):
+    '''The function to get the exponentially weighted mean and variance after every value of a chunk.
+       For every value x, with d = x - mean, mean becomes mean + alpha * d and var becomes 
+       (1 - alpha) * (var + alpha * d**2). The first value of a series starts mean at x and var at 0.
+       Param:
+         values: a numpy array of values.
+         alpha: the smoothing factor.
+         n, mean, var: the count, mean and variance of the values before the chunk.
+       Return:
+         a numpy array of means, a numpy array of variances, and the count, mean and variance 
+         of all the values including the chunk.
+    '''
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return np.array([]), np.array([]), n, mean, var
+    if n == 0:
+        mean = values[0]
+    beta = 1 - alpha
+    means = linear_scan(alpha * values, beta, mean)
+    previous = np.concatenate([[mean], means[:-1]])
+    variances = linear_scan(beta * alpha * (values - previous)**2, beta, var)
+    return means, variances, n + len(values), means[-1], variances[-1]